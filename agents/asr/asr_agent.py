@@ -3,14 +3,22 @@ ASR Agent - Main agent orchestration.
 """
 
 import asyncio
+import queue
 import threading
 import time
 
 from loguru import logger
 
 from agents.asr.audio_capture import AudioCapture
+from agents.asr.audio_sources import DEFAULT_REPLAY_SPEED, DEFAULT_SOURCE
+from agents.asr.dsp_worker import DspWorker
+from agents.asr.stereo_stage import StereoStage
+from agents.asr.stream_profiles import DEFAULT_PROFILE, get_profile
+from agents.asr.uplink_codec import DEFAULT_UPLINK_CODEC, parse_codecs
 from agents.asr.websocket_client import WebSocketASRClient
 from agents.asr.zmq_publisher import ZMQPublisher
+from agents.shared.audio_device_service import AudioDeviceService
+from agents.shared.device_watcher import DeviceChange, DeviceWatcher
 
 # Configuration constants
 STATS_INTERVAL_SECONDS = 10.0
@@ -28,25 +36,61 @@ class ASRAgent:
         audio_source: str,
         backend_url: str,
         session_token: str | None = None,
+        watch_devices: bool = True,  # noqa: FBT001, FBT002
+        capture_bus: bool = False,  # noqa: FBT001, FBT002
+        loopback_source: str = DEFAULT_SOURCE,
+        replay_speed: float = DEFAULT_REPLAY_SPEED,
+        uplink_codec: str = DEFAULT_UPLINK_CODEC,
+        profile: str = DEFAULT_PROFILE,
+        callback_stats: bool = False,  # noqa: FBT001, FBT002
     ) -> None:
         self.zmq_port = zmq_port
         self.audio_source = audio_source
         self.backend_url = backend_url
         self.session_token = session_token
+        # Compressed uplink codecs to offer, in order of preference (raises ValueError for unknown names)
+        self.uplink_codecs = parse_codecs(uplink_codec)
+        # Block size, packetization, buffering and keepalive (raises ValueError for an unknown name)
+        self.profile = get_profile(profile)
 
         # Components
-        self.audio_capture_loopback = AudioCapture()
-        self.audio_capture = AudioCapture(audio_source=audio_source)
+        # Either channel can be a device, a WAV replay or a synthetic signal (see audio_sources)
+        self.audio_capture_loopback = AudioCapture(
+            audio_source=loopback_source,
+            replay_speed=replay_speed,
+            profile=self.profile,
+            instrument=callback_stats,
+        )
+        self.audio_capture = AudioCapture(
+            audio_source=audio_source,
+            capture_bus=capture_bus,
+            replay_speed=replay_speed,
+            profile=self.profile,
+            instrument=callback_stats,
+        )
+        # Conversion, resampling and interleaving for both captures, off their callbacks
+        self.stereo_stage = StereoStage(self.audio_capture_loopback, self.audio_capture, self.profile)
+        self.dsp_worker = DspWorker(self.stereo_stage)
 
         self.zmq_publisher = ZMQPublisher(port=zmq_port)
         self.ws_client: WebSocketASRClient | None = None
 
+        # Device hot-plug: changes arrive from the watcher thread and are handled by the main loop
+        self.watch_devices = watch_devices
+        self.device_watcher: DeviceWatcher | None = None
+        self.device_changes: queue.SimpleQueue[DeviceChange] = queue.SimpleQueue()
+        self.waiting_for_devices = False
+
         # Control
         self.running = False
 
         # Threads
         self.ws_thread: threading.Thread | None = None
 
+        # Packets sent as of the previous stats line, for the packet rate
+        self.stats_time = time.monotonic()
+        self.stats_packets = 0
+
     def _on_partial_transcript(self, channel_id: str, text: str) -> None:
         """Callback for partial transcripts."""
         self.zmq_publisher.publish(channel_id, text, is_final=False)
@@ -60,11 +104,12 @@ class ASRAgent:
         # Create WebSocket client once
         self.ws_client = WebSocketASRClient(
             backend_url=self.backend_url,
-            audio_capture_l=self.audio_capture_loopback,
-            audio_capture_r=self.audio_capture,
+            stage=self.stereo_stage,
             on_partial=self._on_partial_transcript,
             on_final=self._on_final_transcript,
             session_token=self.session_token,
+            uplink_codecs=self.uplink_codecs,
+            profile=self.profile,
         )
 
         # Run with automatic reconnection
@@ -78,15 +123,19 @@ class ASRAgent:
     def start(self) -> bool:
         """Start the ASR agent."""
         logger.info("Starting ASR Agent...")
+        logger.info(f"Streaming profile: {self.profile}")
 
         # Initialize audio capture
+        self.dsp_worker.start()
         if not self.audio_capture_loopback.start():
             logger.error("Failed to initialize loopback audio capture")
+            self.dsp_worker.stop()
             return False
 
         if not self.audio_capture.start():
             logger.error("Failed to initialize audio capture")
             self.audio_capture_loopback.stop()
+            self.dsp_worker.stop()
             return False
 
         # Initialize ZeroMQ
@@ -94,8 +143,14 @@ class ASRAgent:
             logger.error("Failed to initialize ZeroMQ")
             self.audio_capture_loopback.stop()
             self.audio_capture.stop()
+            self.dsp_worker.stop()
             return False
 
+        if self.watch_devices:
+            self.device_watcher = DeviceWatcher(AudioDeviceService.registry)
+            self.device_watcher.subscribe(self.device_changes.put)
+            self.device_watcher.start()
+
         # Start WebSocket thread
         self.running = True
 
@@ -127,20 +182,82 @@ class ASRAgent:
                 logger.warning("WebSocket thread did not stop in time")
 
         # Clean up resources
+        if self.device_watcher:
+            self.device_watcher.stop()
+            self.device_watcher = None
         self.audio_capture_loopback.stop()
         self.audio_capture.stop()
+        self.dsp_worker.stop()
         self.zmq_publisher.disconnect()
 
         logger.info("ASR Agent stopped")
 
+    def handle_device_changes(self) -> None:
+        """Main loop: reopen the device captures if a device change or a stalled stream calls for it."""
+        # File replays and synthetic signals do not depend on devices
+        captures = [capture for capture in (self.audio_capture_loopback, self.audio_capture) if capture.live]
+        migrate = any(capture.stalled() for capture in captures)
+        if migrate:
+            logger.warning("Audio capture stalled")
+        while not self.device_changes.empty():
+            change = self.device_changes.get_nowait()
+            migrate = migrate or self.waiting_for_devices or any(capture.affected_by(change) for capture in captures)
+        if not migrate or not captures:
+            return
+
+        # PortAudio only sees new devices once every stream in the process is closed and it is
+        # re-initialized, so the device captures move together. Their rings and the stereo stage,
+        # and so the websocket stream, stay in place.
+        for capture in captures:
+            capture.begin_migration()
+        AudioDeviceService.reinitialize_portaudio()
+
+        started = [capture.start() for capture in captures]
+        self.waiting_for_devices = not all(started)
+        if self.waiting_for_devices:
+            logger.warning("Audio device missing after a device change; waiting for it to come back")
+        else:
+            names = ", ".join(f"'{capture.device_name}'" for capture in captures)
+            logger.info(f"Audio capture migrated to {names}")
+
     def print_stats(self) -> None:
         """Print statistics."""
         ws_transcripts = self.ws_client.transcripts_received if self.ws_client else 0
+        uplink = "-"
+        if self.ws_client:
+            now = time.monotonic()
+            packets = self.ws_client.chunks_sent
+            rate = (packets - self.stats_packets) / max(1e-3, now - self.stats_time)
+            self.stats_time, self.stats_packets = now, packets
+            uplink = (
+                f"{self.ws_client.encoder.codec}, {self.ws_client.bytes_sent // 1024} KiB sent, "
+                f"{rate:.1f} packets/s ({self.profile.name}: {self.profile.packet_duration * 1000:g} ms packets)"
+            )
+        captures = (self.audio_capture_loopback, self.audio_capture)
+        dropped = sum(capture.overruns for capture in captures) + self.stereo_stage.packets_dropped
         logger.info(
-            f"Stats - Audio: {self.audio_capture.frames_captured} frames | "
+            f"Stats - Audio: {self.audio_capture.frames_captured} frames ({dropped} dropped) | "
+            f"Uplink: {uplink} | "
             f"Transcripts: {ws_transcripts} received, {self.zmq_publisher.published_count} published | "
             f"ZMQ failures: {self.zmq_publisher.failed_count}"
         )
+        for capture in captures:
+            if capture.timer is not None:
+                timing = capture.timer.summary(self.profile.block_duration)
+                if timing:
+                    logger.info(
+                        f"Callback timing ({capture.device_name}): "
+                        f"{timing['duration_us_p50']:.0f}/{timing['duration_us_p99']:.0f}/"
+                        f"{timing['duration_us_max']:.0f} us p50/p99/max, "
+                        f"jitter {timing.get('jitter_ms_p99', 0.0):.1f} ms p99, "
+                        f"{capture.overruns} overruns"
+                    )
+        if any(capture.timer is not None for capture in captures):
+            logger.info(
+                f"DSP stage: {self.stereo_stage.packets_produced} packets, "
+                f"{self.stereo_stage.dsp_seconds * 1000:.0f} ms total, "
+                f"{self.stereo_stage.frames_trimmed} frames trimmed"
+            )
 
     def run(self) -> int:
         """Main run loop."""
@@ -149,11 +266,17 @@ class ASRAgent:
             return 1
 
         try:
-            # Main loop - wait and print stats periodically
+            # Main loop - wait, follow device changes and print stats periodically
             last_stats_time = time.time()
+            gaps_logged = {id(capture): 0 for capture in (self.audio_capture_loopback, self.audio_capture)}
 
             while self.running:
                 time.sleep(1.0)
+                self.handle_device_changes()
+                for capture in (self.audio_capture_loopback, self.audio_capture):
+                    for gap in capture.migration_gaps_ms[gaps_logged[id(capture)] :]:
+                        logger.info(f"Audio gap during device migration ({capture.device_name}): {gap:.0f} ms")
+                    gaps_logged[id(capture)] = len(capture.migration_gaps_ms)
 
                 # Print stats periodically
                 if time.time() - last_stats_time >= STATS_INTERVAL_SECONDS:
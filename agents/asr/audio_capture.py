@@ -1,172 +1,185 @@
 """
 Audio capture service for ASR agent.
+
+The source's callback only copies each raw block into a RawBlockRing; the DSP worker
+(see dsp_worker) drains the rings of both captures into the stereo stage, which turns
+them into websocket packets.
 """
 
-import contextlib
-import queue
-from typing import Any
+import functools
+import threading
+import time
+from typing import TYPE_CHECKING, Any
 
 import numpy as np
-import pyaudiowpatch as pyaudio
 from loguru import logger
-from scipy.signal import resample_poly
-
-from agents.shared.audio_device_service import AudioDeviceService
 
-# Audio configuration constants
-TARGET_SAMPLE_RATE = 16000
-AUDIO_BLOCK_DURATION = 0.05
-AUDIO_QUEUE_MAXSIZE = 4
+from agents.asr.audio_sources import (
+    DEFAULT_REPLAY_SPEED,
+    DEFAULT_SOURCE,
+    AudioSource,
+    CaptureBusSource,
+    DeviceSource,
+    ReplaySource,
+    parse_source,
+)
+from agents.asr.callback_buffer import CallbackTimer, RawBlockRing
+from agents.asr.stream_profiles import DEFAULT_PROFILE, PROFILES, StreamProfile
+from agents.shared.device_watcher import DeviceChange
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# A stream that has not called back for this long is treated as lost (e.g. device unplugged)
+STALL_SECONDS = 2.0
+# Raw ring sizing: slots per queued block, and the format a slot holds without growing
+RING_SLOTS_PER_BLOCK = 2
+MIN_RING_SLOTS = 4
+RING_SLOT_RATE = 48000
+RING_SLOT_CHANNELS = 2
 
 
 class AudioCapture:
-    """Captures audio from a device and provides resampled frames via queue."""
+    """Captures audio from a source into a ring of raw blocks for the DSP worker."""
 
-    def __init__(self, audio_source: str = "loopback") -> None:
+    def __init__(
+        self,
+        audio_source: str = DEFAULT_SOURCE,
+        capture_bus: bool = False,  # noqa: FBT001, FBT002
+        replay_speed: float = DEFAULT_REPLAY_SPEED,
+        profile: StreamProfile | None = None,
+        instrument: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
         self.audio_source = audio_source
-        self.audio_queue: queue.Queue[np.ndarray[Any, Any]] = queue.Queue(maxsize=AUDIO_QUEUE_MAXSIZE)
-
-        # Audio device info
-        self.sample_rate: int = 48000
-        self.channels: int = 2
-        self.blocksize: int = 0
-        self.device_index: int | None = None
-
-        # PyAudio objects
-        self.pa: pyaudio.PyAudio | None = None
-        self.stream: pyaudio.Stream | None = None
+        # Block size and queue depth (see stream_profiles)
+        self.profile = profile or PROFILES[DEFAULT_PROFILE]
+        # Raises ValueError for a malformed spec
+        self.source = parse_source(audio_source, replay_speed)
+        # Read a named device from the capture bus agent's shared memory when it publishes it
+        self.capture_bus = capture_bus
+        self.active: AudioSource | None = None
+        # Raw blocks from the callback, waiting for the DSP worker; sized for 48 kHz float32 stereo,
+        # and regrown by the first callback of a larger format
+        self.ring = RawBlockRing(
+            max(MIN_RING_SLOTS, RING_SLOTS_PER_BLOCK * self.profile.queue_depth),
+            round(self.profile.block_duration * RING_SLOT_RATE) * RING_SLOT_CHANNELS * 4,
+        )
+        # Set by the callback when a block is waiting; the DSP worker owning this capture replaces it
+        self.wake = threading.Event()
+        # Audio in packets made from the ring and not yet sent; set by the stereo stage
+        self.downstream_seconds: Callable[[], float] | None = None
+        if isinstance(self.source, ReplaySource):
+            self.source.backlogged = self.backlogged
+        # Callback duration and jitter, when instrumented
+        self.timer = CallbackTimer() if instrument else None
 
         # Statistics
+        # Blocks the DSP worker has taken from the ring
         self.frames_captured = 0
-
-    def _audio_callback(
-        self,
-        in_data: bytes,
-        _frame_count: int,
-        _time_info: dict[str, Any],
-        _status_flags: int,
-    ) -> tuple[Any, Any]:
-        """PyAudio callback for audio capture."""
-        try:
-            # Convert to float32 in [-1,1]
-            data_np = np.frombuffer(in_data, dtype=np.int16).astype(np.float32) / 32768.0
-
-            # Convert to mono
-            if self.channels > 1:
-                data_np = (
-                    data_np.reshape(-1, self.channels).mean(axis=1)
-                    if data_np.size % self.channels == 0
-                    else data_np[:: self.channels]
-                )
-
-            # Resample to 16kHz if needed
-            if self.sample_rate != TARGET_SAMPLE_RATE:
-                data_np = resample_poly(data_np, TARGET_SAMPLE_RATE, self.sample_rate)
-
-            # Enqueue (drop oldest if full)
-            if self.audio_queue.full():
-                with contextlib.suppress(Exception):
-                    self.audio_queue.get_nowait()
-
-            self.audio_queue.put_nowait(data_np)
-            self.frames_captured += 1
-
-        except Exception as e:
-            logger.debug(f"Audio callback error: {e}")
-
-        return (None, pyaudio.paContinue)
+        self.last_callback_time = 0.0
+        # Time of the last callback before a device migration; the next callback measures the gap
+        self.gap_start: float | None = None
+        self.migration_gaps_ms: list[float] = []
+
+    @property
+    def sample_rate(self) -> int:
+        """Rate of the blocks the source delivers."""
+        return (self.active or self.source).sample_rate
+
+    @property
+    def channels(self) -> int:
+        """Channel count of the blocks the source delivers."""
+        return (self.active or self.source).channels
+
+    @property
+    def device_name(self) -> str | None:
+        """Name of the device (or file or signal) being captured."""
+        return (self.active or self.source).device_name
+
+    @property
+    def live(self) -> bool:
+        """True if the source is a device, which hot-plug can move or take away."""
+        return (self.active or self.source).live
+
+    @property
+    def overruns(self) -> int:
+        """Blocks the callback dropped because the DSP worker had not freed a ring slot."""
+        return self.ring.overruns
+
+    def backlogged(self) -> bool:
+        """
+        True while the ring and the stage's unsent packets hold the profile's buffer, less a packet.
+
+        A DSP pass turns everything pending into packets at once; keeping a packet of room
+        means one more block cannot overflow the packet queue.
+        """
+        ring = self.ring
+        if ring.pending >= ring.slots:
+            return True
+        waiting = ring.pending * self.profile.block_duration
+        if self.downstream_seconds is not None:
+            waiting += self.downstream_seconds()
+        return waiting + self.profile.packet_duration > self.profile.buffer_seconds
+
+    def process_block(self, block: np.ndarray[Any, Any], source: AudioSource) -> None:
+        """Source callback: copy the raw (frames, channels) block into the ring and wake the DSP worker."""
+        start = time.perf_counter()
+        now = time.monotonic()
+        if self.gap_start is not None:
+            self.migration_gaps_ms.append((now - self.gap_start) * 1000.0)
+            self.gap_start = None
+        self.last_callback_time = now
+
+        ring = self.ring
+        if block.nbytes > ring.slot_bytes:
+            # A format larger than the ring was sized for: regrow it once, dropping what is pending
+            overruns = ring.overruns + ring.pending
+            ring = self.ring = RawBlockRing(ring.slots, block.nbytes)
+            ring.overruns = overruns
+        ring.write(block, source.sample_rate, now)
+        self.wake.set()
+        if self.timer is not None:
+            self.timer.record(start, time.perf_counter())
 
     def start(self) -> bool:
         """Initialize and start audio capture."""
-        try:
-            if self.pa is None:
-                self.pa = pyaudio.PyAudio()
-
-            # Determine device index
-            if self.audio_source.lower() == "loopback":
-                # Get default WASAPI loopback device
-                try:
-                    loopback_dev = self.pa.get_default_wasapi_loopback()
-                    self.device_index = int(loopback_dev.get("index", 0))
-                    self.sample_rate = int(loopback_dev.get("defaultSampleRate", 48000))
-                    self.channels = int(loopback_dev.get("maxInputChannels", 2))
-                    logger.info(f"Using loopback device: index={self.device_index}")
-                except Exception as e:
-                    logger.error(f"Failed to get loopback device: {e}")
-                    return False
-            else:
-                # Search for device by name using AudioDeviceService
-                self.device_index = AudioDeviceService.get_device_index_by_name(self.audio_source)
-                if self.device_index is None or self.device_index < 0:
-                    logger.error(f"Audio device '{self.audio_source}' not found")
-                    return False
-
-                # Get device info
-                dev_info = self.pa.get_device_info_by_index(self.device_index)
-                self.sample_rate = int(dev_info["defaultSampleRate"])
-                self.channels = int(dev_info["maxInputChannels"])
-                logger.info(f"Found device '{dev_info['name']}': index={self.device_index}")
-
-            self.blocksize = int(self.sample_rate * AUDIO_BLOCK_DURATION)
-
-            # Open audio stream
-            logger.info(
-                f"Starting audio: device={self.device_index}, rate={self.sample_rate}Hz, channels={self.channels}"
-            )
-
-            self.stream = self.pa.open(
-                format=pyaudio.paInt16,
-                channels=self.channels,
-                rate=self.sample_rate,
-                input=True,
-                input_device_index=self.device_index,
-                frames_per_buffer=self.blocksize,
-                stream_callback=self._audio_callback,
-            )
-
-            self.stream.start_stream()
-            logger.info("Audio capture started")
-            return True  # noqa: TRY300
-
-        except Exception as e:
-            logger.exception(f"Failed to initialize audio capture: {e}")
+        if self.capture_bus and isinstance(self.source, DeviceSource) and self.source.device is not None:
+            bus = CaptureBusSource(self.source.device)
+            if bus.open(functools.partial(self.process_block, source=bus), self.profile.block_duration):
+                self.active = bus
+                return True
+            logger.info(f"Opening '{self.source.device}' directly")
+
+        if not self.source.open(functools.partial(self.process_block, source=self.source), self.profile.block_duration):
             return False
+        self.active = self.source
+        logger.info("Audio capture started")
+        return True
 
     def stop(self) -> None:
         """Stop audio capture and clean up resources."""
-        if self.stream:
-            try:
-                if self.stream.is_active():
-                    self.stream.stop_stream()
-            except Exception as e:
-                logger.debug(f"Error stopping audio stream: {e}")
-
-            try:
-                self.stream.close()
-            except Exception as e:
-                logger.debug(f"Error closing audio stream: {e}")
-
-            self.stream = None
-
-        if self.pa:
-            try:
-                self.pa.terminate()
-            except Exception as e:
-                logger.debug(f"Error terminating PyAudio: {e}")
-            self.pa = None
-
-    def get_frame_nowait(self) -> np.ndarray[Any, Any] | None:
-        """Get next audio frame from queue without blocking."""
-        try:
-            return self.audio_queue.get_nowait()
-        except queue.Empty:
-            return None
-
-    def clear_queue(self) -> None:
-        """Clear all audio frames from the queue."""
-        try:
-            while not self.audio_queue.empty():
-                with contextlib.suppress(Exception):
-                    self.audio_queue.get_nowait()
-        except Exception as e:
-            logger.debug(f"Error clearing audio queue: {e}")
+        if self.active:
+            self.active.close()
+            self.active = None
+
+    def affected_by(self, change: DeviceChange) -> bool:
+        """True if a device change may move or take away the capture's device."""
+        return (self.active or self.source).affected_by(change)
+
+    def stalled(self) -> bool:
+        """True if a live source is open but has stopped delivering, as when its device is removed."""
+        return (
+            self.active is not None
+            and self.active.live
+            and self.last_callback_time > 0
+            and time.monotonic() - self.last_callback_time > STALL_SECONDS
+        )
+
+    def begin_migration(self) -> None:
+        """Close the stream ahead of reopening it on a new device; the ring and the DSP stage reading it are kept."""
+        if self.gap_start is None:
+            self.gap_start = self.last_callback_time or time.monotonic()
+        # The reopened stream counts as stalled only once it has called back; a loopback
+        # capture that stays silent because nothing plays is not migrated again and again
+        self.last_callback_time = 0.0
+        self.stop()
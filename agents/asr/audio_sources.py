@@ -0,0 +1,539 @@
+"""
+Audio sources for the ASR agent's captures.
+
+A source delivers (frames, channels) blocks to a callback, from a device callback or its
+own thread, in the sample format it captured: float32 in [-1, 1), or int16 for PyAudio.
+AudioCapture copies every block to its DSP worker, which converts, downmixes, resamples
+and queues it the same way whichever source produced it, so WAV replay and synthetic
+signals exercise the production DSP and queueing path on machines without WASAPI or
+sound hardware (Linux CI, load tests).
+
+Source specs accepted by parse_source:
+    loopback        default output via WASAPI loopback (pyaudiowpatch; the default)
+    NAME            input device via pyaudiowpatch, as pyaudio:NAME
+    pyaudio:NAME    input device via pyaudiowpatch
+    sd:NAME         input device via sounddevice
+    bus:NAME        input device read from the capture bus agent's shared memory
+    file:PATH       WAV file replayed at --replay-speed times real time
+    synth:KIND      synthetic signal (speech, tone, noise or silence), looped
+"""
+
+import functools
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from loguru import logger
+
+from agents.shared.audio_device_service import AudioDeviceService
+from agents.shared.capture_bus import CaptureBusReader
+from agents.shared.device_registry import MME_NAME_LENGTH
+from agents.shared.device_watcher import DeviceChange
+from agents.shared.wav import read_wav
+
+if TYPE_CHECKING:
+    import sounddevice as sd
+
+DEFAULT_SOURCE = "loopback"
+DEFAULT_REPLAY_SPEED = 1.0
+
+SYNTHETIC_KINDS = ("speech", "tone", "noise", "silence")
+SYNTHETIC_SAMPLE_RATE = 48000
+SYNTHETIC_CHANNELS = 2
+SYNTHETIC_LOOP_SECONDS = 30.0
+SYNTHETIC_LEVEL = 0.3
+# Harmonics of the synthetic speech stop here, about where voiced speech energy does
+SPEECH_BANDWIDTH_HZ = 4000.0
+# How often an unpaced replay checks whether its consumer has caught up
+UNPACED_WAIT_SECONDS = 0.0005
+
+BlockCallback = Callable[[np.ndarray[Any, Any]], None]
+
+
+class AudioSource(ABC):
+    """Producer of float32 (or int16) audio blocks at a fixed rate and channel count."""
+
+    name = "source"
+    # Live sources are device-backed: hot-plug can move them and a stall means the device is gone
+    live = False
+
+    def __init__(self) -> None:
+        self.sample_rate = 48000
+        self.channels = 2
+        self.blocksize = 0
+        self.device_name: str | None = None
+
+    @abstractmethod
+    def open(self, on_block: BlockCallback, block_duration: float) -> bool:
+        """Start delivering blocks of about block_duration seconds to on_block; False if unavailable."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Stop delivering blocks and release the source."""
+
+    def affected_by(self, _change: DeviceChange) -> bool:
+        """True if a device change may take this source's device away or replace it."""
+        return False
+
+
+class DeviceSource(AudioSource):
+    """Input device, looked up by (partial) name."""
+
+    live = True
+
+    def __init__(self, device: str | None) -> None:
+        super().__init__()
+        self.device = device
+
+    def affected_by(self, change: DeviceChange) -> bool:
+        """The device was unplugged (MME names are truncated, so compare on the truncated length)."""
+        if self.device is None:
+            return False
+        return any(name.startswith(self.device[:MME_NAME_LENGTH]) for name in change.removed_inputs)
+
+
+class PyAudioSource(DeviceSource):
+    """Named input device, or the default output's WASAPI loopback when device is None (pyaudiowpatch)."""
+
+    name = "pyaudio"
+
+    def __init__(self, device: str | None) -> None:
+        super().__init__(device)
+        self.pa: Any = None
+        self.stream: Any = None
+        self.on_block: BlockCallback | None = None
+        self.continue_flag: Any = None
+
+    def affected_by(self, change: DeviceChange) -> bool:
+        """Loopback follows the default output, which can change with any output."""
+        if self.device is None:
+            return bool(change.added_outputs or change.removed_outputs)
+        return super().affected_by(change)
+
+    def open(self, on_block: BlockCallback, block_duration: float) -> bool:
+        """Open the device at its native rate and channel count as 16-bit PCM."""
+        # Windows-only package: imported here so the other sources work without it
+        try:
+            import pyaudiowpatch as pyaudio  # noqa: PLC0415
+        except ImportError:
+            logger.error("pyaudiowpatch is not installed; use an sd:, file: or synth: source instead")
+            return False
+
+        try:
+            self.pa = pyaudio.PyAudio()
+            if self.device is None:
+                # Get default WASAPI loopback device
+                try:
+                    dev_info = self.pa.get_default_wasapi_loopback()
+                except Exception as e:
+                    logger.error(f"Failed to get loopback device: {e}")
+                    self.close()
+                    return False
+                index = int(dev_info.get("index", 0))
+                logger.info(f"Using loopback device: index={index}")
+            else:
+                # Search for device by name using AudioDeviceService
+                index = AudioDeviceService.get_device_index_by_name(self.device)
+                if index < 0:
+                    logger.error(f"Audio device '{self.device}' not found")
+                    self.close()
+                    return False
+                dev_info = self.pa.get_device_info_by_index(index)
+                logger.info(f"Found device '{dev_info['name']}': index={index}")
+
+            self.sample_rate = int(dev_info.get("defaultSampleRate", 48000))
+            self.channels = int(dev_info.get("maxInputChannels", 2))
+            self.device_name = str(dev_info.get("name", ""))
+            self.blocksize = int(self.sample_rate * block_duration)
+            self.on_block = on_block
+            self.continue_flag = pyaudio.paContinue
+
+            logger.info(f"Starting audio: device={index}, rate={self.sample_rate}Hz, channels={self.channels}")
+            self.stream = self.pa.open(
+                format=pyaudio.paInt16,
+                channels=self.channels,
+                rate=self.sample_rate,
+                input=True,
+                input_device_index=index,
+                frames_per_buffer=self.blocksize,
+                stream_callback=self.callback,
+            )
+            self.stream.start_stream()
+            return True  # noqa: TRY300
+
+        except Exception as e:
+            logger.exception(f"Failed to initialize audio capture: {e}")
+            self.close()
+            return False
+
+    def callback(
+        self,
+        in_data: bytes,
+        _frame_count: int,
+        _time_info: dict[str, Any],
+        _status_flags: int,
+    ) -> tuple[Any, Any]:
+        """PyAudio callback: hand the 16-bit PCM block on as is; the DSP worker converts it."""
+        data_np = np.frombuffer(in_data, dtype=np.int16)
+        if data_np.size % self.channels == 0:
+            data_np = data_np.reshape(-1, self.channels)
+        else:
+            data_np = data_np[:: self.channels, None]
+        if self.on_block is not None:
+            self.on_block(data_np)
+        return (None, self.continue_flag)
+
+    def close(self) -> None:
+        """Stop and close the stream and terminate PyAudio."""
+        if self.stream:
+            try:
+                if self.stream.is_active():
+                    self.stream.stop_stream()
+            except Exception as e:
+                logger.debug(f"Error stopping audio stream: {e}")
+
+            try:
+                self.stream.close()
+            except Exception as e:
+                logger.debug(f"Error closing audio stream: {e}")
+
+            self.stream = None
+
+        if self.pa:
+            try:
+                self.pa.terminate()
+            except Exception as e:
+                logger.debug(f"Error terminating PyAudio: {e}")
+            self.pa = None
+
+
+class SoundDeviceSource(DeviceSource):
+    """Named input device via sounddevice, captured as float32 at its native rate and channel count."""
+
+    name = "sd"
+
+    def __init__(self, device: str) -> None:
+        super().__init__(device)
+        self.stream: sd.InputStream | None = None
+
+    def open(self, on_block: BlockCallback, block_duration: float) -> bool:
+        """Open and start the input stream."""
+        # Imported here, like pyaudiowpatch: sounddevice needs the PortAudio library, which
+        # file and synthetic sources run without
+        import sounddevice as sd  # noqa: PLC0415
+
+        index = AudioDeviceService.get_device_index_by_name(self.device or "")
+        info = AudioDeviceService.get_device_info_by_index(index) if index >= 0 else None
+        if not info:
+            logger.error(f"Audio device '{self.device}' not found")
+            return False
+
+        self.sample_rate = int(info.get("default_samplerate") or 48000)
+        self.channels = int(info["max_input_channels"])
+        self.device_name = str(info["name"])
+        self.blocksize = int(self.sample_rate * block_duration)
+        try:
+            self.stream = sd.InputStream(
+                device=index,
+                channels=self.channels,
+                samplerate=self.sample_rate,
+                blocksize=self.blocksize,
+                dtype="float32",
+                callback=lambda indata, _frames, _time, _status: on_block(indata),
+            )
+            self.stream.start()
+        except sd.PortAudioError as e:
+            logger.error(f"Failed to open '{self.device_name}': {e}")
+            self.close()
+            return False
+
+        logger.info(f"Starting audio: device={index}, rate={self.sample_rate}Hz, channels={self.channels}")
+        return True
+
+    def close(self) -> None:
+        """Close the input stream."""
+        import sounddevice as sd  # noqa: PLC0415
+
+        if self.stream:
+            try:
+                self.stream.close()
+            except sd.PortAudioError as e:
+                logger.debug(f"Error closing audio stream: {e}")
+            self.stream = None
+
+
+class CaptureBusSource(AudioSource):
+    """Named input device read from the capture bus agent's shared memory."""
+
+    name = "bus"
+    # Not a device of ours to follow, but a bus that stops delivering should be left for the device
+    live = True
+
+    def __init__(self, device: str) -> None:
+        super().__init__()
+        self.device = device
+        self.reader: CaptureBusReader | None = None
+        self.thread: threading.Thread | None = None
+        self.running = False
+
+    def open(self, on_block: BlockCallback, block_duration: float) -> bool:
+        """Attach to the device's bus, if the capture bus agent publishes it."""
+        index = AudioDeviceService.get_device_index_by_name(self.device)
+        info = AudioDeviceService.get_device_info_by_index(index) if index >= 0 else None
+        if not info:
+            return False
+        try:
+            self.reader = CaptureBusReader(info["name"])
+        except (FileNotFoundError, ValueError) as e:
+            logger.info(f"No capture bus for '{info['name']}' ({e})")
+            return False
+
+        self.device_name = str(info["name"])
+        self.sample_rate = self.reader.sample_rate
+        self.channels = self.reader.channels
+        self.blocksize = int(self.sample_rate * block_duration)
+        self.running = True
+        self.thread = threading.Thread(target=self.read_loop, args=(on_block,), daemon=True, name="asr-capture-bus")
+        self.thread.start()
+        logger.info(
+            f"Reading '{self.device_name}' from capture bus {self.reader.name} ({self.channels}ch {self.sample_rate}Hz)"
+        )
+        return True
+
+    def read_loop(self, on_block: BlockCallback) -> None:
+        """Capture bus thread: Hand each full block on the bus to on_block, as a stream callback would."""
+        reader = self.reader
+        if reader is None:
+            return
+        while self.running:
+            if reader.available < self.blocksize:
+                time.sleep(self.blocksize / self.sample_rate / 4)
+                continue
+            block = reader.read(self.blocksize)
+            if len(block) < self.blocksize:
+                # Block straddles the ring's end
+                block = np.concatenate((block, reader.read(self.blocksize - len(block))))
+            on_block(block)
+
+    def close(self) -> None:
+        """Stop reading and detach from the bus."""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+        if self.reader:
+            self.reader.close()
+            self.reader = None
+
+
+class ReplaySource(AudioSource):
+    """Plays a preloaded signal in blocks, paced at speed times real time (0: as fast as the consumer takes them)."""
+
+    name = "replay"
+
+    def __init__(self, speed: float = DEFAULT_REPLAY_SPEED, *, loop: bool = False) -> None:
+        super().__init__()
+        if speed < 0:
+            msg = f"Replay speed must not be negative: {speed:g}"
+            raise ValueError(msg)
+        self.speed = speed
+        self.loop = loop
+        # Set by the consumer: an unpaced replay waits while this returns True instead of
+        # delivering blocks faster than they are taken
+        self.backlogged: Callable[[], bool] | None = None
+        self.signal: np.ndarray[Any, Any] = np.zeros((0, 1), dtype=np.float32)
+        self.thread: threading.Thread | None = None
+        self.running = False
+
+        # Statistics
+        self.blocks_played = 0
+        self.finished = False
+
+    @abstractmethod
+    def load(self) -> bool:
+        """Fill self.signal, sample_rate and channels; False if the signal is unavailable."""
+
+    def open(self, on_block: BlockCallback, block_duration: float) -> bool:
+        """Load the signal and start playing it on the replay thread."""
+        if not self.load():
+            return False
+        self.channels = self.signal.shape[1]
+        self.blocksize = max(1, int(self.sample_rate * block_duration))
+        self.running = True
+        self.finished = False
+        self.thread = threading.Thread(target=self.play, args=(on_block,), daemon=True, name="asr-source-replay")
+        self.thread.start()
+        pace = f"{self.speed:g}x real time" if self.speed > 0 else "unpaced"
+        logger.info(
+            f"Replaying {self.device_name}: {len(self.signal) / self.sample_rate:.1f}s, "
+            f"{self.channels}ch {self.sample_rate}Hz, {pace}{', looped' if self.loop else ''}"
+        )
+        return True
+
+    def play(self, on_block: BlockCallback) -> None:
+        """Replay thread: Deliver one block per block period, as a device clocked at speed times real time would."""
+        period = self.blocksize / self.sample_rate / self.speed if self.speed > 0 else 0.0
+        start = time.perf_counter()
+        position = 0
+        while self.running:
+            if position + self.blocksize > len(self.signal):
+                if not self.loop:
+                    break
+                position = 0
+            if period == 0 and self.backlogged is not None:
+                while self.running and self.backlogged():
+                    time.sleep(UNPACED_WAIT_SECONDS)
+            on_block(self.signal[position : position + self.blocksize])
+            position += self.blocksize
+            self.blocks_played += 1
+            if period > 0:
+                delay = start + self.blocks_played * period - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        if self.running:
+            logger.info(f"Replay of {self.device_name} finished after {self.blocks_played} blocks")
+        self.finished = True
+
+    def close(self) -> None:
+        """Stop playing."""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+
+
+class FileSource(ReplaySource):
+    """WAV file replay."""
+
+    name = "file"
+
+    def __init__(self, path: str, speed: float = DEFAULT_REPLAY_SPEED) -> None:
+        super().__init__(speed)
+        self.path = Path(path)
+        self.device_name = self.path.name
+
+    def load(self) -> bool:
+        """Read the WAV file."""
+        try:
+            self.signal, self.sample_rate = read_wav(self.path)
+        except (OSError, EOFError, ValueError) as e:
+            logger.error(f"Failed to read '{self.path}': {e}")
+            return False
+        return True
+
+
+def speech_signal(seconds: float, rate: int, channels: int, seed: int = 0) -> np.ndarray[Any, Any]:
+    """
+    Seeded speech-like signal: bursts of syllables separated by pauses.
+
+    Each syllable is a harmonic series on a gliding pitch, shaped by two formant-like
+    peaks and a raised-cosine envelope, with a short noise onset like a consonant. The
+    spectrum, level and on/off pattern are close enough to speech to exercise level
+    detection and resampling realistically; it is not intelligible.
+    """
+    rng = np.random.default_rng(seed)
+    frames = int(seconds * rate)
+    signal = np.zeros(frames, dtype=np.float64)
+    position = int(rng.uniform(0.1, 0.5) * rate)
+    while position < frames:
+        for _ in range(int(rng.integers(3, 9))):
+            if position >= frames:
+                break
+            length = int(rng.uniform(0.12, 0.3) * rate)
+            t = np.arange(length) / rate
+            f0 = rng.uniform(100.0, 220.0)
+            pitch = f0 * (1.0 + 0.08 * np.sin(np.pi * t / t[-1]))
+            phase = 2.0 * np.pi * np.cumsum(pitch) / rate
+
+            harmonics = np.arange(1, int(SPEECH_BANDWIDTH_HZ / f0) + 1)
+            frequencies = harmonics * f0
+            formant1, formant2 = rng.uniform(300.0, 800.0), rng.uniform(900.0, 2200.0)
+            weights = np.exp(-(((frequencies - formant1) / 150.0) ** 2)) + 0.5 * np.exp(
+                -(((frequencies - formant2) / 250.0) ** 2)
+            )
+            voiced = weights @ np.sin(harmonics[:, None] * phase[None, :]) / max(1e-9, weights.sum())
+
+            onset = min(length, int(0.02 * rate))
+            voiced[:onset] += 0.3 * rng.standard_normal(onset)
+            envelope = np.sin(np.pi * t / t[-1]) ** 2
+            end = min(frames, position + length)
+            signal[position:end] += (voiced * envelope)[: end - position]
+            position += length + int(rng.uniform(0.02, 0.08) * rate)
+        position += int(rng.uniform(0.2, 0.8) * rate)
+
+    peak = float(np.max(np.abs(signal))) or 1.0
+    mono = (SYNTHETIC_LEVEL * signal / peak).astype(np.float32)
+    return np.repeat(mono[:, None], channels, axis=1)
+
+
+@functools.lru_cache(maxsize=len(SYNTHETIC_KINDS))
+def synthetic_signal(kind: str, seed: int = 0) -> np.ndarray[Any, Any]:
+    """SYNTHETIC_LOOP_SECONDS of a synthetic signal, generated once per process and shared read-only."""
+    rate, channels = SYNTHETIC_SAMPLE_RATE, SYNTHETIC_CHANNELS
+    frames = int(SYNTHETIC_LOOP_SECONDS * rate)
+    if kind == "speech":
+        signal = speech_signal(SYNTHETIC_LOOP_SECONDS, rate, channels, seed)
+    elif kind == "tone":
+        tone = SYNTHETIC_LEVEL * np.sin(2.0 * np.pi * 440.0 * np.arange(frames) / rate)
+        signal = np.repeat(tone.astype(np.float32)[:, None], channels, axis=1)
+    elif kind == "noise":
+        rng = np.random.default_rng(seed)
+        signal = (SYNTHETIC_LEVEL / 3.0 * rng.standard_normal((frames, channels))).astype(np.float32)
+    else:
+        signal = np.zeros((frames, channels), dtype=np.float32)
+    signal.flags.writeable = False
+    return signal
+
+
+class SyntheticSource(ReplaySource):
+    """Seeded synthetic signal, generated once and looped."""
+
+    name = "synth"
+
+    def __init__(self, kind: str, speed: float = DEFAULT_REPLAY_SPEED, seed: int = 0) -> None:
+        super().__init__(speed, loop=True)
+        if kind not in SYNTHETIC_KINDS:
+            msg = f"Unknown synthetic source: {kind!r} (expected {', '.join(SYNTHETIC_KINDS)})"
+            raise ValueError(msg)
+        self.kind = kind
+        self.seed = seed
+        self.device_name = f"synthetic {kind}"
+
+    def load(self) -> bool:
+        """Use the process-wide copy of the signal."""
+        self.signal = synthetic_signal(self.kind, self.seed)
+        self.sample_rate = SYNTHETIC_SAMPLE_RATE
+        return True
+
+
+# Prefixed source specs: prefix -> factory taking the text after the colon and the replay speed
+SOURCE_FACTORIES: dict[str, Callable[[str, float], AudioSource]] = {
+    "file": FileSource,
+    "synth": lambda kind, speed: SyntheticSource(kind.lower(), speed),
+    "sd": lambda device, _speed: SoundDeviceSource(device),
+    "bus": lambda device, _speed: CaptureBusSource(device),
+    "pyaudio": lambda device, _speed: PyAudioSource(device),
+}
+
+
+def parse_source(spec: str, replay_speed: float = DEFAULT_REPLAY_SPEED) -> AudioSource:
+    """Create a source from its spec string (see the module docstring)."""
+    if spec.lower() == "loopback":
+        return PyAudioSource(None)
+
+    name, separator, argument = spec.partition(":")
+    factory = SOURCE_FACTORIES.get(name.lower()) if separator else None
+    if factory is not None:
+        if not argument:
+            msg = f"Audio source {spec!r} is missing its argument after the colon"
+            raise ValueError(msg)
+        return factory(argument, replay_speed)
+    if not spec:
+        msg = "Empty audio source (expected loopback, a device name, sd:NAME, bus:NAME, file:PATH or synth:KIND)"
+        raise ValueError(msg)
+    # Anything else is a device name, which may itself contain a colon
+    return PyAudioSource(spec)
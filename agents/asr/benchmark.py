@@ -0,0 +1,906 @@
+"""
+ASR Agent - Benchmarks
+
+load:     runs many simulated client sessions, each a WebSocketASRClient fed by two
+          audio sources (synthetic or recorded, replayed in real time), against the
+          stand-in backend or a given URL. Sessions share one event loop per process and
+          are spread over a process pool. Reports per-session send rate, client lag
+          (capture to send), transcript latency (send to transcript, including the
+          backend's response delay), event-loop lag and CPU per session. Exits non-zero
+          if a session cannot keep up with real time.
+profiles: the load benchmark once per streaming profile (low-latency, balanced,
+          low-cpu), comparing CPU per session, packets per second and latency.
+callback: the capture callbacks' duration and jitter with the DSP on a worker thread, as
+          the agent runs it, and on the callback itself, as it used to, while other
+          threads compete for the interpreter. Exits non-zero if the callback's p99
+          duration exceeds its share of the block period.
+dsp:      nanoseconds per input sample of the stereo stage (both captures' blocks
+          converted, downmixed, resampled and interleaved into packets in one pass)
+          against the per-channel path it replaced, on float32 and int16 blocks, and
+          how far their packets differ. Exits non-zero if they produce different
+          packet counts.
+codec:    encode and decode cost per second of audio, bitrate and signal-to-noise
+          ratio of each uplink codec on synthetic speech, and whether the fast encoders
+          and decoders agree with the pure-Python reference ones. Exits non-zero on a
+          mismatch.
+
+Results are printed as JSON. No audio devices or real backend are needed.
+
+Usage:
+    python -m agents.asr.benchmark load --sessions 20 --duration 30 --processes 2
+    python -m agents.asr.benchmark load --sessions 4 --source file:meeting.wav --disconnect-after 10000
+    python -m agents.asr.benchmark load --sessions 20 --uplink-codec ima-adpcm
+    python -m agents.asr.benchmark profiles --sessions 10 --duration 20 --source file:meeting.wav
+    python -m agents.asr.benchmark callback --seconds 20 --contention 4 --profile low-latency
+    python -m agents.asr.benchmark dsp --seconds 30 --profile low-latency
+    python -m agents.asr.benchmark codec --seconds 30
+"""
+
+import argparse
+import asyncio
+import bisect
+import collections
+import contextlib
+import functools
+import json
+import multiprocessing
+import re
+import socket
+import sys
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass, replace
+from typing import Any
+
+import numpy as np
+from loguru import logger
+from scipy.signal import resample_poly
+
+from agents.asr.audio_capture import AudioCapture
+from agents.asr.audio_sources import SYNTHETIC_SAMPLE_RATE, AudioSource, synthetic_signal
+from agents.asr.callback_buffer import CallbackTimer
+from agents.asr.dsp_worker import DspWorker
+from agents.asr.stand_in_backend import (
+    ASR_SAMPLE_RATE,
+    DEFAULT_FINAL_INTERVAL_MS,
+    DEFAULT_PARTIAL_INTERVAL_MS,
+    DEFAULT_RESPONSE_DELAY_MS,
+    DEFAULT_STAND_IN_PORT,
+    StandInBackend,
+    StandInScript,
+)
+from agents.asr.stereo_stage import StereoStage, to_mono
+from agents.asr.stream_profiles import DEFAULT_PROFILE, PROFILES, get_profile
+from agents.asr.uplink_codec import (
+    IMA_ADPCM,
+    MULAW,
+    PCM16,
+    UPLINK_CODECS,
+    UplinkDecoder,
+    UplinkEncoder,
+    ima_adpcm_encode,
+    linear_to_alaw,
+    linear_to_mulaw,
+    parse_codecs,
+)
+from agents.asr.websocket_client import RECONNECT_DELAY_SECONDS, WebSocketASRClient
+
+DEFAULT_SESSIONS = 10
+DEFAULT_DURATION_SECONDS = 30.0
+DEFAULT_LOAD_SOURCE = "synth:speech"
+DEFAULT_CODEC_SECONDS = 30.0
+DEFAULT_CALLBACK_SECONDS = 20.0
+DEFAULT_DSP_SECONDS = 30.0
+DSP_REPEATS = 3
+DEFAULT_CONTENTION_THREADS = 4
+# A callback within budget uses at most this share of its block period at p99
+MAX_CALLBACK_BUDGET_SHARE = 0.1
+# A session keeping up sends at least this share of the audio it could have sent
+MIN_REALTIME_FACTOR = 0.9
+# Event loop lag is the overshoot of a sleep of this length
+LAG_PROBE_SECONDS = 0.01
+BACKEND_START_TIMEOUT_SECONDS = 10.0
+SESSION_STOP_TIMEOUT_SECONDS = 5.0
+
+AUDIO_MS_PATTERN = re.compile(r"\[audio_ms=(\d+)\]")
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    """p50/p90/p99/max of a list of milliseconds, or zeros if empty."""
+    if not values:
+        return {"p50_ms": 0.0, "p90_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {"p50_ms": float(p50), "p90_ms": float(p90), "p99_ms": float(p99), "max_ms": float(max(values))}
+
+
+@dataclass(frozen=True, slots=True)
+class LoadConfig:
+    """What every session of a load run streams, and where."""
+
+    source: str = DEFAULT_LOAD_SOURCE
+    loopback_source: str = DEFAULT_LOAD_SOURCE
+    uplink_codecs: tuple[str, ...] = (PCM16,)
+    profile: str = DEFAULT_PROFILE
+    duration: float = DEFAULT_DURATION_SECONDS
+    # None: start a stand-in backend
+    url: str | None = None
+
+
+class LoadSession:
+    """One simulated client: two captures and a websocket client, with latency bookkeeping."""
+
+    def __init__(self, index: int, config: LoadConfig) -> None:
+        self.index = index
+        profile = get_profile(config.profile)
+        self.capture_l = AudioCapture(config.loopback_source, profile=profile, instrument=True)
+        self.capture_r = AudioCapture(config.source, profile=profile, instrument=True)
+        self.stage = StereoStage(self.capture_l, self.capture_r, profile)
+        self.dsp_worker = DspWorker(self.stage)
+        self.client = WebSocketASRClient(
+            config.url or "",
+            self.stage,
+            on_partial=self.on_transcript,
+            on_final=self.on_transcript,
+            on_sent=self.on_sent,
+            uplink_codecs=list(config.uplink_codecs),
+            profile=profile,
+        )
+
+        # Send log of the current connection: audio position after each chunk and when it was sent
+        self.connection = 0
+        self.audio_ms = 0.0
+        self.sent_audio_ms: list[float] = []
+        self.sent_times: list[float] = []
+
+        # Statistics
+        self.client_lag_ms: list[float] = []
+        self.transcript_latency_ms: list[float] = []
+        self.partials = 0
+        self.finals = 0
+
+    def on_sent(self, frames: int, capture_time: float) -> None:
+        """Log a sent chunk; positions restart with every connection, as the backend's do."""
+        now = time.monotonic()
+        if self.client.connections != self.connection:
+            self.connection = self.client.connections
+            self.audio_ms = 0.0
+            self.sent_audio_ms.clear()
+            self.sent_times.clear()
+        self.audio_ms += frames * 1000.0 / ASR_SAMPLE_RATE
+        self.sent_audio_ms.append(self.audio_ms)
+        self.sent_times.append(now)
+        self.client_lag_ms.append((now - capture_time) * 1000.0)
+
+    def on_transcript(self, _channel_id: str, content: str) -> None:
+        """Match a transcript to the chunk that completed the audio it covers."""
+        now = time.monotonic()
+        if content.startswith("final"):
+            self.finals += 1
+        else:
+            self.partials += 1
+        match = AUDIO_MS_PATTERN.search(content)
+        if match is None:
+            return
+        # The backend rounds the position to whole milliseconds
+        index = bisect.bisect_left(self.sent_audio_ms, float(match[1]) - 0.5)
+        if index < len(self.sent_times):
+            self.transcript_latency_ms.append((now - self.sent_times[index]) * 1000.0)
+
+    def start(self) -> None:
+        """Start both audio sources (loading a file or generating a signal can take a while)."""
+        self.dsp_worker.start()
+        if not self.capture_l.start() or not self.capture_r.start():
+            self.capture_l.stop()
+            self.capture_r.stop()
+            self.dsp_worker.stop()
+            msg = f"Session {self.index}: audio source failed to start"
+            raise RuntimeError(msg)
+
+    async def run(self, duration: float) -> dict[str, Any]:
+        """Stream for duration seconds and report this session."""
+        start = time.monotonic()
+        task = asyncio.create_task(self.client.connect_with_retry())
+        connected = False
+        try:
+            await asyncio.sleep(duration)
+            connected = self.client.connected
+        finally:
+            # Stopping cancels the send loop mid-connection; its errors are expected here
+            logger.disable("agents.asr.websocket_client")
+            self.client.stop()
+            with contextlib.suppress(TimeoutError, asyncio.CancelledError):
+                await asyncio.wait_for(task, SESSION_STOP_TIMEOUT_SECONDS)
+            self.capture_l.stop()
+            self.capture_r.stop()
+            self.dsp_worker.stop()
+        elapsed = time.monotonic() - start
+
+        audio_seconds = self.client.frames_sent / ASR_SAMPLE_RATE
+        reconnects = max(0, self.client.connections - 1)
+        # Audio the session could have sent, less the client's pauses before reconnecting and
+        # the partial packet still being coalesced when it stopped
+        pauses = reconnects + (0 if connected else 1)
+        unsent = pauses * RECONNECT_DELAY_SECONDS + self.client.profile.packet_duration
+        expected_seconds = max(1e-3, elapsed - unsent)
+        captures = (self.capture_l, self.capture_r)
+        timings = [capture.timer.summary(self.client.profile.block_duration) for capture in captures if capture.timer]
+        return {
+            "session": self.index,
+            "uplink_codec": self.client.encoder.codec,
+            "bytes_per_second": self.client.bytes_sent / elapsed,
+            "chunks_per_second": self.client.chunks_sent / elapsed,
+            "audio_seconds_sent": audio_seconds,
+            # Above 1 when the two sources' blocks interleave and the client pads the other side with silence
+            "realtime_factor": audio_seconds / expected_seconds,
+            "connections": self.client.connections,
+            "reconnects": reconnects,
+            "partials": self.partials,
+            "finals": self.finals,
+            "blocks_dropped": sum(capture.overruns for capture in captures) + self.stage.packets_dropped,
+            "callback_duration_us_p99": max(timing.get("duration_us_p99", 0.0) for timing in timings),
+            "client_lag": summarize(self.client_lag_ms),
+            "transcript_latency": summarize(self.transcript_latency_ms),
+        }
+
+
+async def monitor_loop_lag(stop: asyncio.Event, lags_ms: list[float]) -> None:
+    """Sample how late the event loop wakes a short sleep until stop is set."""
+    while not stop.is_set():
+        start = time.monotonic()
+        await asyncio.sleep(LAG_PROBE_SECONDS)
+        lags_ms.append(max(0.0, time.monotonic() - start - LAG_PROBE_SECONDS) * 1000.0)
+
+
+async def run_sessions(first_index: int, count: int, config: LoadConfig) -> dict[str, Any]:
+    """Run count sessions concurrently on this process's event loop."""
+    sessions = [LoadSession(first_index + i, config) for i in range(count)]
+    for session in sessions:
+        session.start()
+    stop = asyncio.Event()
+    lags_ms: list[float] = []
+    monitor = asyncio.create_task(monitor_loop_lag(stop, lags_ms))
+
+    cpu_start = time.process_time()
+    wall_start = time.monotonic()
+    try:
+        reports = await asyncio.gather(*(session.run(config.duration) for session in sessions))
+    finally:
+        stop.set()
+        await monitor
+    cpu = time.process_time() - cpu_start
+    wall = time.monotonic() - wall_start
+
+    return {
+        "sessions": count,
+        "cpu_percent": cpu * 100.0 / wall,
+        "cpu_ms_per_session_second": cpu * 1000.0 / max(1, count) / wall,
+        "loop_lag": summarize(lags_ms),
+        "session_results": list(reports),
+    }
+
+
+def load_process(first_index: int, count: int, config: LoadConfig) -> dict[str, Any]:
+    """Pool worker: run a share of the sessions with agent logging quietened."""
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    return asyncio.run(run_sessions(first_index, count, config))
+
+
+def stand_in_process(port: int, script: StandInScript) -> None:
+    """Serve the stand-in backend until the process is terminated."""
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    asyncio.run(StandInBackend(port, script).serve())
+
+
+def wait_for_port(port: int, timeout: float) -> bool:
+    """Wait until something accepts connections on 127.0.0.1:port."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with contextlib.suppress(OSError), socket.create_connection(("127.0.0.1", port), timeout=0.5):
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def benchmark_load(
+    sessions: int, processes: int, config: LoadConfig, port: int, script: StandInScript
+) -> dict[str, Any]:
+    """Run sessions spread over processes against config.url, or a stand-in backend on port if it is None."""
+    processes = max(1, min(processes, sessions))
+    # Validate the specs here rather than in every worker
+    AudioCapture(config.source)
+    AudioCapture(config.loopback_source)
+    get_profile(config.profile)
+
+    context = multiprocessing.get_context("spawn")
+    backend = None
+    url = config.url
+    if url is None:
+        backend = context.Process(target=stand_in_process, args=(port, script), daemon=True)
+        backend.start()
+        if not wait_for_port(port, BACKEND_START_TIMEOUT_SECONDS):
+            backend.terminate()
+            msg = f"Stand-in backend did not start on port {port}"
+            raise RuntimeError(msg)
+        url = f"ws://127.0.0.1:{port}"
+    config = replace(config, url=url)
+
+    # Split the sessions as evenly as possible
+    shares = [sessions // processes + (i < sessions % processes) for i in range(processes)]
+    firsts = [sum(shares[:i]) for i in range(processes)]
+    jobs = [(first, share, config) for first, share in zip(firsts, shares, strict=True)]
+    try:
+        if processes == 1:
+            process_results = [load_process(*jobs[0])]
+        else:
+            with context.Pool(processes) as pool:
+                process_results = pool.starmap(load_process, jobs)
+    finally:
+        if backend is not None:
+            backend.terminate()
+            backend.join(timeout=5)
+
+    session_results = [report for result in process_results for report in result["session_results"]]
+    factors = [report["realtime_factor"] for report in session_results]
+    return {
+        "benchmark": "load",
+        "sessions": sessions,
+        "processes": processes,
+        **asdict(config),
+        "profile_settings": get_profile(config.profile).summary(),
+        "backend": "stand-in" if backend is not None else url,
+        "response_delay_ms": script.response_delay_ms if backend is not None else None,
+        "min_realtime_factor": min(factors, default=0.0),
+        "bytes_per_second_total": sum(report["bytes_per_second"] for report in session_results),
+        "client_lag_p99_ms_worst": max((report["client_lag"]["p99_ms"] for report in session_results), default=0.0),
+        "transcript_latency_p99_ms_worst": max(
+            (report["transcript_latency"]["p99_ms"] for report in session_results), default=0.0
+        ),
+        "process_results": process_results,
+        "passed": len(session_results) == sessions and all(factor >= MIN_REALTIME_FACTOR for factor in factors),
+    }
+
+
+def benchmark_profiles(
+    sessions: int, processes: int, config: LoadConfig, port: int, script: StandInScript
+) -> dict[str, Any]:
+    """Run the load benchmark once per streaming profile and compare CPU, packet rate and latency."""
+    runs = {name: benchmark_load(sessions, processes, replace(config, profile=name), port, script) for name in PROFILES}
+    comparison = []
+    for name, run in runs.items():
+        process_results = run["process_results"]
+        session_results = [report for result in process_results for report in result["session_results"]]
+        comparison.append(
+            {
+                **get_profile(name).summary(),
+                "cpu_ms_per_session_second": float(
+                    np.mean([result["cpu_ms_per_session_second"] for result in process_results])
+                ),
+                "packets_per_second": float(np.mean([report["chunks_per_second"] for report in session_results])),
+                "client_lag_p50_ms": float(np.median([report["client_lag"]["p50_ms"] for report in session_results])),
+                "client_lag_p99_ms_worst": run["client_lag_p99_ms_worst"],
+                "transcript_latency_p50_ms": float(
+                    np.median([report["transcript_latency"]["p50_ms"] for report in session_results])
+                ),
+                "transcript_latency_p99_ms_worst": run["transcript_latency_p99_ms_worst"],
+                "loop_lag_p99_ms_worst": max(result["loop_lag"]["p99_ms"] for result in process_results),
+                "min_realtime_factor": run["min_realtime_factor"],
+                "blocks_dropped": sum(report["blocks_dropped"] for report in session_results),
+            }
+        )
+
+    return {
+        "benchmark": "profiles",
+        "sessions": sessions,
+        "processes": processes,
+        "source": config.source,
+        "loopback_source": config.loopback_source,
+        "duration": config.duration,
+        "response_delay_ms": script.response_delay_ms if config.url is None else None,
+        "results": comparison,
+        "passed": all(run["passed"] for run in runs.values()),
+    }
+
+
+def per_channel_block(block: np.ndarray[Any, Any], sample_rate: int) -> np.ndarray[Any, Any]:
+    """The per-channel path's capture step: downmix one raw block and resample it to 16 kHz on its own."""
+    mono = to_mono(block)
+    return resample_poly(mono, ASR_SAMPLE_RATE, sample_rate) if sample_rate != ASR_SAMPLE_RATE else mono
+
+
+def per_channel_packet(data_l: np.ndarray[Any, Any], data_r: np.ndarray[Any, Any]) -> bytes:
+    """The per-channel path's send step: convert each channel to PCM16 and interleave with two strided writes."""
+    pcm16_l = (data_l * 32767).astype(np.int16)
+    pcm16_r = (data_r * 32767).astype(np.int16)
+    stereo = np.empty((pcm16_l.size + pcm16_r.size,), dtype=np.int16)
+    stereo[0::2] = pcm16_l
+    stereo[1::2] = pcm16_r
+    return stereo.tobytes()
+
+
+class InlineCapture(AudioCapture):
+    """The capture as it was before the DSP worker: downmix and resampling on the callback."""
+
+    def __init__(self, audio_source: str, profile_name: str) -> None:
+        super().__init__(audio_source, profile=get_profile(profile_name))
+        # Always instrumented; the base class's timer is optional
+        self.callback_timer = CallbackTimer()
+        self.timer = self.callback_timer
+        self.blocks: collections.deque[np.ndarray[Any, Any]] = collections.deque(maxlen=self.profile.queue_depth)
+        self.dsp_seconds = 0.0
+
+    def process_block(self, block: np.ndarray[Any, Any], source: AudioSource) -> None:
+        """Source callback: process the block before returning."""
+        start = time.perf_counter()
+        self.last_callback_time = time.monotonic()
+        self.blocks.append(per_channel_block(block, source.sample_rate))
+        self.frames_captured += 1
+        end = time.perf_counter()
+        self.dsp_seconds += end - start
+        self.callback_timer.record(start, end)
+
+    def get_block_nowait(self) -> np.ndarray[Any, Any] | None:
+        """Oldest processed block, if any."""
+        try:
+            return self.blocks.popleft()
+        except IndexError:
+            return None
+
+
+def contend(stop: threading.Event) -> None:
+    """Contention thread: Pure-Python work that holds the interpreter, as a busy agent's other threads do."""
+    while not stop.is_set():
+        sum(i * i for i in range(20000))
+
+
+def drain(sources: list[Callable[[], object]], stop: threading.Event) -> None:
+    """Consumer thread: Take processed audio as it appears, the way the websocket client does."""
+    while not stop.is_set():
+        for take in sources:
+            while take() is not None:
+                pass
+        time.sleep(0.01)
+
+
+def run_callback_mode(mode: str, seconds: float, contention: int, profile_name: str) -> dict[str, Any]:
+    """Stream two synthetic captures for seconds with DSP on the worker ("worker") or the callback ("inline")."""
+    profile = get_profile(profile_name)
+    worker = None
+    if mode == "worker":
+        captures = [AudioCapture(DEFAULT_LOAD_SOURCE, profile=profile, instrument=True) for _ in range(2)]
+        stage = StereoStage(captures[0], captures[1], profile)
+        worker = DspWorker(stage)
+        sources: list[Callable[[], object]] = [stage.get_packet_nowait]
+    else:
+        inline = [InlineCapture(DEFAULT_LOAD_SOURCE, profile_name) for _ in range(2)]
+        captures = list(inline)
+        sources = [capture.get_block_nowait for capture in inline]
+
+    stop = threading.Event()
+    threads = [threading.Thread(target=contend, args=(stop,), daemon=True) for _ in range(contention)]
+    threads.append(threading.Thread(target=drain, args=(sources, stop), daemon=True))
+    if worker:
+        worker.start()
+    for capture in captures:
+        capture.start()
+    for thread in threads:
+        thread.start()
+    cpu_start = time.process_time()
+    time.sleep(seconds)
+    cpu = time.process_time() - cpu_start
+    for capture in captures:
+        capture.stop()
+    if worker:
+        worker.stop()
+    stop.set()
+    for thread in threads:
+        thread.join(timeout=2)
+
+    timings = [capture.timer.summary(profile.block_duration) for capture in captures if capture.timer]
+    if worker:
+        dropped = sum(capture.overruns for capture in captures) + worker.stage.packets_dropped
+        dsp_seconds = worker.stage.dsp_seconds
+    else:
+        dropped = 0
+        dsp_seconds = sum(capture.dsp_seconds for capture in inline)
+    return {
+        "mode": mode,
+        "callbacks": sum(timing.get("callbacks", 0) for timing in timings),
+        "duration_us_p50": max(timing.get("duration_us_p50", 0.0) for timing in timings),
+        "duration_us_p99": max(timing.get("duration_us_p99", 0.0) for timing in timings),
+        "duration_us_max": max(timing.get("duration_us_max", 0.0) for timing in timings),
+        "budget_used_p99": max(timing.get("budget_used_p99", 0.0) for timing in timings),
+        "jitter_ms_p99": max(timing.get("jitter_ms_p99", 0.0) for timing in timings),
+        "jitter_ms_max": max(timing.get("jitter_ms_max", 0.0) for timing in timings),
+        "blocks_processed": sum(capture.frames_captured for capture in captures),
+        "blocks_dropped": dropped,
+        "dsp_ms_per_second": dsp_seconds * 1000.0 / seconds,
+        "cpu_percent": cpu * 100.0 / seconds,
+    }
+
+
+def benchmark_callback(seconds: float, contention: int, profile_name: str) -> dict[str, Any]:
+    """Callback duration and jitter with the DSP on the worker and inline, under interpreter contention."""
+    profile = get_profile(profile_name)
+    results = [run_callback_mode(mode, seconds, contention, profile_name) for mode in ("worker", "inline")]
+    return {
+        "benchmark": "callback",
+        "seconds": seconds,
+        "contention_threads": contention,
+        "profile_settings": profile.summary(),
+        "block_period_ms": profile.block_duration * 1000.0,
+        "max_budget_share": MAX_CALLBACK_BUDGET_SHARE,
+        "results": results,
+        "passed": results[0]["budget_used_p99"] <= MAX_CALLBACK_BUDGET_SHARE and results[0]["blocks_processed"] > 0,
+    }
+
+
+def run_per_channel(
+    blocks: tuple[Sequence[np.ndarray[Any, Any]], ...], sample_rate: int, packet_frames: int
+) -> list[bytes]:
+    """Packets from the per-channel path: each capture's blocks resampled alone, then converted and interleaved."""
+    packets = []
+    pending: list[np.ndarray[Any, Any]] = [np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)]
+    for block_l, block_r in zip(*blocks, strict=True):
+        pending = [
+            np.concatenate([pending[0], per_channel_block(block_l, sample_rate)]),
+            np.concatenate([pending[1], per_channel_block(block_r, sample_rate)]),
+        ]
+        while min(len(pending[0]), len(pending[1])) >= packet_frames:
+            packets.append(per_channel_packet(pending[0][:packet_frames], pending[1][:packet_frames]))
+            pending = [pending[0][packet_frames:], pending[1][packet_frames:]]
+    return packets
+
+
+def run_stereo_stage(
+    blocks: tuple[Sequence[np.ndarray[Any, Any]], ...], sample_rate: int, profile_name: str
+) -> list[bytes]:
+    """Packets from the stereo stage, fed the same blocks the DSP worker would take from the rings."""
+    profile = get_profile(profile_name)
+    stage = StereoStage(AudioCapture(DEFAULT_LOAD_SOURCE), AudioCapture(DEFAULT_LOAD_SOURCE), profile)
+    packets = []
+    for block_l, block_r in zip(*blocks, strict=True):
+        stage.push(0, block_l, sample_rate, 0.0)
+        stage.push(1, block_r, sample_rate, 0.0)
+        stage.flush()
+        while (packet := stage.get_packet_nowait()) is not None:
+            packets.append(packet[0])
+    return packets
+
+
+def benchmark_dsp(seconds: float, profile_name: str) -> dict[str, Any]:
+    """Cost per input sample of the stereo stage against the per-channel path, on float32 and int16 blocks."""
+    profile = get_profile(profile_name)
+    rate = SYNTHETIC_SAMPLE_RATE
+    frames = int(seconds * rate)
+    blocksize = round(profile.block_duration * rate)
+    signals = (synthetic_signal("speech", 0)[:frames], synthetic_signal("speech", 1)[:frames])
+    results: list[dict[str, Any]] = []
+
+    for sample_format in ("float32", "int16"):
+        inputs = tuple((signal * 32767).astype(np.int16) for signal in signals) if sample_format == "int16" else signals
+        blocks = tuple(
+            [signal[start : start + blocksize] for start in range(0, len(signal) - blocksize + 1, blocksize)]
+            for signal in inputs
+        )
+        samples = sum(block.size for side in blocks for block in side)
+
+        timings: dict[str, float] = {}
+        outputs: dict[str, list[bytes]] = {}
+        runs: dict[str, Callable[[], list[bytes]]] = {
+            "per_channel": functools.partial(run_per_channel, blocks, rate, profile.packet_frames),
+            "stereo_stage": functools.partial(run_stereo_stage, blocks, rate, profile_name),
+        }
+        for path, run in runs.items():
+            best = float("inf")
+            for _ in range(DSP_REPEATS):
+                start = time.perf_counter()
+                outputs[path] = run()
+                best = min(best, time.perf_counter() - start)
+            timings[path] = best
+
+        reference = np.frombuffer(b"".join(outputs["per_channel"]), dtype=np.int16).astype(np.float64)
+        staged = np.frombuffer(b"".join(outputs["stereo_stage"]), dtype=np.int16).astype(np.float64)
+        common = min(len(reference), len(staged))
+        difference = staged[:common] - reference[:common]
+        noise_power = float(np.mean(difference**2)) if common else 0.0
+        results.append(
+            {
+                "format": sample_format,
+                "input_samples": samples,
+                "per_channel_ns_per_sample": timings["per_channel"] * 1e9 / samples,
+                "stereo_stage_ns_per_sample": timings["stereo_stage"] * 1e9 / samples,
+                "speedup": timings["per_channel"] / max(1e-12, timings["stereo_stage"]),
+                "packets": [len(outputs["per_channel"]), len(outputs["stereo_stage"])],
+                "max_abs_difference": float(np.abs(difference).max()) if common else 0.0,
+                "snr_db": 10 * np.log10(np.mean(reference[:common] ** 2) / noise_power) if noise_power > 0 else None,
+            }
+        )
+
+    return {
+        "benchmark": "dsp",
+        "seconds": seconds,
+        "sample_rate": rate,
+        "profile_settings": profile.summary(),
+        "results": results,
+        "passed": all(result["packets"][0] == result["packets"][1] for result in results),
+    }
+
+
+def speech_chunks(seconds: float) -> list[bytes]:
+    """Synthetic stereo speech at the uplink rate, as the client's interleaved PCM16 chunks."""
+    signal = synthetic_signal("speech", 0)[: int(seconds * SYNTHETIC_SAMPLE_RATE)]
+    stereo = resample_poly(signal, ASR_SAMPLE_RATE, SYNTHETIC_SAMPLE_RATE, axis=0)
+    pcm = (np.clip(stereo, -1.0, 1.0) * 32767).astype(np.int16)
+    block = PROFILES[DEFAULT_PROFILE].packet_frames
+    return [pcm[start : start + block].tobytes() for start in range(0, len(pcm), block)]
+
+
+def reference_encode(codec: str, chunks: list[bytes]) -> list[bytes]:
+    """Encode chunks with the reference formulas, in the uplink framing (even chunks only)."""
+    encoded = []
+    states = [(0, 0), (0, 0)]
+    for chunk in chunks:
+        samples = np.frombuffer(chunk, dtype=np.int16)
+        if codec == PCM16:
+            encoded.append(chunk)
+        elif codec == IMA_ADPCM:
+            frames = samples.reshape(-1, 2)
+            parts = []
+            for channel in range(2):
+                part, states[channel] = ima_adpcm_encode(frames[:, channel], states[channel])
+                parts.append(part)
+            encoded.append(b"".join(parts))
+        else:
+            encode = linear_to_mulaw if codec == MULAW else linear_to_alaw
+            encoded.append(encode(samples).tobytes())
+    return encoded
+
+
+def benchmark_codec(seconds: float) -> dict[str, Any]:
+    """Cost, bitrate and quality of every uplink codec, checked against the reference implementations."""
+    chunks = speech_chunks(seconds)
+    pcm = np.frombuffer(b"".join(chunks), dtype=np.int16).astype(np.float64)
+    signal_power = float(np.mean(pcm**2))
+    results: list[dict[str, Any]] = []
+
+    for codec in UPLINK_CODECS:
+        encoder = UplinkEncoder(codec)
+        start = time.perf_counter()
+        encoded = [encoder.encode(chunk) for chunk in chunks]
+        encode_time = time.perf_counter() - start
+
+        decoded: dict[bool, bytes] = {}
+        decode_time: dict[bool, float] = {}
+        for reference in (False, True):
+            decoder = UplinkDecoder(codec, reference=reference)
+            start = time.perf_counter()
+            decoded[reference] = b"".join(decoder.decode(message) for message in encoded)
+            decode_time[reference] = time.perf_counter() - start
+
+        output = np.frombuffer(decoded[False], dtype=np.int16).astype(np.float64)
+        noise_power = float(np.mean((output - pcm[: len(output)]) ** 2))
+        wire_bytes = sum(len(message) for message in encoded)
+        results.append(
+            {
+                "codec": codec,
+                "kbit_per_second": wire_bytes * 8 / seconds / 1000.0,
+                "compression_ratio": len(pcm) * 2 / max(1, wire_bytes),
+                "snr_db": 10 * np.log10(signal_power / noise_power) if noise_power > 0 else None,
+                "encode_ms_per_audio_second": encode_time * 1000.0 / seconds,
+                "decode_ms_per_audio_second": decode_time[False] * 1000.0 / seconds,
+                "reference_decode_ms_per_audio_second": decode_time[True] * 1000.0 / seconds,
+                "encoder_matches_reference": encoded == reference_encode(codec, chunks),
+                "decoders_agree": decoded[False] == decoded[True],
+                "frames_decoded": len(output) // 2,
+            }
+        )
+
+    return {
+        "benchmark": "codec",
+        "seconds": seconds,
+        "sample_rate": ASR_SAMPLE_RATE,
+        "results": results,
+        "passed": all(
+            result["encoder_matches_reference"]
+            and result["decoders_agree"]
+            and result["frames_decoded"] == len(pcm) // 2
+            for result in results
+        ),
+    }
+
+
+def add_load_arguments(parser: argparse.ArgumentParser) -> None:
+    """Options shared by the load and profiles benchmarks."""
+    parser.add_argument(
+        "-n",
+        "--sessions",
+        type=int,
+        default=DEFAULT_SESSIONS,
+        help=f"Concurrent sessions (default: {DEFAULT_SESSIONS})",
+    )
+    parser.add_argument(
+        "-d",
+        "--duration",
+        type=float,
+        default=DEFAULT_DURATION_SECONDS,
+        help=f"Seconds to stream (default: {DEFAULT_DURATION_SECONDS:g})",
+    )
+    parser.add_argument(
+        "-P",
+        "--processes",
+        type=int,
+        default=1,
+        help="Processes to spread the sessions over, each with its own event loop (default: 1)",
+    )
+    parser.add_argument(
+        "--source",
+        type=str,
+        default=DEFAULT_LOAD_SOURCE,
+        help=f"Microphone-side source spec of every session (default: {DEFAULT_LOAD_SOURCE})",
+    )
+    parser.add_argument(
+        "--loopback-source",
+        type=str,
+        default=DEFAULT_LOAD_SOURCE,
+        help=f"Loopback-side source spec of every session (default: {DEFAULT_LOAD_SOURCE})",
+    )
+    parser.add_argument(
+        "--url",
+        type=str,
+        default=None,
+        help="Backend websocket URL (default: start a stand-in backend)",
+    )
+    parser.add_argument(
+        "-p",
+        "--port",
+        type=int,
+        default=DEFAULT_STAND_IN_PORT,
+        help=f"Stand-in backend port (default: {DEFAULT_STAND_IN_PORT})",
+    )
+    parser.add_argument(
+        "--response-delay",
+        type=float,
+        default=DEFAULT_RESPONSE_DELAY_MS,
+        help=f"Stand-in response delay in milliseconds (default: {DEFAULT_RESPONSE_DELAY_MS:g})",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="Stand-in random extra response delay in milliseconds (default: 0)",
+    )
+    parser.add_argument(
+        "--partial-interval",
+        type=float,
+        default=DEFAULT_PARTIAL_INTERVAL_MS,
+        help=f"Stand-in milliseconds of audio per partial (default: {DEFAULT_PARTIAL_INTERVAL_MS:g})",
+    )
+    parser.add_argument(
+        "--final-interval",
+        type=float,
+        default=DEFAULT_FINAL_INTERVAL_MS,
+        help=f"Stand-in milliseconds of audio per final (default: {DEFAULT_FINAL_INTERVAL_MS:g})",
+    )
+    parser.add_argument(
+        "--disconnect-after",
+        type=float,
+        default=0.0,
+        help="Stand-in drops each connection after this many milliseconds of audio, 0 for never (default: 0)",
+    )
+    parser.add_argument(
+        "--uplink-codec",
+        type=str,
+        default=PCM16,
+        help=f"Uplink codecs to offer, comma-separated in order of preference (default: {PCM16})",
+    )
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="ASR agent benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    load_parser = subparsers.add_parser("load", help="Concurrent client sessions against a stand-in backend")
+    add_load_arguments(load_parser)
+    load_parser.add_argument(
+        "--profile",
+        type=str,
+        default=DEFAULT_PROFILE,
+        choices=list(PROFILES),
+        help=f"Streaming profile of every session (default: {DEFAULT_PROFILE})",
+    )
+
+    profiles_parser = subparsers.add_parser("profiles", help="The load benchmark once per streaming profile")
+    add_load_arguments(profiles_parser)
+
+    callback_parser = subparsers.add_parser("callback", help="Capture callback duration and jitter under contention")
+    callback_parser.add_argument(
+        "-s",
+        "--seconds",
+        type=float,
+        default=DEFAULT_CALLBACK_SECONDS,
+        help=f"Seconds to capture in each mode (default: {DEFAULT_CALLBACK_SECONDS:g})",
+    )
+    callback_parser.add_argument(
+        "-c",
+        "--contention",
+        type=int,
+        default=DEFAULT_CONTENTION_THREADS,
+        help=f"Threads running pure-Python work alongside the captures (default: {DEFAULT_CONTENTION_THREADS})",
+    )
+    callback_parser.add_argument(
+        "--profile",
+        type=str,
+        default=DEFAULT_PROFILE,
+        choices=list(PROFILES),
+        help=f"Streaming profile setting the block size (default: {DEFAULT_PROFILE})",
+    )
+
+    dsp_parser = subparsers.add_parser("dsp", help="Stereo stage cost per sample against the per-channel path")
+    dsp_parser.add_argument(
+        "-s",
+        "--seconds",
+        type=float,
+        default=DEFAULT_DSP_SECONDS,
+        help=f"Seconds of synthetic speech per channel (default: {DEFAULT_DSP_SECONDS:g})",
+    )
+    dsp_parser.add_argument(
+        "--profile",
+        type=str,
+        default=DEFAULT_PROFILE,
+        choices=list(PROFILES),
+        help=f"Streaming profile setting the block and packet sizes (default: {DEFAULT_PROFILE})",
+    )
+
+    codec_parser = subparsers.add_parser("codec", help="Uplink codec cost, bitrate and quality")
+    codec_parser.add_argument(
+        "-s",
+        "--seconds",
+        type=float,
+        default=DEFAULT_CODEC_SECONDS,
+        help=f"Seconds of synthetic speech to encode (default: {DEFAULT_CODEC_SECONDS:g})",
+    )
+
+    args = parser.parse_args()
+
+    if args.command in ("codec", "callback", "dsp"):
+        if args.command == "codec":
+            result = benchmark_codec(args.seconds)
+        elif args.command == "dsp":
+            result = benchmark_dsp(args.seconds, args.profile)
+        else:
+            result = benchmark_callback(args.seconds, args.contention, args.profile)
+        print(json.dumps(result, indent=2))  # noqa: T201
+        return 0 if result.get("passed", True) else 1
+
+    script = StandInScript(
+        partial_interval_ms=args.partial_interval,
+        final_interval_ms=args.final_interval,
+        response_delay_ms=args.response_delay,
+        jitter_ms=args.jitter,
+        disconnect_after_ms=args.disconnect_after,
+    )
+    try:
+        config = LoadConfig(
+            source=args.source,
+            loopback_source=args.loopback_source,
+            uplink_codecs=tuple(parse_codecs(args.uplink_codec)),
+            duration=args.duration,
+            url=args.url,
+        )
+        if args.command == "profiles":
+            result = benchmark_profiles(args.sessions, args.processes, config, args.port, script)
+        else:
+            config = replace(config, profile=args.profile)
+            result = benchmark_load(args.sessions, args.processes, config, args.port, script)
+    except ValueError as e:
+        parser.error(str(e))
+    print(json.dumps(result, indent=2))  # noqa: T201
+    return 0 if result.get("passed", True) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
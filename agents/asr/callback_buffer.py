@@ -0,0 +1,123 @@
+"""
+Realtime-side buffering for the ASR captures.
+
+A device callback must return within its block period whatever the rest of the process
+is doing, so the capture's callback only copies the block's raw bytes into a
+preallocated RawBlockRing slot and wakes the DSP worker. Conversion, downmix and
+resampling happen on the worker (see dsp_worker).
+
+CallbackTimer is the instrumentation that shows the callback stays within budget: the
+duration of each callback and the interval between consecutive ones, kept in
+preallocated arrays so recording allocates nothing.
+"""
+
+from typing import Any
+
+import numpy as np
+
+DEFAULT_TIMER_SAMPLES = 4096
+
+
+class RawBlockRing:
+    """
+    Fixed slots of raw block bytes, written by one callback thread and read by one worker.
+
+    write() is one bounded copy into a slot plus a few scalar stores, and publishes the
+    slot last by advancing write_count. When the worker falls behind, new blocks are
+    dropped (and counted) rather than waited for. The copy is a memoryview assignment:
+    numpy would release the interpreter lock for it, and a callback that gives the lock
+    up waits behind every other busy thread to get it back.
+    """
+
+    def __init__(self, slots: int, slot_bytes: int) -> None:
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.buffer = bytearray(slots * slot_bytes)
+        self.view = memoryview(self.buffer)
+        self.nbytes = [0] * slots
+        # (dtype, channels, sample rate) of the block in each slot
+        self.formats: list[tuple[np.dtype[Any], int, int]] = [(np.dtype(np.float32), 1, 0)] * slots
+        self.times = [0.0] * slots
+        self.write_count = 0
+        self.read_count = 0
+
+        # Statistics
+        self.overruns = 0
+
+    def write(self, block: np.ndarray[Any, Any], sample_rate: int, capture_time: float) -> bool:
+        """Callback side: copy a (frames, channels) block into the next free slot; False if none is free."""
+        if self.write_count - self.read_count >= self.slots:
+            self.overruns += 1
+            return False
+        slot = self.write_count % self.slots
+        data = memoryview(block if block.flags.c_contiguous else np.ascontiguousarray(block)).cast("B")
+        size = min(len(data), self.slot_bytes)
+        offset = slot * self.slot_bytes
+        self.view[offset : offset + size] = data[:size]
+        self.nbytes[slot] = size
+        self.formats[slot] = (block.dtype, block.shape[1], sample_rate)
+        self.times[slot] = capture_time
+        self.write_count += 1
+        return True
+
+    def peek(self) -> tuple[np.ndarray[Any, Any], int, float] | None:
+        """Worker side: the oldest unread block as a view into its slot, its rate and capture time."""
+        if self.read_count == self.write_count:
+            return None
+        slot = self.read_count % self.slots
+        dtype, channels, sample_rate = self.formats[slot]
+        frame_bytes = dtype.itemsize * channels
+        size = self.nbytes[slot] - self.nbytes[slot] % frame_bytes
+        offset = slot * self.slot_bytes
+        block = np.frombuffer(self.view[offset : offset + size], dtype=dtype).reshape(-1, channels)
+        return block, sample_rate, self.times[slot]
+
+    def release(self) -> None:
+        """Worker side: hand the slot peek() returned back to the callback."""
+        self.read_count += 1
+
+    @property
+    def pending(self) -> int:
+        """Blocks written but not yet released."""
+        return self.write_count - self.read_count
+
+
+class CallbackTimer:
+    """Durations of and intervals between callbacks, over the most recent samples."""
+
+    def __init__(self, samples: int = DEFAULT_TIMER_SAMPLES) -> None:
+        self.durations = np.zeros(samples)
+        self.intervals = np.zeros(samples)
+        self.count = 0
+        self.last_start = 0.0
+
+    def record(self, start: float, end: float) -> None:
+        """Record one callback that ran from start to end (perf_counter seconds)."""
+        index = self.count % len(self.durations)
+        self.durations[index] = end - start
+        self.intervals[index] = start - self.last_start if self.last_start else np.nan
+        self.last_start = start
+        self.count += 1
+
+    def summary(self, period: float) -> dict[str, float]:
+        """Duration percentiles in microseconds and interval jitter (deviation from period) in milliseconds."""
+        count = min(self.count, len(self.durations))
+        if count == 0:
+            return {}
+        durations = self.durations[:count] * 1e6
+        intervals = self.intervals[:count]
+        jitter = np.abs(intervals[~np.isnan(intervals)] - period) * 1000.0
+        d50, d99 = np.percentile(durations, [50, 99])
+        summary = {
+            "callbacks": self.count,
+            "duration_us_p50": float(d50),
+            "duration_us_p99": float(d99),
+            "duration_us_max": float(durations.max()),
+            "budget_used_p99": float(d99 / 1e6 / period) if period > 0 else 0.0,
+        }
+        if jitter.size:
+            j50, j99 = np.percentile(jitter, [50, 99])
+            summary.update(
+                {"jitter_ms_p50": float(j50), "jitter_ms_p99": float(j99), "jitter_ms_max": float(jitter.max())}
+            )
+        return summary
@@ -0,0 +1,76 @@
+"""
+DSP worker for the ASR captures.
+
+One thread per agent drains the raw blocks both captures' callbacks left in their rings
+(see callback_buffer) into the stereo stage, which converts, downmixes, resamples and
+interleaves them into the packets the websocket client sends. Everything a callback
+used to do beyond copying the block happens here, so a slow resample or a busy
+interpreter delays the worker, not the audio device.
+"""
+
+import threading
+import time
+
+from loguru import logger
+
+from agents.asr.stereo_stage import StereoStage
+
+# The worker also wakes this often without a callback, so it notices stop() promptly
+DSP_IDLE_WAIT_SECONDS = 0.1
+
+
+class DspWorker:
+    """Runs a stereo stage over its captures' raw blocks on one thread."""
+
+    def __init__(self, stage: StereoStage, name: str = "asr-dsp") -> None:
+        self.stage = stage
+        self.name = name
+        # Every capture's callback sets the same event, so one wakeup serves both channels
+        self.wake = threading.Event()
+        for capture in stage.captures:
+            capture.wake = self.wake
+        self.thread: threading.Thread | None = None
+        self.running = False
+
+        # Statistics
+        self.wakeups = 0
+        self.blocks_processed = 0
+        self.busy_seconds = 0.0
+
+    def start(self) -> None:
+        """Start the worker thread."""
+        if self.thread:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True, name=self.name)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop the worker thread after it has processed what is pending."""
+        self.running = False
+        self.wake.set()
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+
+    def run(self) -> None:
+        """DSP thread: Wait for a callback to leave a block, then process both captures' pending blocks."""
+        while self.running:
+            self.wake.wait(DSP_IDLE_WAIT_SECONDS)
+            self.wake.clear()
+            self.process()
+        self.process()
+
+    def process(self) -> int:
+        """Process both captures' pending blocks; the number processed."""
+        start = time.perf_counter()
+        try:
+            processed = self.stage.process()
+        except Exception as e:
+            logger.debug(f"DSP error: {e}")
+            processed = 0
+        if processed:
+            self.wakeups += 1
+            self.blocks_processed += processed
+            self.busy_seconds += time.perf_counter() - start
+        return processed
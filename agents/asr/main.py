@@ -14,10 +14,13 @@ import psutil
 from loguru import logger
 
 from agents.asr.asr_agent import ASRAgent
+from agents.asr.audio_sources import DEFAULT_REPLAY_SPEED, DEFAULT_SOURCE
+from agents.asr.stream_profiles import DEFAULT_PROFILE, PROFILES
+from agents.asr.uplink_codec import DEFAULT_UPLINK_CODEC, UPLINK_CODECS
 
 # Default configuration
 DEFAULT_ZMQ_PORT = 50002
-DEFAULT_AUDIO_SOURCE = "loopback"
+DEFAULT_AUDIO_SOURCE = DEFAULT_SOURCE
 DEFAULT_BACKEND_URL = "ws://localhost:8000/api/asr/streaming"
 
 
@@ -50,7 +53,21 @@ def main() -> int:
         "--source",
         type=str,
         default=DEFAULT_AUDIO_SOURCE,
-        help=f"Audio source: 'loopback' or device name (default: {DEFAULT_AUDIO_SOURCE})",
+        help="Audio source: 'loopback', a device name, sd:NAME (sounddevice), bus:NAME (capture bus), "
+        f"file:PATH (WAV replay) or synth:speech|tone|noise|silence (default: {DEFAULT_AUDIO_SOURCE})",
+    )
+    parser.add_argument(
+        "--loopback-source",
+        type=str,
+        default=DEFAULT_SOURCE,
+        help=f"Source of the other channel, in the same forms as --source (default: {DEFAULT_SOURCE})",
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=DEFAULT_REPLAY_SPEED,
+        help="Pace of file: and synth: sources as a multiple of real time, 0 for as fast as they are sent "
+        f"(default: {DEFAULT_REPLAY_SPEED:g})",
     )
     parser.add_argument(
         "-u",
@@ -66,6 +83,37 @@ def main() -> int:
         default=None,
         help="Authentication token for websocket (will be sent as cookie 'session_token=<token>')",
     )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=DEFAULT_PROFILE,
+        choices=list(PROFILES),
+        help="Capture block size, packetization, buffering and keepalive, traded between latency and CPU "
+        f"(default: {DEFAULT_PROFILE})",
+    )
+    parser.add_argument(
+        "--uplink-codec",
+        type=str,
+        default=DEFAULT_UPLINK_CODEC,
+        help="Compressed audio encodings to offer the backend, comma-separated in order of preference, "
+        f"from {', '.join(UPLINK_CODECS)}; the backend may still choose PCM (default: {DEFAULT_UPLINK_CODEC})",
+    )
+    parser.add_argument(
+        "--no-device-watch",
+        action="store_true",
+        help="Do not follow device hot-plug (by default capture moves to a replugged or new default device)",
+    )
+    parser.add_argument(
+        "--capture-bus",
+        action="store_true",
+        help="Read the source from the capture bus agent's shared memory when it publishes that device "
+        "(falls back to opening the device)",
+    )
+    parser.add_argument(
+        "--callback-stats",
+        action="store_true",
+        help="Time every capture callback and log duration percentiles and jitter with the stats",
+    )
     parser.add_argument(
         "--watch-parent",
         action="store_true",
@@ -73,14 +121,26 @@ def main() -> int:
     )
 
     args = parser.parse_args()
+    if args.replay_speed < 0:
+        parser.error("--replay-speed must not be negative")
 
     # Create agent
-    agent = ASRAgent(
-        zmq_port=args.port,
-        audio_source=args.source,
-        backend_url=args.url,
-        session_token=args.token,
-    )
+    try:
+        agent = ASRAgent(
+            zmq_port=args.port,
+            audio_source=args.source,
+            backend_url=args.url,
+            session_token=args.token,
+            watch_devices=not args.no_device_watch,
+            capture_bus=args.capture_bus,
+            loopback_source=args.loopback_source,
+            replay_speed=args.replay_speed,
+            uplink_codec=args.uplink_codec,
+            profile=args.profile,
+            callback_stats=args.callback_stats,
+        )
+    except ValueError as e:
+        parser.error(str(e))
 
     # Setup signal handlers for graceful shutdown
     def signal_handler(signum: int, _frame: object) -> None:
@@ -0,0 +1,231 @@
+"""
+Stand-in ASR backend for load tests.
+
+Accepts the ASR agent's websocket stream (interleaved stereo PCM16 at 16 kHz) and answers
+with scripted partial and final transcripts per channel, after a configurable delay. It
+can also drop each connection after a set amount of audio, to exercise reconnection.
+Compressed uplinks are negotiated like a real backend would and decoded with the
+reference decoders in agents.asr.uplink_codec.
+No speech recognition happens; each transcript names the position in the stream it
+covers, as "[audio_ms=N]", so a client can work out transcript latency.
+
+Usage:
+    python -m agents.asr.stand_in_backend --port 50102 --response-delay 150
+    python -m agents.asr.main --url ws://127.0.0.1:50102 --source synth:speech --loopback-source synth:speech
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from loguru import logger
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+from websockets.typing import Subprotocol
+
+from agents.asr.uplink_codec import UPLINK_CODECS, UplinkDecoder, codec_for_subprotocol, parse_codecs, subprotocol
+
+DEFAULT_STAND_IN_PORT = 50102
+DEFAULT_PARTIAL_INTERVAL_MS = 500.0
+DEFAULT_FINAL_INTERVAL_MS = 3000.0
+DEFAULT_RESPONSE_DELAY_MS = 150.0
+
+# The client's stream: two channels of 16-bit PCM at 16 kHz, interleaved
+ASR_SAMPLE_RATE = 16000
+BYTES_PER_FRAME = 4
+CHANNEL_IDS = ("ch_0", "ch_1")
+
+
+@dataclass(slots=True)
+class StandInScript:
+    """What the stand-in answers and when."""
+
+    partial_interval_ms: float = DEFAULT_PARTIAL_INTERVAL_MS
+    final_interval_ms: float = DEFAULT_FINAL_INTERVAL_MS
+    response_delay_ms: float = DEFAULT_RESPONSE_DELAY_MS
+    # Uniform extra delay in [0, jitter_ms) per message
+    jitter_ms: float = 0.0
+    # Close each connection after this much audio (0: never)
+    disconnect_after_ms: float = 0.0
+
+
+class StandInBackend:
+    """Websocket server answering streamed audio with scripted transcripts."""
+
+    def __init__(
+        self,
+        port: int = DEFAULT_STAND_IN_PORT,
+        script: StandInScript | None = None,
+        seed: int = 0,
+        codecs: Sequence[str] = UPLINK_CODECS,
+    ) -> None:
+        self.port = port
+        self.script = script or StandInScript()
+        # Uplink codecs this backend accepts
+        self.codecs = list(codecs)
+        self.random = random.Random(seed)  # noqa: S311 - scripted jitter, not cryptography
+        self.pending: set[asyncio.Task[None]] = set()
+
+        # Statistics
+        self.connections = 0
+        self.bytes_received = 0
+        self.frames_received = 0
+        self.messages_sent = 0
+        self.disconnects = 0
+
+    def select_codec(self, _ws: ServerConnection, offered: Sequence[Subprotocol]) -> Subprotocol | None:
+        """Pick the client's most preferred codec we accept; None leaves the connection on PCM."""
+        accepted = {subprotocol(codec) for codec in self.codecs}
+        return next((name for name in offered if name in accepted), None)
+
+    async def respond(self, ws: ServerConnection, message: dict[str, Any], delay_ms: float) -> None:
+        """Send one transcript message after delay_ms, as a recognizer would after processing."""
+        await asyncio.sleep(delay_ms / 1000.0)
+        try:
+            await ws.send(json.dumps(message))
+            self.messages_sent += 1
+        except ConnectionClosed:
+            pass
+
+    def schedule(self, ws: ServerConnection, kind: str, count: int, audio_ms: float) -> None:
+        """Queue a partial or final for both channels covering the stream up to audio_ms."""
+        delay_ms = self.script.response_delay_ms + self.random.uniform(0.0, self.script.jitter_ms)
+        for channel_id in CHANNEL_IDS:
+            message = {
+                "type": kind,
+                "channel_id": channel_id,
+                "content": f"{kind} {count} [audio_ms={audio_ms:.0f}]",
+            }
+            task = asyncio.create_task(self.respond(ws, message, delay_ms))
+            self.pending.add(task)
+            task.add_done_callback(self.pending.discard)
+
+    async def handle(self, ws: ServerConnection) -> None:
+        """Serve one client connection."""
+        self.connections += 1
+        script = self.script
+        decoder = UplinkDecoder(codec_for_subprotocol(ws.subprotocol))
+        logger.debug(f"Connection {self.connections}: uplink {decoder.codec}")
+        received = 0
+        partials = finals = 0
+        try:
+            async for data in ws:
+                if not isinstance(data, bytes):
+                    continue
+                self.bytes_received += len(data)
+                frames = len(decoder.decode(data)) // BYTES_PER_FRAME
+                self.frames_received += frames
+                received += frames
+                audio_ms = received * 1000.0 / ASR_SAMPLE_RATE
+
+                # A final replaces the partial due at the same point
+                partial_due = script.partial_interval_ms > 0 and audio_ms >= (partials + 1) * script.partial_interval_ms
+                if partial_due:
+                    partials = int(audio_ms // script.partial_interval_ms)
+                if script.final_interval_ms > 0 and audio_ms >= (finals + 1) * script.final_interval_ms:
+                    finals = int(audio_ms // script.final_interval_ms)
+                    self.schedule(ws, "final", finals, audio_ms)
+                elif partial_due:
+                    self.schedule(ws, "partial", partials, audio_ms)
+
+                if 0 < script.disconnect_after_ms <= audio_ms:
+                    self.disconnects += 1
+                    await ws.close(1011, "scripted disconnect")
+                    break
+        except ConnectionClosed:
+            pass
+
+    async def serve(self, stop: asyncio.Event | None = None) -> None:
+        """Serve until stop is set (or forever)."""
+        async with serve(
+            self.handle,
+            "127.0.0.1",
+            self.port,
+            max_size=None,
+            subprotocols=[Subprotocol(subprotocol(codec)) for codec in self.codecs],
+            select_subprotocol=self.select_codec,
+        ):
+            logger.info(f"Stand-in ASR backend listening on ws://127.0.0.1:{self.port}")
+            await (stop or asyncio.Event()).wait()
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Stand-in ASR backend answering with scripted transcripts")
+    parser.add_argument(
+        "-p",
+        "--port",
+        type=int,
+        default=DEFAULT_STAND_IN_PORT,
+        help=f"Websocket port (default: {DEFAULT_STAND_IN_PORT})",
+    )
+    parser.add_argument(
+        "--partial-interval",
+        type=float,
+        default=DEFAULT_PARTIAL_INTERVAL_MS,
+        help=f"Milliseconds of audio per partial transcript, 0 for none (default: {DEFAULT_PARTIAL_INTERVAL_MS:g})",
+    )
+    parser.add_argument(
+        "--final-interval",
+        type=float,
+        default=DEFAULT_FINAL_INTERVAL_MS,
+        help=f"Milliseconds of audio per final transcript, 0 for none (default: {DEFAULT_FINAL_INTERVAL_MS:g})",
+    )
+    parser.add_argument(
+        "--response-delay",
+        type=float,
+        default=DEFAULT_RESPONSE_DELAY_MS,
+        help=f"Milliseconds between receiving audio and answering (default: {DEFAULT_RESPONSE_DELAY_MS:g})",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="Random extra response delay of up to this many milliseconds (default: 0)",
+    )
+    parser.add_argument(
+        "--disconnect-after",
+        type=float,
+        default=0.0,
+        help="Close each connection after this many milliseconds of audio, 0 for never (default: 0)",
+    )
+
+    parser.add_argument(
+        "--codecs",
+        type=str,
+        default=",".join(UPLINK_CODECS),
+        help=f"Uplink codecs to accept, comma-separated (default: {','.join(UPLINK_CODECS)})",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        codecs = parse_codecs(args.codecs)
+    except ValueError as e:
+        parser.error(str(e))
+
+    backend = StandInBackend(
+        args.port,
+        StandInScript(
+            partial_interval_ms=args.partial_interval,
+            final_interval_ms=args.final_interval,
+            response_delay_ms=args.response_delay,
+            jitter_ms=args.jitter,
+            disconnect_after_ms=args.disconnect_after,
+        ),
+        codecs=codecs,
+    )
+    try:
+        asyncio.run(backend.serve())
+    except KeyboardInterrupt:
+        logger.info("Keyboard interrupt received")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""
+Two-channel DSP stage for the ASR agent.
+
+The DSP worker hands the stage every raw block the two captures' callbacks left in their
+rings (see callback_buffer). Each block is converted and downmixed straight into its
+column of one (frames, 2) float32 array, and once both columns hold whole packets the
+aligned frames are resampled to 16 kHz, scaled, clipped and written as interleaved
+PCM16 into a reusable output array in one pass over both channels. Each packet's bytes
+are the websocket payload; the client only encodes and sends them.
+
+The pass runs at the captures' common rate when whole packets of it resample to whole
+packets at 16 kHz (48, 44.1, 32, 24, 16 and 8 kHz at every profile). A channel at any
+other rate is resampled block by block into the pass rate on the way in, which is how
+every block was handled before.
+"""
+
+import functools
+import math
+import queue
+import time
+from collections import deque
+from typing import Any
+
+import numpy as np
+from loguru import logger
+from scipy.signal import resample_poly
+
+from agents.asr.audio_capture import AudioCapture
+from agents.asr.stream_profiles import ASR_SAMPLE_RATE, DEFAULT_PROFILE, PROFILES, StreamProfile
+
+PCM16_SCALE = 32767.0
+
+
+def to_mono(block: np.ndarray[Any, Any]) -> np.ndarray[Any, Any]:
+    """Float32 mono copy in [-1, 1) of a (frames, channels) float32 or int16 block."""
+    mono = block.mean(axis=1, dtype=np.float32) if block.shape[1] > 1 else block[:, 0].astype(np.float32)
+    if block.dtype == np.int16:
+        mono *= 1.0 / 32768.0
+    return mono
+
+
+def pass_rate(rate_l: int, rate_r: int, packet_frames: int) -> int:
+    """Rate the aligned pass runs at: the channels' common rate if packets of it resample exactly, else 16 kHz."""
+    rate = rate_l or rate_r
+    if not rate or (rate_r and rate_r != rate):
+        return ASR_SAMPLE_RATE
+    packet_in, remainder = divmod(packet_frames * rate, ASR_SAMPLE_RATE)
+    if remainder or packet_in % (rate // math.gcd(rate, ASR_SAMPLE_RATE)):
+        return ASR_SAMPLE_RATE
+    return rate
+
+
+class StereoStage:
+    """Turns both captures' raw blocks into websocket packets of interleaved stereo PCM16 at 16 kHz."""
+
+    def __init__(self, capture_l: AudioCapture, capture_r: AudioCapture, profile: StreamProfile | None = None) -> None:
+        self.captures = (capture_l, capture_r)
+        self.profile = profile or PROFILES[DEFAULT_PROFILE]
+        self.packet_frames = self.profile.packet_frames
+        # Rate of the last block seen on each channel, and the rate the pass runs at
+        self.rates = [0, 0]
+        self.rate = ASR_SAMPLE_RATE
+        self.up = self.down = 1
+        self.packet_in = self.packet_frames
+        # Downmixed input of both channels at self.rate, one column each, and how much of each is filled
+        self.pending = np.zeros((0, 2), dtype=np.float32)
+        self.filled = [0, 0]
+        # (row in pending, capture time) of each pending block, per channel
+        self.block_times: tuple[deque[tuple[int, float]], deque[tuple[int, float]]] = (deque(), deque())
+        # Reusable output: whole packets of interleaved PCM16
+        self.output = np.zeros((self.packet_frames, 2), dtype=np.int16)
+        # Payloads with the capture time of their oldest audio, for the websocket client
+        self.packets: queue.Queue[tuple[bytes, float]] = queue.Queue(
+            maxsize=max(1, math.ceil(self.profile.buffer_seconds / self.profile.packet_duration - 1e-9))
+        )
+        # Unpaced replays wait for the websocket client rather than have their packets dropped
+        for side, capture in enumerate(self.captures):
+            capture.downstream_seconds = functools.partial(self.queued_seconds, side)
+        # Set by clear() from the websocket thread; the DSP worker drops its pending input
+        self.clear_requested = False
+        self.configure()
+
+        # Statistics
+        self.packets_produced = 0
+        self.packets_dropped = 0
+        self.frames_trimmed = 0
+        self.dsp_seconds = 0.0
+
+    def configure(self) -> None:
+        """Pick the pass rate for the channels' rates and size the input array; only while nothing is pending."""
+        self.rate = pass_rate(self.rates[0], self.rates[1], self.packet_frames)
+        common = math.gcd(self.rate, ASR_SAMPLE_RATE)
+        self.up, self.down = ASR_SAMPLE_RATE // common, self.rate // common
+        self.packet_in = self.packet_frames * self.down // self.up
+        # Two packets (when a silent channel is padded) plus the audio the profile buffers
+        capacity = 2 * self.packet_in + math.ceil(self.profile.buffer_seconds * self.rate)
+        if len(self.pending) != capacity:
+            self.pending = np.zeros((capacity, 2), dtype=np.float32)
+        self.filled = [0, 0]
+        for times in self.block_times:
+            times.clear()
+
+    def process(self) -> int:
+        """DSP worker: take every block waiting in both captures' rings and emit the packets they complete."""
+        if self.clear_requested:
+            self.clear_requested = False
+            self.configure()
+        start = time.perf_counter()
+        blocks = 0
+        for side, capture in enumerate(self.captures):
+            ring = capture.ring
+            count = 0
+            while (entry := ring.peek()) is not None:
+                block, sample_rate, capture_time = entry
+                try:
+                    self.push(side, block, sample_rate, capture_time)
+                except Exception as e:
+                    logger.debug(f"Audio processing error: {e}")
+                ring.release()
+                count += 1
+            capture.frames_captured += count
+            blocks += count
+        if blocks:
+            self.flush()
+            self.dsp_seconds += time.perf_counter() - start
+        return blocks
+
+    def push(self, side: int, block: np.ndarray[Any, Any], sample_rate: int, capture_time: float) -> None:
+        """Convert and downmix a raw (frames, channels) block into its channel's column."""
+        if sample_rate != self.rates[side]:
+            self.rates[side] = sample_rate
+            if self.filled == [0, 0]:
+                self.configure()
+
+        mono = None
+        if sample_rate != self.rate:
+            # Channels at different rates: bring this one to the pass rate block by block
+            common = math.gcd(self.rate, sample_rate)
+            mono = resample_poly(to_mono(block), self.rate // common, sample_rate // common)
+        frames = len(block) if mono is None else len(mono)
+        capacity = len(self.pending)
+        if frames > capacity:
+            skip = frames - capacity
+            if mono is None:
+                block = block[skip:]
+            else:
+                mono = mono[skip:]
+            self.frames_trimmed += skip
+            frames = capacity
+        if self.filled[side] + frames > capacity:
+            # The other channel has fallen this far behind: drop this channel's oldest audio
+            overflow = self.filled[side] + frames - capacity
+            self.consume(side, overflow)
+            self.frames_trimmed += overflow
+
+        start = self.filled[side]
+        column = self.pending[start : start + frames, side]
+        if mono is not None:
+            column[:] = mono
+        else:
+            np.sum(block, axis=1, dtype=np.float32, out=column)
+            column *= (1.0 / 32768.0 if block.dtype == np.int16 else 1.0) / block.shape[1]
+        self.block_times[side].append((start, capture_time))
+        self.filled[side] = start + frames
+
+    def flush(self) -> int:
+        """Resample, scale, clip and interleave the whole packets both columns hold, in one pass; packets emitted."""
+        filled_l, filled_r = self.filled
+        packets = min(filled_l, filled_r) // self.packet_in
+        if packets == 0 and max(filled_l, filled_r) >= 2 * self.packet_in:
+            # A channel with no audio (WASAPI loopback delivers nothing while nothing plays)
+            # is padded with silence once the other is a whole packet ahead
+            short = 0 if filled_l < filled_r else 1
+            self.pending[self.filled[short] : self.packet_in, short] = 0.0
+            self.filled[short] = self.packet_in
+            packets = 1
+        if packets == 0:
+            return 0
+
+        frames_in = packets * self.packet_in
+        frames_out = packets * self.packet_frames
+        aligned = self.pending[:frames_in]
+        stereo = resample_poly(aligned, self.up, self.down, axis=0) if self.rate != ASR_SAMPLE_RATE else aligned
+        # In place: the input rows are consumed below either way
+        np.multiply(stereo, PCM16_SCALE, out=stereo)
+        np.clip(stereo, -PCM16_SCALE - 1.0, PCM16_SCALE, out=stereo)
+        if len(self.output) < frames_out:
+            self.output = np.zeros((frames_out, 2), dtype=np.int16)
+        np.copyto(self.output[:frames_out], stereo[:frames_out], casting="unsafe")
+
+        for index in range(packets):
+            capture_time = min(
+                (self.time_at(side, index * self.packet_in) for side in (0, 1) if self.block_times[side]),
+                default=time.monotonic(),
+            )
+            payload = self.output[index * self.packet_frames : (index + 1) * self.packet_frames].tobytes()
+            if self.packets.full():
+                try:
+                    self.packets.get_nowait()
+                    self.packets_dropped += 1
+                except queue.Empty:
+                    pass
+            self.packets.put_nowait((payload, capture_time))
+        self.packets_produced += packets
+
+        for side in (0, 1):
+            self.consume(side, frames_in)
+        return packets
+
+    def time_at(self, side: int, row: int) -> float:
+        """Capture time of the block holding a pending row of a channel."""
+        times = self.block_times[side]
+        capture_time = times[0][1]
+        for start, block_time in times:
+            if start > row:
+                break
+            capture_time = block_time
+        return capture_time
+
+    def consume(self, side: int, frames: int) -> None:
+        """Drop a channel's oldest frames and move the rest to the front of its column."""
+        filled = self.filled[side]
+        frames = min(frames, filled)
+        column = self.pending[:, side]
+        column[: filled - frames] = column[frames:filled]
+        self.filled[side] = filled - frames
+        times = self.block_times[side]
+        while len(times) > 1 and times[1][0] <= frames:
+            times.popleft()
+        if times:
+            if self.filled[side] == 0:
+                times.clear()
+            else:
+                rebased = [(max(0, start - frames), block_time) for start, block_time in times]
+                times.clear()
+                times.extend(rebased)
+
+    def queued_seconds(self, side: int) -> float:
+        """Audio of a channel not yet sent: its pending column and the packets waiting in the queue."""
+        return self.filled[side] / self.rate + self.packets.qsize() * self.profile.packet_duration
+
+    def get_packet_nowait(self) -> tuple[bytes, float] | None:
+        """Next payload and the capture time of its oldest audio, without blocking."""
+        try:
+            return self.packets.get_nowait()
+        except queue.Empty:
+            return None
+
+    def clear(self) -> None:
+        """Drop queued packets now and pending input at the worker's next pass, as a new connection starts."""
+        self.clear_requested = True
+        while self.get_packet_nowait() is not None:
+            pass
@@ -0,0 +1,73 @@
+"""
+Streaming profiles for the ASR agent.
+
+A profile sets the knobs that trade latency against CPU and packet rate together:
+
+    block_duration      seconds per capture callback (device blocksize)
+    packet_duration     seconds of audio per websocket message; smaller blocks are
+                        coalesced until a packet is full
+    buffer_seconds      audio each capture queues before dropping its oldest blocks
+    keepalive_seconds   silence is sent after this long without audio, which also lets
+                        the backend finalize the last utterance sooner
+    poll_seconds        how often the sender checks the capture queues when idle
+
+balanced keeps the values the agent always used (50 ms blocks sent as they arrive).
+"""
+
+import math
+from dataclasses import asdict, dataclass
+from typing import Any
+
+ASR_SAMPLE_RATE = 16000
+
+
+@dataclass(frozen=True, slots=True)
+class StreamProfile:
+    """Capture and packetization settings applied together."""
+
+    name: str
+    block_duration: float
+    packet_duration: float
+    buffer_seconds: float
+    keepalive_seconds: float
+    poll_seconds: float
+
+    @property
+    def queue_depth(self) -> int:
+        """Capture blocks buffered per channel."""
+        return max(1, math.ceil(self.buffer_seconds / self.block_duration - 1e-9))
+
+    @property
+    def packet_frames(self) -> int:
+        """Frames per websocket message at the uplink rate."""
+        return max(1, round(self.packet_duration * ASR_SAMPLE_RATE))
+
+    def summary(self) -> dict[str, Any]:
+        """Effective values, for stats and benchmark reports."""
+        return {**asdict(self), "queue_depth": self.queue_depth, "packet_frames": self.packet_frames}
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name} (blocks {self.block_duration * 1000:g} ms, packets {self.packet_duration * 1000:g} ms, "
+            f"buffer {self.queue_depth} blocks, keepalive {self.keepalive_seconds:g}s)"
+        )
+
+
+PROFILES: dict[str, StreamProfile] = {
+    profile.name: profile
+    for profile in (
+        StreamProfile("low-latency", 0.02, 0.02, 0.1, 1.0, 0.005),
+        StreamProfile("balanced", 0.05, 0.05, 0.2, 10.0, 0.01),
+        StreamProfile("low-cpu", 0.1, 0.2, 0.6, 10.0, 0.05),
+    )
+}
+DEFAULT_PROFILE = "balanced"
+
+
+def get_profile(name: str) -> StreamProfile:
+    """Profile by name; ValueError for an unknown one."""
+    try:
+        return PROFILES[name.lower()]
+    except KeyError:
+        msg = f"Unknown streaming profile '{name}', expected one of: {', '.join(PROFILES)}"
+        raise ValueError(msg) from None
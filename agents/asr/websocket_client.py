@@ -7,15 +7,16 @@ import contextlib
 import json
 from collections.abc import Callable
 
-import numpy as np
 import websockets
 from loguru import logger
 from websockets import ClientConnection
+from websockets.typing import Subprotocol
 
-from agents.asr.audio_capture import AudioCapture
+from agents.asr.stereo_stage import StereoStage
+from agents.asr.stream_profiles import DEFAULT_PROFILE, PROFILES, StreamProfile
+from agents.asr.uplink_codec import PCM16, UplinkEncoder, codec_for_subprotocol, subprotocol
 
 # WebSocket configuration constants
-SILENCE_INTERVAL_SECONDS = 10.0
 SILENCE_FRAME = b"\x00" * 320  # 20 ms @ 16kHz PCM16
 RECONNECT_DELAY_SECONDS = 1.0
 MAX_RECONNECT_ATTEMPTS = 0  # 0 = infinite
@@ -27,18 +28,27 @@ class WebSocketASRClient:
     def __init__(
         self,
         backend_url: str,
-        audio_capture_l: AudioCapture,
-        audio_capture_r: AudioCapture,
+        stage: StereoStage,
         on_partial: Callable[[str, str], None] | None = None,
         on_final: Callable[[str, str], None] | None = None,
         session_token: str | None = None,
+        on_sent: Callable[[int, float], None] | None = None,
+        uplink_codecs: list[str] | None = None,
+        profile: StreamProfile | None = None,
     ) -> None:
         self.backend_url = backend_url
-        self.audio_capture_l = audio_capture_l
-        self.audio_capture_r = audio_capture_r
+        # Packets of both captures, ready to send (see stereo_stage)
+        self.stage = stage
         self.on_partial = on_partial
         self.on_final = on_final
+        # Called after each audio chunk is sent with its stereo frame count and the capture time of its audio
+        self.on_sent = on_sent
         self.session_token = session_token
+        # Codecs to offer the backend in order of preference; PCM is always the fallback
+        self.uplink_codecs = [codec for codec in uplink_codecs or [] if codec != PCM16]
+        self.encoder = UplinkEncoder()
+        # Keepalive and polling (see stream_profiles)
+        self.profile = profile or PROFILES[DEFAULT_PROFILE]
 
         # Connection state
         self.ws: ClientConnection | None = None
@@ -47,44 +57,31 @@ class WebSocketASRClient:
         self.reconnect_attempts = 0
         self.stop_event = asyncio.Event()
 
+        # Capture time (monotonic) of the oldest audio in the chunk get_next_audio returned last
+        self.chunk_capture_time = 0.0
+
         # Statistics
         self.transcripts_received = 0
+        self.connections = 0
+        self.chunks_sent = 0
+        self.frames_sent = 0
+        # Bytes on the wire, after uplink encoding
+        self.bytes_sent = 0
 
     async def get_next_audio(self) -> bytes:
-        """Get next audio chunk from both capture channels and mix to stereo."""
+        """Wait for the stereo stage's next packet of interleaved stereo PCM16."""
         while True:
             if self.stop_event.is_set():
                 msg = "Stop requested"
                 raise asyncio.CancelledError(msg)
 
-            # Fetch both channels concurrently
-            data_l = self.audio_capture_l.get_frame_nowait()
-            data_r = self.audio_capture_r.get_frame_nowait()
-
-            if data_l is None and data_r is None:
-                await asyncio.sleep(0.01)  # No audio available, wait briefly before retrying
-                continue  # No audio available, will trigger silence frame in send loop
-
-            if data_l is None:
-                data_l = np.zeros_like(data_r)
-            if data_r is None:
-                data_r = np.zeros_like(data_l)
-
-            # Ensure same length (important!)
-            n = min(len(data_l), len(data_r))
-            data_l = data_l[:n]
-            data_r = data_r[:n]
-
-            # Convert to PCM16
-            pcm16_l = (data_l * 32767).astype(np.int16)
-            pcm16_r = (data_r * 32767).astype(np.int16)
+            packet = self.stage.get_packet_nowait()
+            if packet is None:
+                await asyncio.sleep(self.profile.poll_seconds)  # No audio yet, wait briefly before retrying
+                continue  # No audio for a while will trigger a silence frame in the send loop
 
-            # Mix to stereo (interleaved L/R samples)
-            stereo = np.empty((pcm16_l.size + pcm16_r.size,), dtype=np.int16)
-            stereo[0::2] = pcm16_l
-            stereo[1::2] = pcm16_r
-
-            return stereo.tobytes()
+            pcm, self.chunk_capture_time = packet
+            return pcm
 
     async def send_audio_loop(self, ws: ClientConnection) -> None:
         """Send audio frames to websocket."""
@@ -99,12 +96,12 @@ class WebSocketASRClient:
                     # Get audio with timeout
                     pcm_bytes = await asyncio.wait_for(
                         self.get_next_audio(),
-                        timeout=SILENCE_INTERVAL_SECONDS,
+                        timeout=self.profile.keepalive_seconds,
                     )
                 except TimeoutError:
                     # Send silence frame to keep connection alive
                     try:
-                        await ws.send(SILENCE_FRAME)
+                        await ws.send(self.encoder.encode(SILENCE_FRAME))
                         logger.debug("Sent silence frame")
                     except Exception as e:
                         logger.error(f"Failed to send silence: {e}")
@@ -112,15 +109,25 @@ class WebSocketASRClient:
                     continue
 
                 # Send audio data
+                payload = self.encoder.encode(pcm_bytes)
                 try:
-                    await ws.send(pcm_bytes)
+                    await ws.send(payload)
                 except Exception as e:
                     logger.error(f"Failed to send audio: {e}")
                     raise
+                frames = len(pcm_bytes) // 4
+                self.chunks_sent += 1
+                self.frames_sent += frames
+                self.bytes_sent += len(payload)
+                if self.on_sent:
+                    self.on_sent(frames, self.chunk_capture_time)
 
         except asyncio.CancelledError:
             logger.info("Send loop cancelled")
             raise
+        except websockets.exceptions.ConnectionClosed:
+            # Reported once by connect_and_stream
+            raise
         except Exception as e:
             logger.exception(f"Send loop error: {e}")
             raise
@@ -168,6 +175,9 @@ class WebSocketASRClient:
         except asyncio.CancelledError:
             logger.info("Receive loop cancelled")
             raise
+        except websockets.exceptions.ConnectionClosed:
+            # Reported once by connect_and_stream
+            raise
         except Exception as e:
             logger.exception(f"Receive loop error: {e}")
             raise
@@ -179,23 +189,31 @@ class WebSocketASRClient:
         logger.info(f"Connecting to backend websocket: {self.backend_url}")
 
         try:
-            self.audio_capture_l.clear_queue()
-            self.audio_capture_r.clear_queue()
+            self.stage.clear()
 
             # Prepare headers for authenticated connection if token provided
             additional_headers: dict[str, str] = {}
             if self.session_token:
                 additional_headers["cookie"] = f"session_token={self.session_token}"
 
+            # Offer compressed uplink codecs as subprotocols; a backend that picks none gets PCM
+            subprotocols = None
+            if self.uplink_codecs:
+                subprotocols = [Subprotocol(subprotocol(codec)) for codec in [*self.uplink_codecs, PCM16]]
+
             async with websockets.connect(
                 self.backend_url,
                 ping_timeout=None,
                 close_timeout=5,
                 additional_headers=additional_headers,
+                subprotocols=subprotocols,
             ) as ws:
-                logger.info("Connected to backend websocket")
+                # Encoder state is per connection
+                self.encoder = UplinkEncoder(codec_for_subprotocol(ws.subprotocol))
+                logger.info(f"Connected to backend websocket (uplink: {self.encoder.codec})")
                 self.ws = ws
                 self.connected = True
+                self.connections += 1
 
                 # Run send and receive loops concurrently
                 await asyncio.gather(
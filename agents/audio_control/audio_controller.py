@@ -1,31 +1,569 @@
-from collections import deque
-from typing import Any
+import queue
+import time
+from typing import TYPE_CHECKING, Any
 
 import numpy as np
-import sounddevice as sd
 from loguru import logger
 
+from agents.audio_control.av_sync import DEFAULT_SYNC_HYSTERESIS_MS, SyncTracker, VideoLatencySubscriber
+from agents.audio_control.buffering import DEFAULT_MAX_BLOCKSIZE, BlocksizeController
+from agents.audio_control.delay_line import DelayReader, SampleRing
+from agents.audio_control.resampler import LinearResampler
+from agents.audio_control.routing import (
+    DEFAULT_MAX_OUTPUT_CHANNELS,
+    ChannelMap,
+    Route,
+    RouteConfig,
+    default_channel_map,
+)
 from agents.shared.audio_device_service import AudioDeviceService
+from agents.shared.capture_bus import CaptureBusReader
+from agents.shared.control import ControlError, ControlServer, number_field
+from agents.shared.device_registry import MME_NAME_LENGTH
+from agents.shared.device_watcher import DeviceChange, DeviceWatcher
+
+if TYPE_CHECKING:
+    import sounddevice as sd
+
+DEFAULT_BLOCKSIZE = 256
+# Capture rate assumed until the input device reports its native rate
+DEFAULT_SAMPLE_RATE = 44100
+DEFAULT_MAX_DELAY_MS = 2000.0
+DEFAULT_CROSSFADE_MS = 50.0
+STATS_INTERVAL_SECONDS = 10.0
+# How often the main loop checks xrun counters for the block size controller
+BUFFERING_CHECK_INTERVAL_SECONDS = 1.0
+# Streams that have not called back for this long are treated as lost (e.g. device unplugged)
+STALL_SECONDS = 2.0
+
+# Ring headroom beyond the requested delay, in blocks
+DELAY_HEADROOM_BLOCKS = 8
+
+# Number of recent input-to-output latency measurements kept for percentiles
+LATENCY_HISTORY = 512
 
 
 class AudioController:
-    """Processes audio with configurable delay and routes to VBCABLE."""
+    """Processes audio with configurable delay and routes to VBCABLE and any extra output routes."""
 
-    def __init__(self, input_device_name: str, delay_ms: float) -> None:
+    def __init__(
+        self,
+        input_device_name: str,
+        delay_ms: float,
+        blocksize: int = DEFAULT_BLOCKSIZE,
+        max_blocksize: int = DEFAULT_MAX_BLOCKSIZE,
+        max_delay_ms: float = DEFAULT_MAX_DELAY_MS,
+        crossfade_ms: float = DEFAULT_CROSSFADE_MS,
+        control_port: int = 0,
+        video_feedback_port: int = 0,
+        sync_offset_ms: float = 0.0,
+        sync_min_ms: float = 0.0,
+        sync_max_ms: float | None = None,
+        sync_hysteresis_ms: float = DEFAULT_SYNC_HYSTERESIS_MS,
+        routes: list[RouteConfig] | None = None,
+        watch_devices: bool = True,  # noqa: FBT001, FBT002
+        capture_bus: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
         self.input_device_name = input_device_name
         self.delay_ms = delay_ms
+        self.route_configs = routes or []
+        self.max_delay_ms = max(max_delay_ms, delay_ms, *(config.delay_ms for config in self.route_configs))
+        self.crossfade_ms = crossfade_ms
+        self.control_port = control_port
+        self.control_server: ControlServer | None = None
         self.running = False
 
-        # Audio configuration
-        self.chunk_size = 1024
-        self.sample_rate = 44100
-        self.channels = 2
-        self.dtype = np.int16
+        # Automatic A/V sync: follow the virtual camera agent's video latency (0 port = manual only)
+        self.video_feedback_port = video_feedback_port
+        self.sync = SyncTracker(
+            min_delay_ms=sync_min_ms,
+            max_delay_ms=min(self.max_delay_ms, sync_max_ms if sync_max_ms is not None else self.max_delay_ms),
+            offset_ms=sync_offset_ms,
+            hysteresis_ms=sync_hysteresis_ms,
+        )
+        self.sync.enabled = video_feedback_port > 0
+        self.sync_subscriber: VideoLatencySubscriber | None = None
+
+        # Audio configuration; rates and channel counts are the devices' native ones once start() opens them
+        self.blocksize = blocksize
+        self.buffering = BlocksizeController(blocksize, max_blocksize)
+        self.sample_rate = DEFAULT_SAMPLE_RATE
+        self.output_rate = DEFAULT_SAMPLE_RATE
+        self.channels = 1
+        self.input_channels = 1
+        self.dtype = "float32"
+        self.stream_latency = (0.0, 0.0)
+
+        # Shared capture ring and output routes; rebuilt by configure() once the input is known
+        self.delay_samples = self.ms_to_samples(delay_ms)
+        self.ring: SampleRing
+        self.primary: Route
+        self.routes: list[Route] = []
+        # Extra routes' output devices as (route, device index, channels, sample rate)
+        self.route_outputs: list[tuple[Route, int, int, int]] = []
+        self.input_device_index = -1
+        self.output_device_index = -1
+        self.streams: list[sd.Stream | sd.InputStream | sd.OutputStream] = []
+        self.configure(self.input_channels)
+
+        # Capture bus: read the input from the capture bus agent's shared memory instead of opening it
+        self.capture_bus = capture_bus
+        self.bus_reader: CaptureBusReader | None = None
+
+        # Hot-plug: device changes arrive from the watcher thread and are handled by the main loop
+        self.watch_devices = watch_devices
+        self.watcher: DeviceWatcher | None = None
+        self.device_changes: queue.SimpleQueue[DeviceChange] = queue.SimpleQueue()
+        self.waiting_for_devices = False
+        # Time of the last callback before a migration; the next callback measures the gap from it
+        self.gap_start: float | None = None
+
+        # Statistics (written by the audio callbacks)
+        self.callbacks = 0
+        self.last_callback_time = 0.0
+        self.migration_gaps_ms: list[float] = []
+        self.input_overflows = 0
+        self.latency_ms = np.zeros(LATENCY_HISTORY, dtype=np.float64)
+        self.latency_count = 0
+
+    def ms_to_samples(self, ms: float) -> int:
+        """Convert milliseconds to a whole number of samples."""
+        return round(ms * self.sample_rate / 1000.0)
+
+    def output_blocksize(self, rate: int) -> int:
+        """Block size at an output rate covering the same time as one capture block."""
+        return max(1, round(self.blocksize * rate / self.sample_rate))
+
+    @property
+    def duplex(self) -> bool:
+        """True when the VB-Cable output runs at the capture rate and shares one duplex stream with it."""
+        return self.output_rate == self.sample_rate and self.bus_reader is None
 
-        # Calculate delay buffer size in chunks
-        delay_seconds = delay_ms / 1000.0
-        self.delay_chunks = int((delay_seconds * self.sample_rate) / self.chunk_size)
-        self.delay_buffer: deque[np.ndarray[Any, Any]] = deque(maxlen=max(1, self.delay_chunks))
+    def configure(
+        self,
+        input_channels: int,
+        sample_rate: int = DEFAULT_SAMPLE_RATE,
+        output_channels: int = 1,
+        output_rate: int | None = None,
+    ) -> None:
+        """Allocate the capture ring for the input's rate and channels and set up the primary (VB-Cable) route."""
+        self.input_channels = input_channels
+        self.sample_rate = sample_rate
+        self.channels = output_channels
+        self.output_rate = output_rate or sample_rate
+        self.delay_samples = self.ms_to_samples(self.delay_ms)
+
+        # Preallocated for the largest delay of any route plus a few of the largest blocks
+        headroom = DELAY_HEADROOM_BLOCKS * max(self.buffering.max_blocksize, DEFAULT_BLOCKSIZE)
+        capacity = self.ms_to_samples(self.max_delay_ms) + headroom
+        self.ring = SampleRing(capacity, input_channels)
+        self.primary = self.make_route(
+            "VB-Cable",
+            self.delay_samples,
+            default_channel_map(input_channels, output_channels),
+            rate=self.output_rate,
+        )
+        self.routes = [self.primary]
+
+    def make_route(
+        self,
+        name: str,
+        delay: int,
+        channel_map: ChannelMap,
+        gain_db: float = 0.0,
+        *,
+        rate: int,
+    ) -> Route:
+        """Create a route reading the capture ring, resampling only if the device rate differs."""
+        resampler = None
+        if rate != self.sample_rate:
+            resampler = LinearResampler(self.sample_rate, rate, self.input_channels)
+        return Route(name, DelayReader(self.ring, delay), channel_map, gain_db, resampler)
+
+    def describe_path(self, route: Route, rate: int) -> str:
+        """Human-readable conversion path of a route, for the startup log."""
+        steps = [f"{self.input_channels}ch {self.sample_rate}Hz capture"]
+        steps.append(f"resample to {rate}Hz" if route.resampler else "no resampling")
+        if route.channel_map != [[channel] for channel in range(self.input_channels)]:
+            steps.append(f"channel map {route.channel_map}")
+        return " -> ".join([*steps, f"{route.output_channels}ch output"])
+
+    def route_for(self, config: RouteConfig, name: str, channels: int, rate: int) -> Route:
+        """Create the route a config describes on an output of channels at rate; ValueError if they do not fit."""
+        channel_map = config.channel_map or default_channel_map(self.input_channels, channels)
+        if len(channel_map) != channels:
+            msg = f"channel map has {len(channel_map)} outputs, device uses {channels}"
+            raise ValueError(msg)
+        return self.make_route(name, self.ms_to_samples(config.delay_ms), channel_map, config.gain_db, rate=rate)
+
+    def add_route(self, config: RouteConfig) -> bool:
+        """Create an extra output route; returns False if its device cannot be used."""
+        index = AudioDeviceService.get_output_device_index_by_name(config.device)
+        device = AudioDeviceService.get_device_info_by_index(index) if index >= 0 else {}
+        if not device:
+            logger.error(f"Route output device '{config.device}' not found, skipping route")
+            return False
+
+        channels = config.channels or min(int(device["max_output_channels"]), DEFAULT_MAX_OUTPUT_CHANNELS)
+        rate = int(device.get("default_samplerate") or self.sample_rate)
+        try:
+            route = self.route_for(config, device["name"], channels, rate)
+        except ValueError as e:
+            logger.error(f"Route '{config.device}': {e}")
+            return False
+
+        self.routes.append(route)
+        self.route_outputs.append((route, int(device["index"]), channels, rate))
+        logger.info(
+            f"Route {len(self.routes) - 1}: {route.name}, delay {config.delay_ms:g}ms, gain {config.gain_db:g}dB, "
+            f"path {self.describe_path(route, rate)}"
+        )
+        return True
+
+    def open_streams(self) -> None:
+        """Open and start the capture, VB-Cable and route streams at the current block size."""
+        # Imported where streams are opened: loading sounddevice needs the PortAudio library,
+        # which render mode runs without
+        import sounddevice as sd  # noqa: PLC0415
+
+        if self.duplex:
+            # One duplex stream: each callback reads input and writes output for the same block
+            stream = sd.Stream(
+                device=(self.input_device_index, self.output_device_index),
+                channels=(self.input_channels, self.channels),
+                samplerate=self.sample_rate,
+                blocksize=self.blocksize,
+                dtype=self.dtype,
+                latency="low",
+                callback=self.callback,
+            )
+            self.streams = [stream]
+            self.stream_latency = stream.latency
+        else:
+            # Rates differ (or the capture bus feeds the ring): capture and VB-Cable output run as
+            # separate streams joined by the ring
+            input_latency = 0.0
+            self.streams = []
+            if self.bus_reader is None:
+                input_stream = sd.InputStream(
+                    device=self.input_device_index,
+                    channels=self.input_channels,
+                    samplerate=self.sample_rate,
+                    blocksize=self.blocksize,
+                    dtype=self.dtype,
+                    latency="low",
+                    callback=self.input_callback,
+                )
+                self.streams.append(input_stream)
+                input_latency = input_stream.latency
+            output_stream = sd.OutputStream(
+                device=self.output_device_index,
+                channels=self.channels,
+                samplerate=self.output_rate,
+                blocksize=self.output_blocksize(self.output_rate),
+                dtype=self.dtype,
+                latency="low",
+                callback=self.primary_callback,
+            )
+            self.streams.append(output_stream)
+            self.stream_latency = (input_latency, output_stream.latency)
+
+        # Each route pulls from the ring in its own callback, so a slow device only underruns itself
+        for route, device_index, channels, rate in self.route_outputs:
+            if device_index < 0:
+                logger.warning(f"Route '{route.name}': device not present, route is silent")
+                continue
+            try:
+                self.streams.append(
+                    sd.OutputStream(
+                        device=device_index,
+                        channels=channels,
+                        samplerate=rate,
+                        blocksize=self.output_blocksize(rate),
+                        dtype=self.dtype,
+                        latency="low",
+                        callback=route.callback,
+                    )
+                )
+            except sd.PortAudioError as e:
+                logger.error(f"Route '{route.name}': failed to open output stream, route is silent: {e}")
+
+        for stream in self.streams:
+            stream.start()
+
+    def close_streams(self) -> None:
+        """Stop and close every open stream."""
+        import sounddevice as sd  # noqa: PLC0415
+
+        for stream in self.streams:
+            try:
+                stream.close()
+            except sd.PortAudioError as e:
+                logger.warning(f"Error closing audio stream: {e}")
+        self.streams = []
+
+    def reopen_streams(self, blocksize: int) -> None:
+        """Restart all streams at a new block size; the ring and each route's delay are kept."""
+        import sounddevice as sd  # noqa: PLC0415
+
+        logger.info(f"Adaptive buffering: block size {self.blocksize} -> {blocksize} after {self.xruns()} xruns")
+        previous = self.blocksize
+        self.close_streams()
+        self.blocksize = blocksize
+        # Latency measured at the old block size no longer applies
+        self.latency_count = 0
+        try:
+            self.open_streams()
+        except sd.PortAudioError as e:
+            logger.error(f"Failed to reopen streams with block size {blocksize}, keeping {previous}: {e}")
+            self.close_streams()
+            self.blocksize = self.buffering.blocksize = previous
+            self.open_streams()
+
+    def attach_bus(self, input_info: dict[str, Any]) -> dict[str, Any]:
+        """With capture_bus, read the input from its bus if one is published; returns the input as it is read."""
+        if self.bus_reader is not None:
+            self.bus_reader.close()
+            self.bus_reader = None
+        if not self.capture_bus:
+            return input_info
+
+        try:
+            self.bus_reader = CaptureBusReader(input_info["name"])
+        except (FileNotFoundError, ValueError) as e:
+            logger.info(f"No capture bus for '{input_info['name']}' ({e}); opening the device directly")
+            return input_info
+        logger.info(f"Reading '{input_info['name']}' from capture bus {self.bus_reader.name}")
+        return {
+            **input_info,
+            "max_input_channels": self.bus_reader.channels,
+            "default_samplerate": self.bus_reader.sample_rate,
+        }
+
+    def pull_bus(self) -> None:
+        """Copy everything new on the capture bus into the ring; stands in for the input callback."""
+        if self.bus_reader is None:
+            return
+        pulled = False
+        while len(block := self.bus_reader.read(self.ring.capacity)):
+            self.ring.write(block)
+            pulled = True
+        if pulled:
+            self.callbacks += 1
+            self.mark_callback()
+
+    def stalled(self) -> bool:
+        """True if streams are open but have stopped calling back, as when their device is removed."""
+        return (
+            bool(self.streams)
+            and self.last_callback_time > 0
+            and time.monotonic() - self.last_callback_time > STALL_SECONDS
+        )
+
+    def uses_device(self, change: DeviceChange) -> bool:
+        """True if a change removed a device this controller plays to or captures from."""
+        names = [self.input_device_name, AudioDeviceService.VB_AUDIO_INPUT_DEVICE_NAME]
+        names += [route.name for route, _, _, _ in self.route_outputs]
+        # MME names are truncated, so compare on the truncated length
+        return any(
+            removed.startswith(name[:MME_NAME_LENGTH])
+            for removed in change.removed_inputs + change.removed_outputs
+            for name in names
+        )
+
+    def handle_device_changes(self) -> None:
+        """Main loop: migrate if a device change (or a stall) affects our streams."""
+        migrate = self.stalled()
+        if migrate:
+            logger.warning(f"Audio streams stalled for over {STALL_SECONDS:g}s")
+        while not self.device_changes.empty():
+            change = self.device_changes.get_nowait()
+            # While waiting, any arrival may be the device we are missing
+            migrate = migrate or self.uses_device(change) or self.waiting_for_devices
+        if migrate:
+            self.migrate()
+
+    def migrate(self) -> None:
+        """
+        Move all streams to the devices now present, keeping the ring and every route's delay.
+
+        PortAudio only sees new devices after being re-initialized, which needs every stream
+        closed, so the streams are always reopened. The ring and routes are rebuilt only if
+        the capture's channel count or rate changed.
+        """
+        import sounddevice as sd  # noqa: PLC0415
+
+        if self.gap_start is None:
+            self.gap_start = self.last_callback_time or time.monotonic()
+        self.close_streams()
+        AudioDeviceService.reinitialize_portaudio()
+
+        input_index = AudioDeviceService.get_device_index_by_name(self.input_device_name)
+        output_index = AudioDeviceService.get_vb_input_device_index()
+        if input_index < 0 or output_index < 0:
+            missing = self.input_device_name if input_index < 0 else "VB-Cable"
+            if not self.waiting_for_devices:
+                logger.warning(f"Audio device '{missing}' is gone; waiting for it to come back")
+            self.waiting_for_devices = True
+            return
+
+        input_info = self.attach_bus(AudioDeviceService.get_device_info_by_index(input_index))
+        output_info = AudioDeviceService.get_device_info_by_index(output_index)
+        device_format = self.device_format(input_info, output_info)
+        if device_format != (self.input_channels, self.sample_rate, self.channels, self.output_rate):
+            logger.info(f"Device format changed to {device_format}; rebuilding the ring and routes")
+            self.configure(*device_format)
+            self.route_outputs = []
+            for config in self.route_configs:
+                self.add_route(config)
+        else:
+            self.route_outputs = [
+                (route, AudioDeviceService.get_output_device_index_by_name(route.name), channels, rate)
+                for route, _, channels, rate in self.route_outputs
+            ]
+
+        self.input_device_index = input_index
+        self.output_device_index = output_index
+        try:
+            self.open_streams()
+        except sd.PortAudioError as e:
+            logger.error(f"Failed to reopen audio streams: {e}")
+            self.close_streams()
+            self.waiting_for_devices = True
+            return
+
+        # Restart the stall clock: a stream that stays silent is migrated again after
+        # STALL_SECONDS, not on every pass of the main loop
+        self.last_callback_time = time.monotonic()
+        self.waiting_for_devices = False
+        logger.info(f"Audio migrated to '{input_info['name']}' -> '{output_info['name']}'")
+
+    @staticmethod
+    def device_format(input_info: dict[str, Any], output_info: dict[str, Any]) -> tuple[int, int, int, int]:
+        """Native (input channels, input rate, output channels, output rate) of a device pair."""
+        return (
+            int(input_info["max_input_channels"]),
+            int(input_info.get("default_samplerate") or DEFAULT_SAMPLE_RATE),
+            min(int(output_info["max_output_channels"]), DEFAULT_MAX_OUTPUT_CHANNELS),
+            int(output_info.get("default_samplerate") or DEFAULT_SAMPLE_RATE),
+        )
+
+    def mark_callback(self) -> None:
+        """Note that the capture called back; closes the gap of a pending migration."""
+        now = time.monotonic()
+        if self.gap_start is not None:
+            self.migration_gaps_ms.append((now - self.gap_start) * 1000.0)
+            self.gap_start = None
+        self.last_callback_time = now
+
+    def xruns(self) -> int:
+        """Total xruns across all streams: capture overflows and output underflows."""
+        return self.input_overflows + sum(route.output_underflows for route in self.routes)
+
+    def route_by_index(self, index: int) -> Route:
+        """Look up a route by its index (0 is the VB-Cable route)."""
+        if not 0 <= index < len(self.routes):
+            msg = f"route must be between 0 and {len(self.routes) - 1}"
+            raise ControlError(msg)
+        return self.routes[index]
+
+    def set_delay(self, delay_ms: float, crossfade_ms: float | None = None, route: int = 0) -> dict[str, Any]:
+        """Change a route's delay while running, crossfading from the old delay to avoid clicks."""
+        if not 0 <= delay_ms <= self.max_delay_ms:
+            msg = f"delay_ms must be between 0 and {self.max_delay_ms:g}"
+            raise ControlError(msg)
+        target = self.route_by_index(route)
+        crossfade_ms = self.crossfade_ms if crossfade_ms is None else max(0.0, crossfade_ms)
+
+        delay_samples = self.ms_to_samples(delay_ms)
+        target.reader.set_delay(delay_samples, self.ms_to_samples(crossfade_ms))
+        logger.info(
+            f"Delay of {target.name} set to {delay_ms:g}ms ({delay_samples} samples, {crossfade_ms:g}ms crossfade)"
+        )
+        if target is self.primary:
+            self.delay_samples = delay_samples
+            self.delay_ms = delay_ms
+        return {"route": route, "delay_ms": delay_ms, "delay_samples": delay_samples, "crossfade_ms": crossfade_ms}
+
+    def on_video_latency(self, video_latency_ms: float) -> None:
+        """Follow a video latency report from the virtual camera agent."""
+        # Device latency of the audio path itself, excluding the delay line
+        measured = self.measured_latency()
+        audio_io_ms = max(0.0, measured[0] - self.delay_ms) if measured else 0.0
+
+        delay_ms = self.sync.update(video_latency_ms, self.delay_ms, audio_io_ms)
+        if delay_ms is not None:
+            logger.info(f"Auto-sync: video latency {video_latency_ms:.0f}ms, audio path {audio_io_ms:.0f}ms")
+            self.set_delay(delay_ms)
+
+    def status(self) -> dict[str, Any]:
+        """Requested and effective delay, buffer fill and stream health."""
+        line = self.primary.reader
+        measured = self.measured_latency()
+        return {
+            "delay_ms": self.delay_ms,
+            "effective_delay_ms": line.fill * 1000.0 / self.sample_rate,
+            "fading": line.fading or line.pending is not None,
+            "buffer_fill_samples": line.fill,
+            "buffer_fill": line.fill / line.ring.capacity,
+            "max_delay_ms": self.max_delay_ms,
+            "sample_rate": self.sample_rate,
+            "output_sample_rate": self.output_rate,
+            "duplex": self.duplex,
+            "blocksize": self.blocksize,
+            "adaptive_blocksize": self.buffering.adaptive,
+            "max_blocksize": self.buffering.max_blocksize,
+            "blocksize_changes": self.buffering.changes,
+            "xruns": self.xruns(),
+            "capture_bus": self.bus_reader.name if self.bus_reader else None,
+            "bus_overruns": self.bus_reader.overruns if self.bus_reader else 0,
+            "waiting_for_devices": self.waiting_for_devices,
+            "migrations": len(self.migration_gaps_ms),
+            "last_migration_gap_ms": self.migration_gaps_ms[-1] if self.migration_gaps_ms else None,
+            "latency_ms_p50": measured[0] if measured else None,
+            "latency_ms_p99": measured[1] if measured else None,
+            "callbacks": self.callbacks,
+            "input_overflows": self.input_overflows,
+            "output_underflows": self.primary.output_underflows,
+            "delay_underruns": line.underruns,
+            "delay_overruns": line.overruns,
+            "delay_changes": line.delay_changes,
+            "routes": [
+                {**route.stats(), "delay_ms": route.reader.delay * 1000.0 / self.sample_rate} for route in self.routes
+            ],
+            "sync": self.sync.status(),
+        }
+
+    def handle_set_delay(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Control handler for set_delay; a manual delay overrides auto-sync until it is re-enabled."""
+        delay_ms = number_field(request, "delay_ms")
+        crossfade_ms = number_field(request, "crossfade_ms", self.crossfade_ms)
+        route = int(number_field(request, "route", 0))
+        reply = self.set_delay(delay_ms, crossfade_ms, route)
+        # Auto-sync only drives the VB-Cable route
+        if route == 0 and self.sync.enabled:
+            logger.info("Manual delay set; auto-sync paused")
+            self.sync.enabled = False
+        return {**reply, "auto_sync": self.sync.enabled}
+
+    def handle_set_gain(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Control handler for set_gain: change one route's gain in dB."""
+        gain_db = number_field(request, "gain_db")
+        route = int(number_field(request, "route", 0))
+        self.route_by_index(route).set_gain(gain_db)
+        logger.info(f"Gain of {self.routes[route].name} set to {gain_db:g}dB")
+        return {"route": route, "gain_db": gain_db}
+
+    def handle_auto_sync(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Control handler for auto_sync: turn following the video latency on or off."""
+        enabled = bool(request.get("enabled", True))
+        if enabled and self.sync_subscriber is None:
+            msg = "Auto-sync needs a video feedback port"
+            raise ControlError(msg)
+        self.sync.enabled = enabled
+        self.sync.last_change_time = None
+        logger.info(f"Auto-sync {'enabled' if enabled else 'disabled'}")
+        return {"auto_sync": enabled}
 
     def list_devices(self) -> None:
         """List all available audio devices."""
@@ -40,12 +578,153 @@ class AudioController:
             logger.info(f"[{device['index']}] {device['name']} ({', '.join(device_type)})")
         logger.info("=" * 50)
 
+    def process(self, indata: np.ndarray[Any, Any], outdata: np.ndarray[Any, Any]) -> None:
+        """Write one input block into the shared ring and render the VB-Cable route's output block."""
+        self.ring.write(indata)
+        self.primary.render(outdata)
+
+    def render(
+        self,
+        signal: np.ndarray[Any, Any],
+        sample_rate: int,
+        output_channels: int = 1,
+        output_rate: int | None = None,
+    ) -> list[np.ndarray[Any, Any]]:
+        """
+        Run a (frames, channels) float32 signal through every route without any devices.
+
+        Blocks go through the same ring, delay readers, channel maps and resamplers as the
+        live callbacks, as fast as the CPU allows. Output blocks are requested as output
+        devices clocked at output_rate would request them. Extra routes play to outputs of
+        their configured channel count (output_channels if unset) at output_rate. Returns one
+        output per route, the VB-Cable route's first; ValueError if a route does not fit.
+        """
+        self.configure(signal.shape[1], sample_rate, output_channels, output_rate)
+        for config in self.route_configs:
+            channels = config.channels or (len(config.channel_map) if config.channel_map else output_channels)
+            try:
+                self.routes.append(self.route_for(config, config.device, channels, self.output_rate))
+            except ValueError as e:
+                msg = f"Route '{config.device}': {e}"
+                raise ValueError(msg) from None
+
+        frames = len(signal) * self.output_rate // sample_rate
+        outputs = [np.zeros((frames, route.output_channels), dtype=np.float32) for route in self.routes]
+        output_blocksize = self.output_blocksize(self.output_rate)
+
+        produced = 0
+        for position in range(0, len(signal), self.blocksize):
+            block = signal[position : position + self.blocksize]
+            if self.duplex:
+                self.process(block, outputs[0][position : position + len(block)])
+                for route, output in zip(self.routes[1:], outputs[1:], strict=True):
+                    route.render(output[position : position + len(block)])
+                produced += len(block)
+                continue
+
+            self.ring.write(block)
+            due = (position + len(block)) * self.output_rate // sample_rate
+            while due - produced >= output_blocksize:
+                for route, output in zip(self.routes, outputs, strict=True):
+                    route.render(output[produced : produced + output_blocksize])
+                produced += output_blocksize
+
+        return [output[:produced] for output in outputs]
+
+    def callback(
+        self,
+        indata: np.ndarray[Any, Any],
+        outdata: np.ndarray[Any, Any],
+        _frames: int,
+        time_info: Any,  # noqa: ANN401
+        status: "sd.CallbackFlags",
+    ) -> None:
+        """Duplex stream callback, run on the PortAudio thread."""
+        if status.input_overflow:
+            self.input_overflows += 1
+        if status.output_underflow:
+            self.primary.output_underflows += 1
+
+        self.process(indata, outdata)
+        self.callbacks += 1
+        self.primary.callbacks += 1
+        self.mark_callback()
+
+        # Input ADC to output DAC time of this block, plus the samples it waits in the delay line
+        if time_info.inputBufferAdcTime > 0 and time_info.outputBufferDacTime > 0:
+            self.record_latency((time_info.outputBufferDacTime - time_info.inputBufferAdcTime) * 1000.0)
+
+    def input_callback(
+        self,
+        indata: np.ndarray[Any, Any],
+        _frames: int,
+        _time_info: Any,  # noqa: ANN401
+        status: "sd.CallbackFlags",
+    ) -> None:
+        """Capture stream callback when the VB-Cable output runs at another rate."""
+        if status.input_overflow:
+            self.input_overflows += 1
+        self.ring.write(indata)
+        self.callbacks += 1
+        self.mark_callback()
+
+    def primary_callback(
+        self,
+        outdata: np.ndarray[Any, Any],
+        frames: int,
+        time_info: Any,  # noqa: ANN401
+        status: "sd.CallbackFlags",
+    ) -> None:
+        """VB-Cable output stream callback when it runs at another rate than the capture (or reads the bus)."""
+        self.pull_bus()
+        self.primary.callback(outdata, frames, time_info, status)
+
+        # Separate streams share no ADC time: estimate from the capture stream's reported latency
+        if time_info.outputBufferDacTime > 0:
+            output_ms = (time_info.outputBufferDacTime - time_info.currentTime) * 1000.0
+            self.record_latency(self.stream_latency[0] * 1000.0 + output_ms)
+
+    def record_latency(self, stream_ms: float) -> None:
+        """Store one latency measurement: device path plus the samples waiting in the delay line."""
+        delay_ms = self.primary.reader.fill * 1000.0 / self.sample_rate
+        self.latency_ms[self.latency_count % LATENCY_HISTORY] = stream_ms + delay_ms
+        self.latency_count += 1
+
+    def measured_latency(self) -> tuple[float, float] | None:
+        """Return (p50, p99) of recent input-to-output latency in ms, or None before any measurement."""
+        count = min(self.latency_count, LATENCY_HISTORY)
+        if count == 0:
+            return None
+        p50, p99 = np.percentile(self.latency_ms[:count], [50, 99])
+        return float(p50), float(p99)
+
+    def log_stats(self) -> None:
+        """Log measured latency and stream health."""
+        input_latency, output_latency = self.stream_latency
+        measured = self.measured_latency()
+        measured_text = f"{measured[0]:.1f}/{measured[1]:.1f} ms" if measured else "n/a"
+        logger.info(
+            f"Stats - Callbacks: {self.callbacks}, Blocksize: {self.blocksize}, Xruns: {self.xruns()}, "
+            f"Input-to-output latency p50/p99: {measured_text} "
+            f"(stream in/out {input_latency * 1000:.1f}/{output_latency * 1000:.1f} ms, "
+            f"delay {self.primary.reader.fill * 1000.0 / self.sample_rate:.1f} ms), "
+            f"Input overflows: {self.input_overflows}, Output underflows: {self.primary.output_underflows}, "
+            f"Delay underruns/overruns: {self.primary.reader.underruns}/{self.primary.reader.overruns}"
+        )
+        for index, route in enumerate(self.routes[1:], start=1):
+            logger.info(
+                f"Route {index} ({route.name}) - Callbacks: {route.callbacks}, "
+                f"Underruns/overruns: {route.reader.underruns}/{route.reader.overruns}, "
+                f"Output underflows: {route.output_underflows}"
+            )
+
     def start(self) -> None:
-        """Start audio processing loop."""
+        """Start audio processing."""
         self.running = True
 
         # Find input device using the service
         input_device_index = AudioDeviceService.get_device_index_by_name(self.input_device_name)
+        self.input_device_index = input_device_index
         if input_device_index < 0:
             logger.error(f"Input device '{self.input_device_name}' not found!")
             self.list_devices()
@@ -53,72 +732,99 @@ class AudioController:
 
         # Find VBCABLE output device using the service
         output_device_index = AudioDeviceService.get_vb_input_device_index()
+        self.output_device_index = output_device_index
         if output_device_index < 0:
             logger.error("VBCABLE output device not found!")
             logger.error("Looking for 'CABLE Input' (VB-Audio Virtual Cable)")
             self.list_devices()
             return
 
-        input_info = AudioDeviceService.get_device_info_by_index(input_device_index)
+        input_info = self.attach_bus(AudioDeviceService.get_device_info_by_index(input_device_index))
         output_info = AudioDeviceService.get_device_info_by_index(output_device_index)
 
+        # Open both devices at their native rate and channel count so the host API does no conversion
+        self.configure(*self.device_format(input_info, output_info))
+
         logger.info(f"Input Device: {input_info['name']}")
         logger.info(f"Output Device: {output_info['name']}")
-        logger.info(f"Delay: {self.delay_ms}ms ({self.delay_chunks} chunks)")
-        logger.info(f"Sample Rate: {self.sample_rate}Hz, Channels: {input_info['max_input_channels']}")
+        logger.info(f"Delay: {self.delay_ms}ms ({self.delay_samples} samples)")
+        logger.info(f"Sample Rate: {self.sample_rate}Hz, Channels: {self.input_channels}, Blocksize: {self.blocksize}")
+        logger.info(f"VB-Cable path: {self.describe_path(self.primary, self.output_rate)}")
+        if self.buffering.adaptive:
+            logger.info(f"Adaptive buffering: block size {self.blocksize} to {self.buffering.max_blocksize}")
         logger.info("Press Ctrl+C to stop...")
 
         try:
-            # Open input and output streams
-            input_stream = sd.InputStream(
-                device=input_device_index,
-                channels=input_info["max_input_channels"],
-                samplerate=self.sample_rate,
-                blocksize=self.chunk_size,
-                dtype=self.dtype,
-            )
+            for config in self.route_configs:
+                self.add_route(config)
 
-            output_stream = sd.OutputStream(
-                device=output_device_index,
-                channels=1,
-                samplerate=self.sample_rate,
-                blocksize=self.chunk_size,
-                dtype=self.dtype,
-            )
+            if self.control_port > 0:
+                self.control_server = ControlServer(
+                    self.control_port,
+                    {
+                        "status": lambda _: {"status": self.status()},
+                        "set_delay": self.handle_set_delay,
+                        "set_gain": self.handle_set_gain,
+                        "auto_sync": self.handle_auto_sync,
+                    },
+                    name="audio-control",
+                )
+                self.control_server.start()
+
+            if self.video_feedback_port > 0:
+                self.sync_subscriber = VideoLatencySubscriber(self.video_feedback_port, self.on_video_latency)
+                self.sync_subscriber.start()
 
-            input_stream.start()
-            output_stream.start()
+            if self.watch_devices:
+                self.watcher = DeviceWatcher(AudioDeviceService.registry)
+                self.watcher.subscribe(self.device_changes.put)
+                self.watcher.start()
 
+            self.open_streams()
             logger.info("Audio processing started...")
-            chunk_count = 0
+            last_stats_time = last_buffering_time = time.monotonic()
+            gaps_logged = 0
 
-            # Main processing loop
             while self.running:
-                # Read audio chunk from input device
-                audio_data, _ = input_stream.read(self.chunk_size)
-
-                # Add to delay buffer
-                self.delay_buffer.append(audio_data)
-
-                # Output delayed audio if buffer is full
-                if len(self.delay_buffer) >= self.delay_chunks:
-                    delayed_audio = self.delay_buffer[0]
-                    output_stream.write(delayed_audio)
-                    chunk_count += 1
+                time.sleep(0.1)
+                self.handle_device_changes()
+                while gaps_logged < len(self.migration_gaps_ms):
+                    logger.info(f"Audio gap during device migration: {self.migration_gaps_ms[gaps_logged]:.0f} ms")
+                    gaps_logged += 1
 
-                    if chunk_count % 100 == 0:
-                        logger.debug(f"Processed {chunk_count} chunks...")
+                now = time.monotonic()
+                if (
+                    self.buffering.adaptive
+                    and self.streams
+                    and now - last_buffering_time >= BUFFERING_CHECK_INTERVAL_SECONDS
+                ):
+                    last_buffering_time = now
+                    blocksize = self.buffering.update(self.xruns())
+                    if blocksize is not None:
+                        self.reopen_streams(blocksize)
+                if now - last_stats_time >= STATS_INTERVAL_SECONDS:
+                    last_stats_time = now
+                    self.log_stats()
 
-            # Cleanup
             logger.info("Stopping audio streams...")
-            input_stream.stop()
-            input_stream.close()
-            output_stream.stop()
-            output_stream.close()
+            self.log_stats()
 
         except Exception as e:
             logger.exception(f"Error during audio processing: {e}")
         finally:
+            if self.watcher:
+                self.watcher.stop()
+                self.watcher = None
+            self.close_streams()
+            if self.bus_reader:
+                self.bus_reader.close()
+                self.bus_reader = None
+            if self.sync_subscriber:
+                self.sync_subscriber.stop()
+                self.sync_subscriber = None
+            if self.control_server:
+                self.control_server.stop()
+                self.control_server = None
             logger.info("Audio processing stopped.")
 
     def stop(self) -> None:
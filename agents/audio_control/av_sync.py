@@ -0,0 +1,148 @@
+"""
+Automatic audio/video sync for the audio control agent.
+
+The virtual camera agent publishes its smoothed end-to-end video latency in the JSON
+feedback messages on its PUB socket. The audio agent subscribes and sets its delay so
+audio leaves the agent as late as video leaves the virtual camera.
+"""
+
+import json
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+import zmq
+from loguru import logger
+
+DEFAULT_VIDEO_FEEDBACK_PORT = 50003
+DEFAULT_SYNC_HYSTERESIS_MS = 20.0
+DEFAULT_SYNC_MIN_INTERVAL_SECONDS = 2.0
+SUBSCRIBER_POLL_TIMEOUT_MS = 500
+
+
+class SyncTracker:
+    """
+    Turns video latency reports into audio delay targets.
+
+    The target is the video latency plus a fixed offset (for video latency upstream of
+    the virtual camera agent, e.g. the face-swap round trip), minus the audio path's own
+    device latency, clamped to bounds. A new target is only issued when it differs from
+    the current delay by more than the hysteresis and the previous change has had time
+    to settle, so jitter in the estimate does not keep retuning the delay.
+    """
+
+    def __init__(
+        self,
+        min_delay_ms: float,
+        max_delay_ms: float,
+        offset_ms: float = 0.0,
+        hysteresis_ms: float = DEFAULT_SYNC_HYSTERESIS_MS,
+        min_interval: float = DEFAULT_SYNC_MIN_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.min_delay_ms = min_delay_ms
+        self.max_delay_ms = max_delay_ms
+        self.offset_ms = offset_ms
+        self.hysteresis_ms = hysteresis_ms
+        self.min_interval = min_interval
+        self.clock = clock
+
+        self.enabled = True
+        self.last_change_time: float | None = None
+        self.video_latency_ms: float | None = None
+        self.target_ms: float | None = None
+
+        # Statistics
+        self.reports = 0
+        self.adjustments = 0
+
+    def target(self, video_latency_ms: float, audio_io_ms: float) -> float:
+        """Delay that lines audio up with video, clamped to the bounds."""
+        target = video_latency_ms + self.offset_ms - audio_io_ms
+        return min(self.max_delay_ms, max(self.min_delay_ms, target))
+
+    def update(self, video_latency_ms: float, current_delay_ms: float, audio_io_ms: float = 0.0) -> float | None:
+        """Record a video latency report; returns a new delay if one should be applied."""
+        self.reports += 1
+        self.video_latency_ms = video_latency_ms
+        self.target_ms = self.target(video_latency_ms, audio_io_ms)
+
+        if not self.enabled or abs(self.target_ms - current_delay_ms) <= self.hysteresis_ms:
+            return None
+
+        now = self.clock()
+        if self.last_change_time is not None and now - self.last_change_time < self.min_interval:
+            return None
+
+        self.last_change_time = now
+        self.adjustments += 1
+        return self.target_ms
+
+    def status(self) -> dict[str, Any]:
+        """Return tracker state for the status command."""
+        return {
+            "auto_sync": self.enabled,
+            "video_latency_ms": self.video_latency_ms,
+            "target_delay_ms": self.target_ms,
+            "offset_ms": self.offset_ms,
+            "min_delay_ms": self.min_delay_ms,
+            "max_delay_ms": self.max_delay_ms,
+            "hysteresis_ms": self.hysteresis_ms,
+            "reports": self.reports,
+            "adjustments": self.adjustments,
+        }
+
+
+class VideoLatencySubscriber:
+    """Subscribes to the virtual camera agent's feedback and passes on its video latency."""
+
+    def __init__(self, port: int, on_latency: Callable[[float], None]) -> None:
+        self.port = port
+        self.on_latency = on_latency
+        self.running = False
+        self.zmq_context: zmq.Context[Any] | None = None
+        self.socket: zmq.Socket[Any] | None = None
+        self.thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Connect to the feedback socket and start listening."""
+        self.zmq_context = zmq.Context()
+        self.socket = self.zmq_context.socket(zmq.SUB)
+        self.socket.setsockopt(zmq.LINGER, 0)
+        self.socket.setsockopt(zmq.CONFLATE, 1)
+        self.socket.setsockopt_string(zmq.SUBSCRIBE, "")
+        self.socket.connect(f"tcp://127.0.0.1:{self.port}")
+
+        self.running = True
+        self.thread = threading.Thread(target=self.listen, daemon=True, name="av-sync")
+        self.thread.start()
+        logger.info(f"Following video latency from port {self.port}")
+
+    def stop(self) -> None:
+        """Stop listening and close the socket."""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+        if self.socket:
+            self.socket.close()
+            self.socket = None
+        if self.zmq_context:
+            self.zmq_context.term()
+            self.zmq_context = None
+
+    def listen(self) -> None:
+        """Subscriber thread: Forward the latency in each feedback message."""
+        while self.running and self.socket:
+            try:
+                if not self.socket.poll(SUBSCRIBER_POLL_TIMEOUT_MS):
+                    continue
+                message = json.loads(self.socket.recv_string())
+                latency = message.get("video_latency_ms")
+                if isinstance(latency, int | float) and latency > 0:
+                    self.on_latency(float(latency))
+            except (json.JSONDecodeError, AttributeError) as e:
+                logger.debug(f"Ignoring malformed video feedback: {e}")
+            except Exception as e:
+                logger.error(f"Error receiving video feedback: {e}")
@@ -0,0 +1,328 @@
+"""
+Audio Control Agent - Offline checks and benchmarks
+
+delay:      feeds a click train through the delay line in randomly sized duplex blocks and
+            checks every click comes out within one sample of the requested delay; also
+            reports the cost per sample.
+crossfade:  changes the delay in the middle of a sine tone and checks the largest
+            sample-to-sample step stays close to that of the tone itself (no click).
+resample:   plays a delayed tone through an output route for every 44.1/48 kHz capture and
+            output rate combination, checks it against the ideal tone at the output rate
+            and reports the cost of each path (direct, or resampled).
+
+All exit non-zero if the check fails.
+
+Results are printed as JSON. No audio devices are needed.
+
+Usage:
+    python -m agents.audio_control.benchmark delay --delay-ms 250 --blocksize 256
+    python -m agents.audio_control.benchmark crossfade --delay-ms 250 --new-delay-ms 330
+    python -m agents.audio_control.benchmark resample --input-channels 2 --output-channels 2
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any
+
+import numpy as np
+
+from agents.audio_control.delay_line import DelayReader, SampleRing
+from agents.audio_control.resampler import LinearResampler
+from agents.audio_control.routing import Route, default_channel_map
+
+DEFAULT_SAMPLE_RATE = 44100
+DEFAULT_DURATION_SECONDS = 10.0
+CLICK_PERIOD_SAMPLES = 4410
+MAX_DELAY_ERROR_SAMPLES = 1
+DEFAULT_CROSSFADE_MS = 50.0
+TONE_HZ = 440.0
+TONE_AMPLITUDE = 0.5
+# Largest step allowed during a delay change, relative to the tone's own largest step
+MAX_STEP_RATIO = 2.0
+RESAMPLE_RATES = (44100, 48000)
+# Largest deviation from the ideal tone; linear interpolation of 440 Hz stays well below this
+MAX_RESAMPLE_ERROR = 0.01
+
+
+def click_train(frames: int, period: int, offset: int = 17) -> np.ndarray[Any, Any]:
+    """Mono float32 signal with a unit impulse every period samples, starting at offset."""
+    signal = np.zeros((frames, 1), dtype=np.float32)
+    signal[offset::period, 0] = 1.0
+    return signal
+
+
+def run_duplex(
+    signal: np.ndarray[Any, Any],
+    delay: int,
+    blocksize: int,
+    rng: np.random.Generator,
+) -> tuple[np.ndarray[Any, Any], float, DelayReader]:
+    """Process signal through a delay line as a duplex callback would; returns (output, seconds, reader)."""
+    ring = SampleRing(delay + 8 * blocksize, signal.shape[1])
+    line = DelayReader(ring, delay)
+    output = np.zeros_like(signal)
+    block = np.zeros((blocksize, signal.shape[1]), dtype=np.float32)
+
+    elapsed = 0.0
+    position = 0
+    while position < len(signal):
+        # Host APIs may deliver short or variable blocks
+        frames = min(int(rng.integers(1, blocksize + 1)), len(signal) - position)
+        start = time.perf_counter()
+        ring.write(signal[position : position + frames])
+        line.read(block[:frames])
+        elapsed += time.perf_counter() - start
+        output[position : position + frames] = block[:frames]
+        position += frames
+
+    return output, elapsed, line
+
+
+def benchmark_delay(delay_ms: float, blocksize: int, sample_rate: int, duration: float, seed: int) -> dict[str, Any]:
+    """Check the delay line is sample accurate and measure its cost."""
+    delay = round(delay_ms * sample_rate / 1000.0)
+    frames = int(duration * sample_rate)
+    signal = click_train(frames, CLICK_PERIOD_SAMPLES)
+
+    output, elapsed, line = run_duplex(signal, delay, blocksize, np.random.default_rng(seed))
+
+    clicks_in = np.flatnonzero(signal[:, 0])
+    clicks_out = np.flatnonzero(output[:, 0])
+    expected = clicks_in[clicks_in + delay < frames]
+    matched = min(len(expected), len(clicks_out))
+    errors = clicks_out[:matched] - (expected[:matched] + delay)
+    max_error = int(np.abs(errors).max()) if matched else None
+
+    passed = (
+        matched == len(expected)
+        and len(clicks_out) == len(expected)
+        and max_error is not None
+        and max_error <= MAX_DELAY_ERROR_SAMPLES
+        and line.underruns == 0
+        and line.overruns == 0
+    )
+    return {
+        "benchmark": "delay",
+        "sample_rate": sample_rate,
+        "blocksize": blocksize,
+        "delay_ms": delay_ms,
+        "delay_samples": delay,
+        "clicks_expected": len(expected),
+        "clicks_found": len(clicks_out),
+        "max_error_samples": max_error,
+        "underruns": line.underruns,
+        "overruns": line.overruns,
+        "ns_per_sample": elapsed * 1e9 / max(1, frames),
+        "passed": passed,
+    }
+
+
+def benchmark_crossfade(
+    delay_ms: float,
+    new_delay_ms: float,
+    crossfade_ms: float,
+    blocksize: int,
+    sample_rate: int,
+) -> dict[str, Any]:
+    """Change the delay halfway through a tone and measure the worst discontinuity."""
+    delay = round(delay_ms * sample_rate / 1000.0)
+    new_delay = round(new_delay_ms * sample_rate / 1000.0)
+    frames = 4 * sample_rate
+    t = np.arange(frames, dtype=np.float32) / sample_rate
+    signal = (TONE_AMPLITUDE * np.sin(2 * np.pi * TONE_HZ * t)).astype(np.float32)[:, None]
+
+    ring = SampleRing(max(delay, new_delay) + 8 * blocksize, 1)
+    line = DelayReader(ring, delay)
+    output = np.zeros_like(signal)
+    switch_at = frames // 2
+    for position in range(0, frames, blocksize):
+        if position <= switch_at < position + blocksize:
+            line.set_delay(new_delay, round(crossfade_ms * sample_rate / 1000.0))
+        block = signal[position : position + blocksize]
+        ring.write(block)
+        line.read(output[position : position + len(block)])
+
+    # Compare steps only once both delays have real signal behind them
+    settled = max(delay, new_delay) + blocksize
+    steps = np.abs(np.diff(output[settled:, 0]))
+    tone_step = float(np.abs(np.diff(signal[:, 0])).max())
+    max_step = float(steps.max())
+    return {
+        "benchmark": "crossfade",
+        "sample_rate": sample_rate,
+        "blocksize": blocksize,
+        "delay_ms": delay_ms,
+        "new_delay_ms": new_delay_ms,
+        "crossfade_ms": crossfade_ms,
+        "tone_max_step": tone_step,
+        "output_max_step": max_step,
+        "step_ratio": max_step / tone_step,
+        "passed": max_step <= MAX_STEP_RATIO * tone_step,
+    }
+
+
+def run_route(
+    in_rate: int,
+    out_rate: int,
+    blocksize: int,
+    duration: float,
+    input_channels: int,
+    output_channels: int,
+    delay_ms: float,
+) -> dict[str, Any]:
+    """Play a tone captured at in_rate through a route to an out_rate device, clocked as real streams would be."""
+    frames_in = int(duration * in_rate)
+    t = np.arange(frames_in, dtype=np.float64) / in_rate
+    tone = (TONE_AMPLITUDE * np.sin(2 * np.pi * TONE_HZ * t)).astype(np.float32)
+    signal = np.repeat(tone[:, None], input_channels, axis=1)
+
+    delay = round(delay_ms * in_rate / 1000.0)
+    ring = SampleRing(delay + 8 * blocksize, input_channels)
+    resampler = LinearResampler(in_rate, out_rate, input_channels) if in_rate != out_rate else None
+    route = Route(
+        "benchmark",
+        DelayReader(ring, delay),
+        default_channel_map(input_channels, output_channels),
+        resampler=resampler,
+    )
+
+    output = np.zeros((frames_in * out_rate // in_rate, output_channels), dtype=np.float32)
+    out_block = max(1, round(blocksize * out_rate / in_rate))
+    produced = 0
+    elapsed = 0.0
+    for position in range(0, frames_in, blocksize):
+        start = time.perf_counter()
+        block = signal[position : position + blocksize]
+        ring.write(block)
+        # Render the whole output blocks the capture now covers, as the output device clock would ask
+        due = (position + len(block)) * out_rate // in_rate
+        while due - produced >= out_block:
+            route.render(output[produced : produced + out_block])
+            produced += out_block
+        elapsed += time.perf_counter() - start
+
+    # Output sample k plays capture sample k * in_rate / out_rate - delay
+    source = np.arange(produced, dtype=np.float64) * in_rate / out_rate - delay
+    valid = source >= 1
+    expected = TONE_AMPLITUDE * np.sin(2 * np.pi * TONE_HZ * source[valid] / in_rate)
+    max_error = float(np.abs(output[:produced, 0][valid] - expected).max()) if valid.any() else None
+
+    return {
+        "input_rate": in_rate,
+        "output_rate": out_rate,
+        "resampled": resampler is not None,
+        "output_blocksize": out_block,
+        "max_error": max_error,
+        "underruns": route.reader.underruns,
+        "ns_per_output_sample": elapsed * 1e9 / max(1, produced),
+        "cpu_percent_of_realtime": elapsed * 100.0 / max(1e-9, produced / out_rate),
+        "passed": max_error is not None and max_error <= MAX_RESAMPLE_ERROR and route.reader.underruns == 0,
+    }
+
+
+def benchmark_resample(
+    blocksize: int,
+    duration: float,
+    input_channels: int,
+    output_channels: int,
+    delay_ms: float,
+) -> dict[str, Any]:
+    """Check and time every capture/output rate combination."""
+    paths = [
+        run_route(in_rate, out_rate, blocksize, duration, input_channels, output_channels, delay_ms)
+        for in_rate in RESAMPLE_RATES
+        for out_rate in RESAMPLE_RATES
+    ]
+    return {
+        "benchmark": "resample",
+        "blocksize": blocksize,
+        "input_channels": input_channels,
+        "output_channels": output_channels,
+        "delay_ms": delay_ms,
+        "paths": paths,
+        "passed": all(path["passed"] for path in paths),
+    }
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Audio Control Agent offline checks and benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    delay_parser = subparsers.add_parser("delay", help="Click-train accuracy and cost of the delay line")
+    delay_parser.add_argument("-d", "--delay-ms", type=float, default=250.0, help="Delay in ms (default: 250)")
+    delay_parser.add_argument("-b", "--blocksize", type=int, default=256, help="Maximum block size (default: 256)")
+    delay_parser.add_argument(
+        "-r",
+        "--sample-rate",
+        type=int,
+        default=DEFAULT_SAMPLE_RATE,
+        help=f"Sample rate (default: {DEFAULT_SAMPLE_RATE})",
+    )
+    delay_parser.add_argument(
+        "--duration",
+        type=float,
+        default=DEFAULT_DURATION_SECONDS,
+        help=f"Seconds of signal (default: {DEFAULT_DURATION_SECONDS:g})",
+    )
+    delay_parser.add_argument("--seed", type=int, default=0, help="Block size randomization seed (default: 0)")
+
+    crossfade_parser = subparsers.add_parser("crossfade", help="Discontinuity caused by a runtime delay change")
+    crossfade_parser.add_argument("-d", "--delay-ms", type=float, default=250.0, help="Initial delay (default: 250)")
+    crossfade_parser.add_argument("-n", "--new-delay-ms", type=float, default=330.0, help="New delay (default: 330)")
+    crossfade_parser.add_argument(
+        "-c",
+        "--crossfade-ms",
+        type=float,
+        default=DEFAULT_CROSSFADE_MS,
+        help=f"Crossfade length (default: {DEFAULT_CROSSFADE_MS:g}, 0 to hear the click)",
+    )
+    crossfade_parser.add_argument("-b", "--blocksize", type=int, default=256, help="Block size (default: 256)")
+    crossfade_parser.add_argument(
+        "-r",
+        "--sample-rate",
+        type=int,
+        default=DEFAULT_SAMPLE_RATE,
+        help=f"Sample rate (default: {DEFAULT_SAMPLE_RATE})",
+    )
+
+    resample_parser = subparsers.add_parser("resample", help="Accuracy and cost of each sample-rate path")
+    resample_parser.add_argument("-b", "--blocksize", type=int, default=256, help="Capture block size (default: 256)")
+    resample_parser.add_argument("-d", "--delay-ms", type=float, default=20.0, help="Route delay (default: 20)")
+    resample_parser.add_argument("--input-channels", type=int, default=2, help="Capture channels (default: 2)")
+    resample_parser.add_argument("--output-channels", type=int, default=2, help="Output channels (default: 2)")
+    resample_parser.add_argument(
+        "--duration",
+        type=float,
+        default=DEFAULT_DURATION_SECONDS,
+        help=f"Seconds of signal per path (default: {DEFAULT_DURATION_SECONDS:g})",
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "resample":
+        result = benchmark_resample(
+            args.blocksize,
+            args.duration,
+            args.input_channels,
+            args.output_channels,
+            args.delay_ms,
+        )
+    elif args.command == "crossfade":
+        result = benchmark_crossfade(
+            args.delay_ms,
+            args.new_delay_ms,
+            args.crossfade_ms,
+            args.blocksize,
+            args.sample_rate,
+        )
+    else:
+        result = benchmark_delay(args.delay_ms, args.blocksize, args.sample_rate, args.duration, args.seed)
+    print(json.dumps(result, indent=2))  # noqa: T201
+    return 0 if result["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Adaptive callback block size for the audio control agent.
+
+Small blocks mean low latency, but a busy machine (e.g. while the face-swap pipeline
+saturates the CPU/GPU) cannot always service them in time and the streams glitch.
+The controller here counts xruns and steps the block size up when they keep happening,
+then back down once the machine has been stable for a while.
+"""
+
+import time
+from collections import deque
+from collections.abc import Callable
+
+DEFAULT_MAX_BLOCKSIZE = 4096
+DEFAULT_GROW_XRUNS = 3
+DEFAULT_GROW_WINDOW_SECONDS = 10.0
+DEFAULT_SHRINK_AFTER_SECONDS = 60.0
+
+
+class BlocksizeController:
+    """
+    Picks the smallest block size the machine sustains without xruns.
+
+    The block size doubles (up to max_blocksize) once grow_xruns xruns fall within
+    grow_window seconds, and halves (down to the starting block size) after
+    shrink_after seconds without any xrun. Every change restarts both timers, so a
+    size gets time to prove itself before the next step.
+    """
+
+    def __init__(
+        self,
+        blocksize: int,
+        max_blocksize: int = DEFAULT_MAX_BLOCKSIZE,
+        grow_xruns: int = DEFAULT_GROW_XRUNS,
+        grow_window: float = DEFAULT_GROW_WINDOW_SECONDS,
+        shrink_after: float = DEFAULT_SHRINK_AFTER_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.min_blocksize = blocksize
+        self.max_blocksize = max(blocksize, max_blocksize)
+        self.blocksize = blocksize
+        self.grow_xruns = grow_xruns
+        self.grow_window = grow_window
+        self.shrink_after = shrink_after
+        self.clock = clock
+
+        self.xrun_times: deque[float] = deque()
+        self.last_xruns = 0
+        self.last_xrun_time = clock()
+        self.last_change_time = self.last_xrun_time
+
+        # Statistics
+        self.changes = 0
+
+    @property
+    def adaptive(self) -> bool:
+        """False when the block size is pinned (max_blocksize equals the starting size)."""
+        return self.max_blocksize > self.min_blocksize
+
+    def update(self, xruns: int) -> int | None:
+        """Record the running xrun total; returns a new block size if the streams should be reopened."""
+        now = self.clock()
+        new_xruns = xruns - self.last_xruns
+        self.last_xruns = xruns
+        if new_xruns > 0:
+            self.last_xrun_time = now
+            self.xrun_times.extend([now] * new_xruns)
+        while self.xrun_times and now - self.xrun_times[0] > self.grow_window:
+            self.xrun_times.popleft()
+
+        if len(self.xrun_times) >= self.grow_xruns and self.blocksize < self.max_blocksize:
+            return self.change(min(self.max_blocksize, self.blocksize * 2), now)
+
+        stable_since = max(self.last_xrun_time, self.last_change_time)
+        if now - stable_since >= self.shrink_after and self.blocksize > self.min_blocksize:
+            return self.change(max(self.min_blocksize, self.blocksize // 2), now)
+
+        return None
+
+    def change(self, blocksize: int, now: float) -> int:
+        """Switch to blocksize and restart the xrun window and stability timer."""
+        self.blocksize = blocksize
+        self.xrun_times.clear()
+        self.last_change_time = now
+        self.changes += 1
+        return blocksize
@@ -0,0 +1,16 @@
+"""
+Local control endpoint for the audio control agent.
+
+Served by agents.shared.control.ControlServer; requests and replies are JSON objects on a
+ZeroMQ REP socket bound to localhost:
+    {"command": "status"}
+    {"command": "set_delay", "delay_ms": 320, "crossfade_ms": 50}
+    {"command": "set_delay", "route": 1, "delay_ms": 150}
+    {"command": "set_gain", "route": 1, "gain_db": -6}
+
+Route 0 is the VB-Cable output; --route outputs follow in order.
+
+Every reply has "ok"; failures carry an "error" message.
+"""
+
+DEFAULT_CONTROL_PORT = 50006
@@ -0,0 +1,166 @@
+"""
+Sample-accurate delay lines backed by one preallocated ring buffer.
+
+The capture side writes every input block once into a SampleRing. Each output reads it
+through its own DelayReader, so several outputs can play the same capture at different
+delays without copying it per output, and a slow output never holds up the writer or
+the other outputs.
+"""
+
+from typing import Any
+
+import numpy as np
+
+# Largest block the preallocated crossfade scratch buffer covers without allocating
+MAX_BLOCK_FRAMES = 4096
+
+
+def fade_curve(length: int) -> np.ndarray[Any, Any]:
+    """Raised-cosine ramp from 0 to 1 over length samples, shaped (length, 1) for broadcasting."""
+    t = (np.arange(length, dtype=np.float32) + 1.0) / length
+    return (0.5 - 0.5 * np.cos(np.pi * t)).astype(np.float32)[:, None]
+
+
+class SampleRing:
+    """
+    Fixed-capacity circular sample buffer with a single writer.
+
+    The write cursor is an absolute sample count; the ring position is the count modulo
+    the capacity. Nothing is allocated after construction.
+    """
+
+    def __init__(self, capacity: int, channels: int) -> None:
+        self.capacity = capacity
+        self.channels = channels
+        self.buffer = np.zeros((capacity, channels), dtype=np.float32)
+        self.write_index = 0
+
+    def write(self, block: np.ndarray[Any, Any]) -> None:
+        """Append a (frames, channels) block at the write cursor."""
+        frames = len(block)
+        start = self.write_index % self.capacity
+        first = min(frames, self.capacity - start)
+        self.buffer[start : start + first] = block[:first]
+        if first < frames:
+            self.buffer[: frames - first] = block[first:]
+        self.write_index += frames
+
+    def copy(self, index: int, out: np.ndarray[Any, Any]) -> None:
+        """Copy len(out) samples starting at absolute sample index into out."""
+        frames = len(out)
+        start = index % self.capacity
+        first = min(frames, self.capacity - start)
+        out[:first] = self.buffer[start : start + first]
+        if first < frames:
+            out[first:] = self.buffer[: frames - first]
+
+
+class DelayReader:
+    """
+    Read cursor that trails a SampleRing's writer by a delay.
+
+    The reader starts delay samples behind the writer, so a duplex callback that writes
+    a block and then reads a block of the same size delays the signal by exactly delay
+    samples.
+
+    The delay can be changed while running. The change is queued by the caller's thread
+    and applied by the reader at the next block: a second cursor is started at the new
+    delay and crossfaded in over the old one, so there is no click or gap.
+    """
+
+    def __init__(self, ring: SampleRing, delay: int = 0) -> None:
+        if not 0 <= delay < ring.capacity:
+            msg = f"Delay of {delay} samples does not fit a {ring.capacity} sample buffer"
+            raise ValueError(msg)
+
+        self.ring = ring
+        self.read_index = ring.write_index - delay
+        self.delay = delay
+
+        # Delay change: queued request, then the old cursor being faded out
+        self.pending: tuple[int, np.ndarray[Any, Any]] | None = None
+        self.fade_index: int | None = None
+        self.fade: np.ndarray[Any, Any] | None = None
+        self.fade_position = 0
+        self.scratch = np.zeros((MAX_BLOCK_FRAMES, ring.channels), dtype=np.float32)
+
+        # Statistics
+        self.underruns = 0
+        self.overruns = 0
+        self.delay_changes = 0
+
+    @property
+    def fill(self) -> int:
+        """Samples written but not yet read; equals the effective delay once running."""
+        return self.ring.write_index - self.read_index
+
+    @property
+    def fading(self) -> bool:
+        """True while a delay change is being crossfaded."""
+        return self.fade_index is not None
+
+    def set_delay(self, delay: int, crossfade: int) -> None:
+        """Queue a delay change, crossfaded over crossfade samples (0 switches at the next block)."""
+        if not 0 <= delay < self.ring.capacity:
+            msg = f"Delay of {delay} samples does not fit a {self.ring.capacity} sample buffer"
+            raise ValueError(msg)
+        self.pending = (delay, fade_curve(max(1, crossfade)))
+
+    def read(self, out: np.ndarray[Any, Any]) -> None:
+        """Fill out with the next (frames, channels) block from the read cursor."""
+        frames = len(out)
+        if self.pending is not None and not self.fading:
+            self._start_fade()
+
+        if self.fill > self.ring.capacity - frames:
+            # Writer lapped this reader (a stalled output); skip ahead and keep the delay
+            self.overruns += 1
+            self.read_index = self.ring.write_index - self.delay
+            self.fade_index = None
+            self.fade = None
+
+        if self.fill < frames:
+            # Writer has not caught up; output silence and hold the cursor so the delay is kept
+            self.underruns += 1
+            out.fill(0)
+            return
+
+        self.ring.copy(self.read_index, out)
+        self.read_index += frames
+        if self.fade_index is None or self.fade is None:
+            return
+
+        # Crossfade from the old cursor: out = old + (new - old) * gain, computed in place
+        old = self.scratch[:frames] if frames <= len(self.scratch) else np.empty_like(out)
+        self.ring.copy(self.fade_index, old)
+        self.fade_index += frames
+
+        count = min(frames, len(self.fade) - self.fade_position)
+        gain = self.fade[self.fade_position : self.fade_position + count]
+        out[:count] -= old[:count]
+        out[:count] *= gain
+        out[:count] += old[:count]
+        self.fade_position += count
+
+        if self.fade_position >= len(self.fade):
+            self.fade_index = None
+            self.fade = None
+
+    def _start_fade(self) -> None:
+        """Move the read cursor to the pending delay, keeping the old cursor for the crossfade."""
+        pending = self.pending
+        self.pending = None
+        if pending is None:
+            return
+
+        delay, curve = pending
+        if delay == self.delay:
+            return
+
+        self.fade_index = self.read_index
+        self.fade = curve
+        self.fade_position = 0
+        # Shift relative to the current cursor so the block boundary stays where the writer left it
+        self.read_index += self.delay - delay
+        self.delay = delay
+        self.delay_changes += 1
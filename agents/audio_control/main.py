@@ -1,15 +1,27 @@
 import argparse
+import json
 import os
 import signal
 import sys
 import threading
 import time
+from pathlib import Path
 from types import FrameType
 
 import psutil
 from loguru import logger
 
-from agents.audio_control.audio_controller import AudioController
+from agents.audio_control.audio_controller import (
+    DEFAULT_BLOCKSIZE,
+    DEFAULT_CROSSFADE_MS,
+    DEFAULT_MAX_DELAY_MS,
+    AudioController,
+)
+from agents.audio_control.av_sync import DEFAULT_SYNC_HYSTERESIS_MS, DEFAULT_VIDEO_FEEDBACK_PORT
+from agents.audio_control.buffering import DEFAULT_MAX_BLOCKSIZE
+from agents.audio_control.control import DEFAULT_CONTROL_PORT
+from agents.audio_control.render import DEFAULT_RENDER_SECONDS, SYNTHETIC_SOURCE, render
+from agents.audio_control.routing import RouteConfig, parse_route
 from agents.shared.audio_device_service import AudioDeviceService
 
 
@@ -35,7 +47,10 @@ def main() -> int:
 Examples:
   python main.py --input "Microphone" --delay 500
   python main.py -i "USB Audio" -d 1000
+  python main.py -i "Microphone" -d 300 --route "Speakers;delay=300;gain=-12;map=0,0"
   python main.py --list-devices
+  python main.py --render noise -d 250
+  python main.py --render speech.wav --render-output delayed.wav -d 250 --render-output-rate 48000
         """,
     )
 
@@ -56,12 +71,148 @@ Examples:
         help="Audio delay in milliseconds (default: 0)",
     )
 
+    parser.add_argument(
+        "-b",
+        "--blocksize",
+        type=int,
+        default=DEFAULT_BLOCKSIZE,
+        help=f"Starting (and smallest) audio callback block size in samples (default: {DEFAULT_BLOCKSIZE})",
+    )
+
+    parser.add_argument(
+        "--max-blocksize",
+        type=int,
+        default=DEFAULT_MAX_BLOCKSIZE,
+        help="Largest block size adaptive buffering may grow to after repeated xruns; "
+        f"equal to --blocksize to pin it (default: {DEFAULT_MAX_BLOCKSIZE})",
+    )
+
+    parser.add_argument(
+        "--max-delay",
+        type=float,
+        default=DEFAULT_MAX_DELAY_MS,
+        help=f"Largest delay settable at runtime in milliseconds (default: {DEFAULT_MAX_DELAY_MS:g})",
+    )
+
+    parser.add_argument(
+        "--crossfade",
+        type=float,
+        default=DEFAULT_CROSSFADE_MS,
+        help=f"Crossfade length for runtime delay changes in milliseconds (default: {DEFAULT_CROSSFADE_MS:g})",
+    )
+
+    parser.add_argument(
+        "--control-port",
+        type=int,
+        default=DEFAULT_CONTROL_PORT,
+        help=f"ZeroMQ port for runtime control (set_delay, status), 0 to disable (default: {DEFAULT_CONTROL_PORT})",
+    )
+
+    parser.add_argument(
+        "--auto-sync",
+        action="store_true",
+        help="Follow the virtual camera agent's video latency instead of a fixed delay",
+    )
+
+    parser.add_argument(
+        "--video-feedback-port",
+        type=int,
+        default=DEFAULT_VIDEO_FEEDBACK_PORT,
+        help=f"Virtual camera agent feedback port for --auto-sync (default: {DEFAULT_VIDEO_FEEDBACK_PORT})",
+    )
+
+    parser.add_argument(
+        "--sync-offset",
+        type=float,
+        default=0.0,
+        help="Milliseconds added to the reported video latency, e.g. for the face-swap round trip (default: 0)",
+    )
+
+    parser.add_argument(
+        "--sync-min",
+        type=float,
+        default=0.0,
+        help="Smallest delay auto-sync may set in milliseconds (default: 0)",
+    )
+
+    parser.add_argument(
+        "--sync-max",
+        type=float,
+        default=None,
+        help="Largest delay auto-sync may set in milliseconds (default: --max-delay)",
+    )
+
+    parser.add_argument(
+        "--sync-hysteresis",
+        type=float,
+        default=DEFAULT_SYNC_HYSTERESIS_MS,
+        help=f"Ignore sync corrections smaller than this many milliseconds (default: {DEFAULT_SYNC_HYSTERESIS_MS:g})",
+    )
+
+    parser.add_argument(
+        "--route",
+        dest="routes",
+        action="append",
+        default=[],
+        metavar="DEVICE[;delay=MS][;gain=DB][;map=MAP][;channels=N]",
+        help="Also play the captured audio to another output device; repeatable. "
+        "MAP lists, per output channel, the '+'-joined input channels mixed into it, e.g. 0+1,0+1",
+    )
+
     parser.add_argument(
         "--list-devices",
         action="store_true",
         help="List all available audio devices and exit",
     )
 
+    parser.add_argument(
+        "--no-device-watch",
+        action="store_true",
+        help="Do not follow device hot-plug (by default streams move to a replugged or returning device)",
+    )
+
+    parser.add_argument(
+        "--capture-bus",
+        action="store_true",
+        help="Read the input from the capture bus agent's shared memory when it publishes that device "
+        "(falls back to opening the device)",
+    )
+
+    parser.add_argument(
+        "--render",
+        metavar="WAV|noise",
+        help="Render a WAV file (or seeded noise) offline through the delay and routing code, "
+        "print throughput and each route's measured delay as JSON and exit; no audio devices are opened. "
+        "--route outputs are rendered too, at the --render-output-rate",
+    )
+
+    parser.add_argument(
+        "--render-output",
+        type=Path,
+        help="Write the rendered audio to this WAV file (16-bit PCM); each --route to NAME.routeN.wav beside it",
+    )
+
+    parser.add_argument(
+        "--render-output-rate",
+        type=int,
+        default=None,
+        help="Output sample rate for --render, to exercise resampling (default: the input's rate)",
+    )
+
+    parser.add_argument(
+        "--render-output-channels",
+        type=int,
+        default=1,
+        help="Output channels for --render (default: 1)",
+    )
+
+    parser.add_argument(
+        "--render-seconds",
+        type=float,
+        default=DEFAULT_RENDER_SECONDS,
+        help=f"Length of the synthetic signal for --render {SYNTHETIC_SOURCE} (default: {DEFAULT_RENDER_SECONDS:g})",
+    )
+
     parser.add_argument(
         "--watch-parent",
         action="store_true",
@@ -98,12 +249,59 @@ Examples:
             logger.info("=" * 50)
             return 0
 
+        routes: list[RouteConfig] = []
+        for spec in args.routes:
+            try:
+                routes.append(parse_route(spec))
+            except ValueError as e:
+                parser.error(f"--route: {e}")
+
+        if args.render:
+            controller = AudioController(
+                "",
+                args.delay,
+                blocksize=args.blocksize,
+                max_blocksize=args.blocksize,
+                max_delay_ms=args.max_delay,
+                crossfade_ms=args.crossfade,
+                routes=routes,
+            )
+            try:
+                result = render(
+                    controller,
+                    args.render,
+                    args.render_output,
+                    args.render_output_rate,
+                    args.render_output_channels,
+                    args.render_seconds,
+                )
+            except ValueError as e:
+                parser.error(str(e))
+            print(json.dumps(result, indent=2))  # noqa: T201
+            return 0 if result["passed"] else 1
+
         # Validate required arguments
         if not args.input_device:
             parser.error("--input argument is required (use --list-devices to see available devices)")
 
         # Create and start processor
-        processor = AudioController(args.input_device, args.delay)
+        processor = AudioController(
+            args.input_device,
+            args.delay,
+            blocksize=args.blocksize,
+            max_blocksize=args.max_blocksize,
+            max_delay_ms=args.max_delay,
+            crossfade_ms=args.crossfade,
+            control_port=args.control_port,
+            video_feedback_port=args.video_feedback_port if args.auto_sync else 0,
+            sync_offset_ms=args.sync_offset,
+            sync_min_ms=args.sync_min,
+            sync_max_ms=args.sync_max,
+            sync_hysteresis_ms=args.sync_hysteresis,
+            routes=routes,
+            watch_devices=not args.no_device_watch,
+            capture_bus=args.capture_bus,
+        )
 
         # Start parent process monitor if requested
         if args.watch_parent:
@@ -0,0 +1,100 @@
+"""
+Streaming sample-rate conversion for output routes.
+
+Used only when an output device's native rate differs from the capture rate. The
+resampler pulls exactly the input it needs for each output block, so it can sit
+between a route's DelayReader and the device callback without its own buffering.
+"""
+
+from collections.abc import Callable
+from math import gcd
+from typing import Any
+
+import numpy as np
+
+from agents.audio_control.delay_line import MAX_BLOCK_FRAMES
+
+# Input samples kept from the previous block for interpolation across the boundary
+HISTORY = 2
+
+
+class LinearResampler:
+    """
+    Stateful linear-interpolation resampler with an exact rational step.
+
+    Output sample k sits at input position k * in_rate / out_rate. Positions are kept
+    as integer numerators, so the phase never drifts however long the stream runs.
+    Work buffers are preallocated for blocks up to MAX_BLOCK_FRAMES.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, channels: int) -> None:
+        divisor = gcd(in_rate, out_rate)
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.channels = channels
+        self.down = in_rate // divisor
+        self.up = out_rate // divisor
+
+        # Next output sample index and number of input samples pulled so far
+        self.output_count = 0
+        self.input_count = 0
+
+        # Rows 0..HISTORY-1 hold the last input samples of the previous block, then the pulled input
+        self.buffer = np.zeros((HISTORY, channels), dtype=np.float32)
+        self.allocate(MAX_BLOCK_FRAMES)
+
+    def allocate(self, frames: int) -> None:
+        """Size the work buffers for output blocks of up to frames samples."""
+        self.max_frames = frames
+        max_input = frames * self.down // self.up + HISTORY + 1
+        buffer = np.zeros((HISTORY + max_input, self.channels), dtype=np.float32)
+        buffer[:HISTORY] = self.buffer[:HISTORY]
+        self.buffer = buffer
+        self.steps = np.arange(frames, dtype=np.int64)
+        self.numerators = np.zeros(frames, dtype=np.int64)
+        self.rows = np.zeros(frames, dtype=np.int64)
+        self.fraction = np.zeros((frames, 1), dtype=np.float32)
+        self.left = np.zeros((frames, self.channels), dtype=np.float32)
+        self.right = np.zeros((frames, self.channels), dtype=np.float32)
+
+    def input_frames(self, frames: int) -> int:
+        """Input samples the next process() of frames output samples will pull."""
+        last = ((self.output_count + frames - 1) * self.down) // self.up
+        return max(0, last + 2 - self.input_count)
+
+    def process(self, pull: Callable[[np.ndarray[Any, Any]], None], out: np.ndarray[Any, Any]) -> None:
+        """Fill out with resampled audio, calling pull(block) once to fetch the input it needs."""
+        frames = len(out)
+        if frames > self.max_frames:
+            self.allocate(frames)
+
+        count = self.input_frames(frames)
+        if count:
+            pull(self.buffer[HISTORY : HISTORY + count])
+
+        # Integer input positions: numerator = k * down, index = numerator // up
+        numerators = self.numerators[:frames]
+        rows = self.rows[:frames]
+        np.multiply(self.steps[:frames], self.down, out=numerators)
+        numerators += self.output_count * self.down
+        np.floor_divide(numerators, self.up, out=rows)
+        np.remainder(numerators, self.up, out=numerators)
+        np.divide(numerators, self.up, out=self.fraction[:frames, 0], casting="unsafe")
+
+        # Buffer row of input index i is i - (input_count - HISTORY)
+        rows += HISTORY - self.input_count
+        left = self.left[:frames]
+        right = self.right[:frames]
+        np.take(self.buffer, rows, axis=0, out=left)
+        rows += 1
+        np.take(self.buffer, rows, axis=0, out=right)
+
+        # Linear interpolation in place: each output is left plus fraction of the step to right
+        right -= left
+        right *= self.fraction[:frames]
+        np.add(left, right, out=out)
+
+        # Keep the last input samples for the next block
+        self.buffer[:HISTORY] = self.buffer[count : count + HISTORY]
+        self.input_count += count
+        self.output_count += frames
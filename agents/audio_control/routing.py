@@ -0,0 +1,173 @@
+"""
+Output routes for the audio control agent.
+
+One capture stream is written once into a shared SampleRing. Each route plays it to an
+output device through its own DelayReader, gain and channel map. The primary route (the
+VB-Cable input) is rendered inside the duplex capture callback; other routes run in
+their own output stream callbacks, so a slow device only underruns itself.
+
+Every device is opened at its native sample rate. A route whose rate differs from the
+capture rate pulls from its reader through a LinearResampler; the channel map is one
+matrix multiply per block in either case.
+
+Route specs (--route) are ';'-separated: a device name, then optional key=value pairs:
+    "Speakers;delay=120;gain=-6;map=0+1,0+1"
+map lists, per output channel, the '+'-joined input channels averaged into it.
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from agents.audio_control.delay_line import MAX_BLOCK_FRAMES, DelayReader
+from agents.audio_control.resampler import LinearResampler
+
+if TYPE_CHECKING:
+    import sounddevice as sd
+
+ChannelMap = list[list[int]]
+
+# Output channels opened on a device when the route does not ask for a count
+DEFAULT_MAX_OUTPUT_CHANNELS = 2
+
+
+@dataclass(slots=True)
+class RouteConfig:
+    """Settings for one output route."""
+
+    device: str
+    delay_ms: float = 0.0
+    gain_db: float = 0.0
+    channel_map: ChannelMap | None = None
+    channels: int | None = None
+
+
+def parse_channel_map(text: str) -> ChannelMap:
+    """Parse '0+1,1' into [[0, 1], [1]]."""
+    try:
+        channel_map = [[int(channel) for channel in output.split("+")] for output in text.split(",")]
+    except ValueError:
+        msg = f"Invalid channel map: {text!r}"
+        raise ValueError(msg) from None
+    if any(channel < 0 for output in channel_map for channel in output):
+        msg = f"Invalid channel map: {text!r}"
+        raise ValueError(msg)
+    return channel_map
+
+
+def parse_route(spec: str) -> RouteConfig:
+    """Parse a route spec: DEVICE[;delay=MS][;gain=DB][;map=MAP][;channels=N]."""
+    device, *options = spec.split(";")
+    if not device.strip():
+        msg = f"Route needs a device name: {spec!r}"
+        raise ValueError(msg)
+
+    config = RouteConfig(device=device.strip())
+    for option in options:
+        key, _, value = option.partition("=")
+        key = key.strip().lower()
+        if key == "delay":
+            config.delay_ms = float(value)
+        elif key == "gain":
+            config.gain_db = float(value)
+        elif key == "map":
+            config.channel_map = parse_channel_map(value)
+        elif key == "channels":
+            config.channels = int(value)
+        else:
+            msg = f"Unknown route option {key!r} in {spec!r}"
+            raise ValueError(msg)
+    return config
+
+
+def default_channel_map(input_channels: int, output_channels: int) -> ChannelMap:
+    """Identity when the counts match, an average of all inputs for mono, otherwise wrap around."""
+    if output_channels == 1:
+        return [list(range(input_channels))]
+    return [[channel % input_channels] for channel in range(output_channels)]
+
+
+def mix_matrix(channel_map: ChannelMap, input_channels: int, gain: float = 1.0) -> np.ndarray[Any, Any]:
+    """Build the (input_channels, output_channels) matrix that applies a channel map and gain."""
+    matrix = np.zeros((input_channels, len(channel_map)), dtype=np.float32)
+    for output, inputs in enumerate(channel_map):
+        for channel in inputs:
+            if channel >= input_channels:
+                msg = f"Channel map uses input {channel} but the capture has {input_channels} channels"
+                raise ValueError(msg)
+            matrix[channel, output] += gain / len(inputs)
+    return matrix
+
+
+def db_to_gain(gain_db: float) -> float:
+    """Convert decibels to a linear amplitude factor."""
+    return float(10.0 ** (gain_db / 20.0))
+
+
+class Route:
+    """One output: a delayed reader of the shared capture ring, mixed to the device's channels."""
+
+    def __init__(
+        self,
+        name: str,
+        reader: DelayReader,
+        channel_map: ChannelMap,
+        gain_db: float = 0.0,
+        resampler: LinearResampler | None = None,
+    ) -> None:
+        self.name = name
+        self.reader = reader
+        self.resampler = resampler
+        self.channel_map = channel_map
+        self.gain_db = gain_db
+        self.matrix = mix_matrix(channel_map, reader.ring.channels, db_to_gain(gain_db))
+        self.output_channels = len(channel_map)
+        self.scratch = np.zeros((MAX_BLOCK_FRAMES, reader.ring.channels), dtype=np.float32)
+
+        # Statistics
+        self.callbacks = 0
+        self.output_underflows = 0
+
+    def set_gain(self, gain_db: float) -> None:
+        """Change the gain; the matrix is swapped in one assignment, safe against the audio thread."""
+        self.matrix = mix_matrix(self.channel_map, self.reader.ring.channels, db_to_gain(gain_db))
+        self.gain_db = gain_db
+
+    def render(self, outdata: np.ndarray[Any, Any]) -> None:
+        """Fill an output block from the ring through this route's delay, gain and channel map."""
+        frames = len(outdata)
+        if frames > len(self.scratch):
+            self.scratch = np.zeros((frames, self.scratch.shape[1]), dtype=np.float32)
+        block = self.scratch[:frames]
+        if self.resampler is None:
+            self.reader.read(block)
+        else:
+            self.resampler.process(self.reader.read, block)
+        np.matmul(block, self.matrix, out=outdata)
+
+    def callback(
+        self,
+        outdata: np.ndarray[Any, Any],
+        _frames: int,
+        _time_info: Any,  # noqa: ANN401
+        status: "sd.CallbackFlags",
+    ) -> None:
+        """Output stream callback for routes that are not part of the duplex stream."""
+        if status.output_underflow:
+            self.output_underflows += 1
+        self.render(outdata)
+        self.callbacks += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Return route statistics."""
+        return {
+            "device": self.name,
+            "delay_samples": self.reader.delay,
+            "gain_db": self.gain_db,
+            "channels": self.output_channels,
+            "resampled": self.resampler is not None,
+            "underruns": self.reader.underruns,
+            "overruns": self.reader.overruns,
+            "output_underflows": self.output_underflows,
+        }
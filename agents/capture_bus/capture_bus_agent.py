@@ -0,0 +1,144 @@
+"""
+Capture Bus Agent - opens each input device once and publishes it on a shared-memory bus.
+"""
+
+import time
+from typing import Any
+
+import sounddevice as sd
+from loguru import logger
+
+from agents.shared.audio_device_service import AudioDeviceService
+from agents.shared.capture_bus import DEFAULT_BUS_SECONDS, CaptureBusWriter
+
+DEFAULT_BLOCKSIZE = 256
+STATS_INTERVAL_SECONDS = 10.0
+
+
+class DeviceCapture:
+    """One input device captured at its native rate and channel count into its bus."""
+
+    def __init__(self, device_name: str, blocksize: int, seconds: float) -> None:
+        self.device_name = device_name
+        self.blocksize = blocksize
+        self.seconds = seconds
+        self.writer: CaptureBusWriter | None = None
+        self.stream: sd.InputStream | None = None
+
+        # Statistics (written by the audio callback)
+        self.callbacks = 0
+        self.input_overflows = 0
+
+    def start(self) -> bool:
+        """Resolve the device, create its bus and start capturing."""
+        index = AudioDeviceService.get_device_index_by_name(self.device_name)
+        info = AudioDeviceService.get_device_info_by_index(index) if index >= 0 else None
+        if not info:
+            logger.error(f"Input device '{self.device_name}' not found")
+            return False
+
+        sample_rate = int(info.get("default_samplerate") or 48000)
+        channels = int(info["max_input_channels"])
+        # Readers look the bus up by the device's own name, whichever way the user spelled it
+        self.writer = CaptureBusWriter(info["name"], sample_rate, channels, self.seconds)
+        try:
+            self.stream = sd.InputStream(
+                device=index,
+                channels=channels,
+                samplerate=sample_rate,
+                blocksize=self.blocksize,
+                dtype="float32",
+                latency="low",
+                callback=self.callback,
+            )
+            self.stream.start()
+        except sd.PortAudioError as e:
+            logger.error(f"Failed to open '{info['name']}': {e}")
+            self.stop()
+            return False
+
+        logger.info(
+            f"Publishing '{info['name']}' ({channels}ch {sample_rate}Hz) on bus {self.writer.name} "
+            f"({self.seconds:g}s ring)"
+        )
+        return True
+
+    def stop(self) -> None:
+        """Stop capturing and remove the bus."""
+        if self.stream:
+            try:
+                self.stream.close()
+            except sd.PortAudioError as e:
+                logger.warning(f"Error closing audio stream: {e}")
+            self.stream = None
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+    def callback(
+        self,
+        indata: Any,  # noqa: ANN401
+        _frames: int,
+        _time_info: Any,  # noqa: ANN401
+        status: sd.CallbackFlags,
+    ) -> None:
+        """Input stream callback, run on the PortAudio thread."""
+        if status.input_overflow:
+            self.input_overflows += 1
+        if self.writer is not None:
+            self.writer.write(indata)
+        self.callbacks += 1
+
+
+class CaptureBusAgent:
+    """Publishes each configured input device on its own capture bus."""
+
+    def __init__(
+        self,
+        device_names: list[str],
+        blocksize: int = DEFAULT_BLOCKSIZE,
+        seconds: float = DEFAULT_BUS_SECONDS,
+    ) -> None:
+        self.captures = [DeviceCapture(name, blocksize, seconds) for name in device_names]
+        self.running = False
+
+    def start(self) -> bool:
+        """Start every device; fails if any of them cannot be captured."""
+        for capture in self.captures:
+            if not capture.start():
+                self.stop()
+                return False
+        self.running = True
+        return True
+
+    def stop(self) -> None:
+        """Stop every device and remove the buses."""
+        self.running = False
+        for capture in self.captures:
+            capture.stop()
+
+    def log_stats(self) -> None:
+        """Log per-device frame counts and overflows."""
+        for capture in self.captures:
+            written = capture.writer.write_index if capture.writer else 0
+            logger.info(
+                f"Stats - {capture.device_name}: {written} frames published, "
+                f"Callbacks: {capture.callbacks}, Input overflows: {capture.input_overflows}"
+            )
+
+    def run(self) -> int:
+        """Main run loop of a started agent; stops it on exit."""
+        try:
+            last_stats_time = time.monotonic()
+            while self.running:
+                time.sleep(0.5)
+                if time.monotonic() - last_stats_time >= STATS_INTERVAL_SECONDS:
+                    last_stats_time = time.monotonic()
+                    self.log_stats()
+        except KeyboardInterrupt:
+            logger.info("Keyboard interrupt received")
+        finally:
+            self.stop()
+
+        logger.info("Capture Bus Agent exited")
+        return 0
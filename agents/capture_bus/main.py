@@ -0,0 +1,96 @@
+"""
+Capture Bus Agent - Main Entry Point
+Captures each input device once and shares it with the ASR and audio control agents
+through shared memory (start them with --capture-bus).
+"""
+
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+
+import psutil
+from loguru import logger
+
+from agents.capture_bus.capture_bus_agent import DEFAULT_BLOCKSIZE, CaptureBusAgent
+from agents.shared.capture_bus import DEFAULT_BUS_SECONDS
+
+
+def monitor_parent_process(parent_pid: int, agent: CaptureBusAgent) -> None:
+    """Monitor parent process and exit if it dies."""
+    logger.info(f"Monitoring parent process PID: {parent_pid}")
+    while agent.running:
+        try:
+            if not psutil.pid_exists(parent_pid):
+                raise ProcessLookupError  # noqa: TRY301
+        except (OSError, ProcessLookupError):
+            logger.warning(f"Parent process {parent_pid} no longer exists. Shutting down...")
+            agent.running = False
+            break
+        time.sleep(1.0)
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Capture Bus Agent - Shares input devices through shared memory")
+    parser.add_argument(
+        "-i",
+        "--input",
+        dest="devices",
+        action="append",
+        required=True,
+        help="Input device name (partial match supported); repeatable",
+    )
+    parser.add_argument(
+        "-b",
+        "--blocksize",
+        type=int,
+        default=DEFAULT_BLOCKSIZE,
+        help=f"Capture block size in samples (default: {DEFAULT_BLOCKSIZE})",
+    )
+    parser.add_argument(
+        "--bus-seconds",
+        type=float,
+        default=DEFAULT_BUS_SECONDS,
+        help=f"Audio kept in each shared ring, in seconds (default: {DEFAULT_BUS_SECONDS:g})",
+    )
+    parser.add_argument(
+        "--watch-parent",
+        action="store_true",
+        help="Monitor parent process and exit if it dies",
+    )
+
+    args = parser.parse_args()
+
+    agent = CaptureBusAgent(args.devices, blocksize=args.blocksize, seconds=args.bus_seconds)
+
+    # Setup signal handlers for graceful shutdown
+    def signal_handler(signum: int, _frame: object) -> None:
+        logger.info(f"Received signal {signum}")
+        agent.running = False
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    if not agent.start():
+        logger.error("Failed to start Capture Bus Agent")
+        return 1
+
+    # Start parent process monitor if requested; after start(), as it runs while the agent does
+    if args.watch_parent:
+        parent_pid = os.getppid()
+        monitor_thread = threading.Thread(
+            target=monitor_parent_process,
+            args=(parent_pid, agent),
+            daemon=True,
+            name="parent-monitor",
+        )
+        monitor_thread.start()
+
+    return agent.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,407 @@
+"""
+Shared services - Benchmarks
+
+devices:  cost of the device lookups an agent makes at startup against a fake backend
+          with many devices (virtual cables and docks easily add 50+), comparing the
+          former per-call enumeration with a cold and a warm DeviceRegistry.
+hotplug:  unplugs and replugs devices on the fake backend under a polling DeviceWatcher,
+          checks each change is reported correctly and measures detection latency and
+          the cost of one check. Exits non-zero if a change is missed or misreported.
+bus:      one process writes a sample-index ramp to a capture bus faster than real time
+          while reader processes attach and check every frame arrives once, in order.
+          Exits non-zero on a missing, repeated or corrupted frame.
+
+Results are printed as JSON. No Windows API or audio devices are needed.
+
+Usage:
+    python -m agents.shared.benchmark devices --devices 60 --iterations 200
+    python -m agents.shared.benchmark hotplug --devices 60 --poll-interval 0.05
+    python -m agents.shared.benchmark bus --readers 2 --seconds 10 --speed 20
+"""
+
+import argparse
+import json
+import multiprocessing
+import queue
+import sys
+import time
+from typing import Any
+
+import numpy as np
+
+from agents.shared.capture_bus import CaptureBusReader, CaptureBusWriter
+from agents.shared.device_registry import MME_NAME_LENGTH, DeviceRegistry
+from agents.shared.device_watcher import DeviceChange, DeviceWatcher
+
+DEFAULT_DEVICE_COUNT = 60
+DEFAULT_ITERATIONS = 200
+VB_CABLE_NAME = "CABLE Input (VB-Audio Virtual Cable)"
+DEFAULT_POLL_INTERVAL_SECONDS = 0.05
+HOTPLUG_TIMEOUT_SECONDS = 2.0
+DEFAULT_BUS_READERS = 2
+DEFAULT_BUS_SECONDS = 10.0
+DEFAULT_BUS_SPEED = 20.0
+BUS_DEVICE_NAME = "Microphone (Benchmark Capture Bus)"
+BUS_SAMPLE_RATE = 48000
+BUS_CHANNELS = 2
+BUS_BLOCK_FRAMES = 480
+# Ramp values wrap here so every one is exact in float32
+RAMP_PERIOD = 1 << 20
+
+
+class FakeBackend:
+    """DeviceBackend with a synthetic MME + PortAudio device list that counts its queries."""
+
+    def __init__(self, count: int) -> None:
+        names = [f"Microphone {i} (USB Audio Device Dock Station)" for i in range(count // 2)]
+        names += [f"Speakers {i} (High Definition Audio Device)" for i in range(count - count // 2 - 1)]
+        names.append(VB_CABLE_NAME)
+        # Shaped like sd.query_devices() entries
+        self.devices: list[dict[str, Any]] = [
+            {
+                "index": index,
+                "name": name[:MME_NAME_LENGTH],
+                "hostapi": 0,
+                "max_input_channels": 2 if name.startswith("Microphone") else 0,
+                "max_output_channels": 0 if name.startswith("Microphone") else 2,
+                "default_samplerate": 48000.0,
+            }
+            for index, name in enumerate(names)
+        ]
+        self.portaudio_queries = 0
+        self.mme_queries = 0
+
+    def remove(self, name: str) -> dict[str, Any]:
+        """Unplug the device with this (truncated) name and return it."""
+        device = next(device for device in self.devices if device["name"] == name[:MME_NAME_LENGTH])
+        self.devices.remove(device)
+        return device
+
+    def add(self, device: dict[str, Any]) -> None:
+        """Plug a device (back) in."""
+        self.devices.append(device)
+
+    def query_devices(self) -> list[dict[str, Any]]:
+        """All PortAudio devices."""
+        self.portaudio_queries += 1
+        return [device.copy() for device in self.devices]
+
+    def query_hostapis(self) -> list[dict[str, Any]]:
+        """One MME host API."""
+        return [{"name": "MME"}]
+
+    def mme_devices(self, *, output: bool) -> list[tuple[str, int]] | None:
+        """MME names and channel counts."""
+        self.mme_queries += 1
+        key = "max_output_channels" if output else "max_input_channels"
+        return [(device["name"], device[key]) for device in self.devices if device[key] > 0]
+
+
+def legacy_devices(backend: FakeBackend, *, output: bool) -> list[dict[str, Any]]:
+    """The former enumeration: one MME pass, with a full PortAudio query per device to find its index."""
+    key = "max_output_channels" if output else "max_input_channels"
+    devices = []
+    for mme_index, (name, channels) in enumerate(backend.mme_devices(output=output) or []):
+        index = next(
+            (int(d["index"]) for d in backend.query_devices() if d["name"] == name and d[key] > 0),
+            mme_index,
+        )
+        devices.append({"index": index, "name": name, key: channels})
+    return devices
+
+
+def legacy_startup(backend: FakeBackend, input_name: str) -> tuple[int, int]:
+    """Former AudioController.start lookups: input by name, VB-Cable, then info for both."""
+    input_index = next(
+        (
+            d["index"]
+            for d in legacy_devices(backend, output=False) + legacy_devices(backend, output=True)
+            if input_name.startswith(d["name"])
+        ),
+        -1,
+    )
+    vb_index = next(
+        (d["index"] for d in legacy_devices(backend, output=True) if d["name"].startswith(VB_CABLE_NAME[:29])),
+        -1,
+    )
+    backend.query_devices()
+    backend.query_devices()
+    return input_index, vb_index
+
+
+def registry_startup(registry: DeviceRegistry, input_name: str) -> tuple[int, int]:
+    """The same lookups against the registry."""
+    input_index = registry.index_by_name(input_name)
+    vb_index = next(
+        (d["index"] for d in registry.output_devices() if d["name"].startswith(VB_CABLE_NAME[:29])),
+        -1,
+    )
+    registry.info_by_index(input_index)
+    registry.info_by_index(vb_index)
+    return input_index, vb_index
+
+
+def benchmark_devices(count: int, iterations: int) -> dict[str, Any]:
+    """Time the startup lookups legacy, cold (fresh enumeration) and warm (cached)."""
+    # Full, untruncated name, as a user would type it; the MME list holds the 31-char truncation
+    input_name = "Microphone 7 (USB Audio Device Dock Station)"
+    results: dict[str, Any] = {"benchmark": "devices", "devices": count, "iterations": iterations}
+
+    backend = FakeBackend(count)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        expected = legacy_startup(backend, input_name)
+    results["legacy"] = {
+        "ms_per_startup": (time.perf_counter() - start) * 1000.0 / iterations,
+        "portaudio_queries_per_startup": backend.portaudio_queries / iterations,
+    }
+
+    for mode in ("cold", "warm"):
+        backend = FakeBackend(count)
+        registry = DeviceRegistry(backend)
+        registry.current()
+        backend.portaudio_queries = 0
+        start = time.perf_counter()
+        for _ in range(iterations):
+            if mode == "cold":
+                registry.invalidate()
+            found = registry_startup(registry, input_name)
+        results[mode] = {
+            "ms_per_startup": (time.perf_counter() - start) * 1000.0 / iterations,
+            "portaudio_queries_per_startup": backend.portaudio_queries / iterations,
+            "matches_legacy": found == expected,
+        }
+
+    results["speedup_cold"] = results["legacy"]["ms_per_startup"] / max(1e-9, results["cold"]["ms_per_startup"])
+    results["speedup_warm"] = results["legacy"]["ms_per_startup"] / max(1e-9, results["warm"]["ms_per_startup"])
+    return results
+
+
+def benchmark_hotplug(count: int, poll_interval: float, iterations: int) -> dict[str, Any]:
+    """Unplug and replug a microphone and the VB-Cable under a polling watcher."""
+    backend = FakeBackend(count)
+    registry = DeviceRegistry(backend)
+    watcher = DeviceWatcher(registry, poll_interval, use_notifications=False)
+    changes: queue.SimpleQueue[tuple[float, DeviceChange]] = queue.SimpleQueue()
+    watcher.subscribe(lambda change: changes.put((time.perf_counter(), change)))
+    watcher.start()
+
+    microphone = "Microphone 3 (USB Audio Device Dock Station)"[:MME_NAME_LENGTH]
+    cable = VB_CABLE_NAME[:MME_NAME_LENGTH]
+    steps: list[tuple[str, Any]] = [
+        ("remove", microphone),
+        ("add", microphone),
+        ("remove", cable),
+        ("add", cable),
+    ]
+    events = []
+    unplugged: dict[str, dict[str, Any]] = {}
+    try:
+        for action, name in steps:
+            start = time.perf_counter()
+            if action == "remove":
+                unplugged[name] = backend.remove(name)
+            else:
+                backend.add(unplugged.pop(name))
+            try:
+                detected, change = changes.get(timeout=HOTPLUG_TIMEOUT_SECONDS)
+            except queue.Empty:
+                events.append({"action": action, "device": name, "detected": False})
+                continue
+
+            is_input = name == microphone
+            expected = {
+                ("remove", True): change.removed_inputs,
+                ("add", True): change.added_inputs,
+                ("remove", False): change.removed_outputs,
+                ("add", False): change.added_outputs,
+            }[(action, is_input)]
+            events.append(
+                {
+                    "action": action,
+                    "device": name,
+                    "detected": True,
+                    "correct": expected == [name] and len(str(change).split(";")) == 1,
+                    "latency_ms": (detected - start) * 1000.0,
+                }
+            )
+    finally:
+        watcher.stop()
+
+    # Cost of one check with nothing changed: one enumeration plus the set difference
+    start = time.perf_counter()
+    for _ in range(iterations):
+        watcher.check()
+    check_ms = (time.perf_counter() - start) * 1000.0 / iterations
+
+    return {
+        "benchmark": "hotplug",
+        "devices": count,
+        "poll_interval": poll_interval,
+        "events": events,
+        "ms_per_check": check_ms,
+        "passed": all(event["detected"] and event["correct"] for event in events),
+    }
+
+
+def bus_reader_process(frames: int, ready: Any, results: Any) -> None:  # noqa: ANN401
+    """Reader process: attach, then read until frames have arrived, checking the ramp as it goes."""
+    reader = CaptureBusReader(BUS_DEVICE_NAME)
+    ready.set()
+    expected = reader.position
+    mismatches = 0
+    busy = 0.0
+    deadline = time.monotonic() + HOTPLUG_TIMEOUT_SECONDS + frames / BUS_SAMPLE_RATE
+    while reader.frames_read < frames and time.monotonic() < deadline:
+        start = time.perf_counter()
+        block = reader.read(BUS_BLOCK_FRAMES * 4)
+        if not len(block):
+            time.sleep(0.001)
+            continue
+        if reader.position - len(block) != expected:
+            # Skipped ahead after an overrun
+            expected = reader.position - len(block)
+        ramp = (np.arange(expected, expected + len(block)) % RAMP_PERIOD).astype(np.float32)
+        mismatches += int(np.count_nonzero(block[:, 0] != ramp) + np.count_nonzero(block[:, 1] != -ramp))
+        expected += len(block)
+        busy += time.perf_counter() - start
+    results.put(
+        {
+            "frames_read": reader.frames_read,
+            "mismatches": mismatches,
+            "overruns": reader.overruns,
+            "busy_ms_per_audio_second": busy * 1000.0 / max(1.0, reader.frames_read / BUS_SAMPLE_RATE),
+        }
+    )
+    reader.close()
+
+
+def benchmark_bus(readers: int, seconds: float, speed: float) -> dict[str, Any]:
+    """Write seconds of audio at speed times real time to a bus read by separate processes."""
+    frames = int(seconds * BUS_SAMPLE_RATE)
+    writer = CaptureBusWriter(BUS_DEVICE_NAME, BUS_SAMPLE_RATE, BUS_CHANNELS)
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = []
+    try:
+        for _ in range(readers):
+            ready = context.Event()
+            process = context.Process(target=bus_reader_process, args=(frames, ready, results), daemon=True)
+            process.start()
+            ready.wait(timeout=30)
+            processes.append(process)
+
+        block = np.empty((BUS_BLOCK_FRAMES, BUS_CHANNELS), dtype=np.float32)
+        interval = BUS_BLOCK_FRAMES / BUS_SAMPLE_RATE / speed
+        write_time = 0.0
+        start = time.perf_counter()
+        for position in range(0, frames, BUS_BLOCK_FRAMES):
+            ramp = (np.arange(position, position + BUS_BLOCK_FRAMES) % RAMP_PERIOD).astype(np.float32)
+            block[:, 0] = ramp
+            block[:, 1] = -ramp
+            write_start = time.perf_counter()
+            writer.write(block)
+            write_time += time.perf_counter() - write_start
+            # Pace like a device clock running speed times faster than real time
+            delay = start + (position // BUS_BLOCK_FRAMES + 1) * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        reports = [results.get(timeout=HOTPLUG_TIMEOUT_SECONDS + seconds) for _ in processes]
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+        writer.close()
+
+    return {
+        "benchmark": "bus",
+        "readers": readers,
+        "device_opens": 1,
+        "frames": frames,
+        "speed": speed,
+        "write_us_per_block": write_time * 1e6 * BUS_BLOCK_FRAMES / max(1, frames),
+        "reader_results": reports,
+        "passed": len(reports) == readers
+        and all(report["frames_read"] >= frames and report["mismatches"] == 0 for report in reports),
+    }
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Shared services benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    devices_parser = subparsers.add_parser("devices", help="Startup device lookup cost")
+    devices_parser.add_argument(
+        "-n",
+        "--devices",
+        type=int,
+        default=DEFAULT_DEVICE_COUNT,
+        help=f"Number of fake devices (default: {DEFAULT_DEVICE_COUNT})",
+    )
+    devices_parser.add_argument(
+        "-i",
+        "--iterations",
+        type=int,
+        default=DEFAULT_ITERATIONS,
+        help=f"Startups to time (default: {DEFAULT_ITERATIONS})",
+    )
+
+    hotplug_parser = subparsers.add_parser("hotplug", help="Device change detection with a polling watcher")
+    hotplug_parser.add_argument(
+        "-n",
+        "--devices",
+        type=int,
+        default=DEFAULT_DEVICE_COUNT,
+        help=f"Number of fake devices (default: {DEFAULT_DEVICE_COUNT})",
+    )
+    hotplug_parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL_SECONDS,
+        help=f"Watcher poll interval in seconds (default: {DEFAULT_POLL_INTERVAL_SECONDS:g})",
+    )
+    hotplug_parser.add_argument(
+        "-i",
+        "--iterations",
+        type=int,
+        default=DEFAULT_ITERATIONS,
+        help=f"Checks to time (default: {DEFAULT_ITERATIONS})",
+    )
+
+    bus_parser = subparsers.add_parser("bus", help="Shared-memory capture bus with reader processes")
+    bus_parser.add_argument(
+        "-r",
+        "--readers",
+        type=int,
+        default=DEFAULT_BUS_READERS,
+        help=f"Reader processes (default: {DEFAULT_BUS_READERS})",
+    )
+    bus_parser.add_argument(
+        "-s",
+        "--seconds",
+        type=float,
+        default=DEFAULT_BUS_SECONDS,
+        help=f"Audio to write, in seconds (default: {DEFAULT_BUS_SECONDS:g})",
+    )
+    bus_parser.add_argument(
+        "--speed",
+        type=float,
+        default=DEFAULT_BUS_SPEED,
+        help=f"Write rate as a multiple of real time (default: {DEFAULT_BUS_SPEED:g})",
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "bus":
+        result = benchmark_bus(args.readers, args.seconds, args.speed)
+    elif args.command == "hotplug":
+        result = benchmark_hotplug(args.devices, args.poll_interval, args.iterations)
+    else:
+        result = benchmark_devices(args.devices, args.iterations)
+    print(json.dumps(result, indent=2))  # noqa: T201
+    return 0 if result.get("passed", True) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Shared-memory capture bus.
+
+One process (the capture bus agent) opens each physical input device once and writes
+its float32 PCM into a shared-memory ring. Any number of agents attach as readers: each
+keeps its own read position and gets numpy views straight into the shared ring, so a
+device is opened, converted and buffered once however many agents use it.
+
+The ring's write index counts frames since the bus was created and, together with the
+wall-clock time of the latest write, gives every reader the same sample clock.
+
+Layout: a 64-byte header followed by capacity frames of channels float32 samples. The
+writer fills the frames first and then publishes the new write index, so readers never
+see frames that are not written yet.
+"""
+
+import contextlib
+import hashlib
+import os
+import sys
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+import numpy as np
+import psutil
+
+from agents.shared.device_registry import MME_NAME_LENGTH
+
+DEFAULT_BUS_SECONDS = 10.0
+BUS_NAME_PREFIX = "pi-capture-"
+BUS_MAGIC = 0x50494342  # "PICB"
+BUS_VERSION = 1
+# A bus not written for this long has no live writer (devices deliver every few milliseconds)
+STALE_BUS_SECONDS = 5.0
+
+HEADER_DTYPE = np.dtype(
+    [
+        ("magic", "<u4"),
+        ("version", "<u4"),
+        ("sample_rate", "<u4"),
+        ("channels", "<u4"),
+        ("capacity", "<u8"),
+        ("write_index", "<u8"),
+        ("write_time", "<f8"),
+        ("writer_pid", "<u4"),
+        ("reserved", "<u4", (5,)),
+    ]
+)
+HEADER_SIZE = HEADER_DTYPE.itemsize
+
+
+def bus_name(device_name: str) -> str:
+    """Shared-memory name of a device's bus; MME-truncated names map to the same bus as full ones."""
+    digest = hashlib.sha1(device_name[:MME_NAME_LENGTH].encode("utf-8"), usedforsecurity=False).hexdigest()
+    return BUS_NAME_PREFIX + digest[:16]
+
+
+def open_memory(name: str, *, create: bool = False, size: int = 0) -> SharedMemory:
+    """
+    Create or open a segment without registering it with the resource tracker.
+
+    The tracker would otherwise unlink the bus when any reader exits (POSIX). The writer
+    unlinks it in close(), and a segment left by a crashed writer is replaced on restart.
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name, create=create, size=size, track=False)  # type: ignore[call-arg]
+    memory = SharedMemory(name, create=create, size=size)
+    if os.name != "nt":
+        resource_tracker.unregister(memory._name, "shared_memory")  # type: ignore[attr-defined]  # noqa: SLF001
+    return memory
+
+
+def unlink_memory(memory: SharedMemory) -> None:
+    """Unlink a segment opened with open_memory."""
+    if sys.version_info < (3, 13) and os.name != "nt":
+        # unlink() unregisters the segment, so register it again first to keep the tracker balanced
+        resource_tracker.register(memory._name, "shared_memory")  # type: ignore[attr-defined]  # noqa: SLF001
+    memory.unlink()
+
+
+class CaptureBusWriter:
+    """Creates a device's bus and appends captured blocks to it; one writer per device."""
+
+    def __init__(self, device_name: str, sample_rate: int, channels: int, seconds: float = DEFAULT_BUS_SECONDS) -> None:
+        self.device_name = device_name
+        self.name = bus_name(device_name)
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.capacity = int(seconds * sample_rate)
+
+        size = HEADER_SIZE + self.capacity * channels * np.dtype(np.float32).itemsize
+        try:
+            self.memory = open_memory(self.name, create=True, size=size)
+        except FileExistsError:
+            # Still mapped by readers of a previous writer (Windows frees it with the last handle),
+            # or left behind by a writer that crashed (POSIX)
+            existing = open_memory(self.name)
+            if os.name == "nt" and existing.size >= size:
+                self.memory = existing
+            else:
+                existing.close()
+                unlink_memory(existing)
+                self.memory = open_memory(self.name, create=True, size=size)
+
+        self.header: np.ndarray[Any, Any] = np.ndarray((), dtype=HEADER_DTYPE, buffer=self.memory.buf)
+        self.buffer: np.ndarray[Any, Any] = np.ndarray(
+            (self.capacity, channels), dtype=np.float32, buffer=self.memory.buf, offset=HEADER_SIZE
+        )
+        self.header["sample_rate"] = sample_rate
+        self.header["channels"] = channels
+        self.header["capacity"] = self.capacity
+        self.header["write_index"] = 0
+        self.header["write_time"] = time.time()
+        self.header["writer_pid"] = os.getpid()
+        self.header["version"] = BUS_VERSION
+        # Written last: readers only trust a bus once the magic is there
+        self.header["magic"] = BUS_MAGIC
+        self.write_index = 0
+
+    def write(self, block: np.ndarray[Any, Any]) -> None:
+        """Append a (frames, channels) block, then publish the new write index."""
+        frames = len(block)
+        start = self.write_index % self.capacity
+        first = min(frames, self.capacity - start)
+        self.buffer[start : start + first] = block[:first]
+        if first < frames:
+            self.buffer[: frames - first] = block[first:]
+        self.write_index += frames
+        self.header["write_time"] = time.time()
+        self.header["write_index"] = self.write_index
+
+    def close(self) -> None:
+        """Remove the bus; attached readers keep their mapping but see no new frames."""
+        self.header["magic"] = 0
+        del self.header, self.buffer
+        unlink_memory(self.memory)
+        # Views still held elsewhere keep the mapping alive until they are collected
+        with contextlib.suppress(BufferError):
+            self.memory.close()
+
+
+class CaptureBusReader:
+    """
+    Attaches to a device's bus and reads it from its own position.
+
+    Reads return views into the shared ring, valid until the writer laps them. A reader
+    that falls more than the ring's guard behind is moved forward to the newest frames
+    and the skip is counted as an overrun.
+    """
+
+    def __init__(self, device_name: str) -> None:
+        self.device_name = device_name
+        self.name = bus_name(device_name)
+        # FileNotFoundError if no capture bus agent publishes this device
+        self.memory = open_memory(self.name)
+        self.header: np.ndarray[Any, Any] = np.ndarray((), dtype=HEADER_DTYPE, buffer=self.memory.buf)
+        if int(self.header["magic"]) != BUS_MAGIC or int(self.header["version"]) != BUS_VERSION:
+            self.memory.close()
+            msg = f"Capture bus '{self.name}' for '{device_name}' is not ready or has another version"
+            raise ValueError(msg)
+        # A writer that crashed leaves its segment behind on POSIX, magic and all
+        writer_pid = int(self.header["writer_pid"])
+        idle = time.time() - float(self.header["write_time"])
+        if not psutil.pid_exists(writer_pid) or idle > STALE_BUS_SECONDS:
+            self.memory.close()
+            msg = f"Capture bus '{self.name}' for '{device_name}' has no live writer"
+            msg += f" (PID {writer_pid}, idle {idle:.1f}s)"
+            raise ValueError(msg)
+
+        self.sample_rate = int(self.header["sample_rate"])
+        self.channels = int(self.header["channels"])
+        self.capacity = int(self.header["capacity"])
+        self.buffer: np.ndarray[Any, Any] = np.ndarray(
+            (self.capacity, self.channels), dtype=np.float32, buffer=self.memory.buf, offset=HEADER_SIZE
+        )
+        # Frames kept clear of the writer, so a view handed out is not overwritten while in use
+        self.guard = self.capacity // 4
+        self.position = int(self.header["write_index"])
+
+        # Statistics
+        self.frames_read = 0
+        self.overruns = 0
+
+    @property
+    def write_index(self) -> int:
+        """Frames written to the bus since it was created."""
+        return int(self.header["write_index"])
+
+    @property
+    def available(self) -> int:
+        """Frames written but not yet read."""
+        return self.write_index - self.position
+
+    def time_of(self, index: int) -> float:
+        """Wall-clock time (time.time()) at which the frame with this bus index was captured."""
+        write_index = int(self.header["write_index"])
+        return float(self.header["write_time"]) - (write_index - index) / self.sample_rate
+
+    def read(self, max_frames: int) -> np.ndarray[Any, Any]:
+        """View of up to max_frames new frames; shorter at the ring's end, empty if nothing is new."""
+        write_index = self.write_index
+        if write_index < self.position:
+            # A new writer restarted the bus
+            self.position = write_index
+        elif write_index - self.position > self.capacity - self.guard:
+            self.overruns += 1
+            self.position = write_index
+        start = self.position % self.capacity
+        frames = min(max_frames, write_index - self.position, self.capacity - start)
+        self.position += frames
+        self.frames_read += frames
+        return self.buffer[start : start + frames]
+
+    def close(self) -> None:
+        """Detach from the bus."""
+        del self.header, self.buffer
+        # Views still held by the caller keep the mapping alive until they are collected
+        with contextlib.suppress(BufferError):
+            self.memory.close()
@@ -0,0 +1,122 @@
+"""
+Local control endpoint shared by the agents.
+
+Requests and replies are JSON objects on a ZeroMQ REP socket bound to localhost. Every
+request names a command, which is dispatched to the handler the agent registered for it:
+    {"command": "status"}
+
+Every reply has "ok"; failures carry an "error" message. The commands each agent accepts
+are listed in its own control module (agents/audio_control/control.py, agents/vcam/control.py).
+"""
+
+import json
+import threading
+from collections.abc import Callable
+from typing import Any
+
+import zmq
+from loguru import logger
+
+CONTROL_POLL_TIMEOUT_MS = 500
+
+
+class ControlError(ValueError):
+    """Invalid control request."""
+
+
+# Replies are merged into {"ok": True}; a handler reports a failure that carries more
+# than a message by returning "ok": False itself, or raises ControlError
+Handler = Callable[[dict[str, Any]], dict[str, Any]]
+
+
+def parse_request(message: str) -> dict[str, Any]:
+    """Parse a control request, raising ControlError if it is not a JSON object with a command."""
+    try:
+        request = json.loads(message)
+    except json.JSONDecodeError as e:
+        msg = f"Invalid JSON: {e}"
+        raise ControlError(msg) from e
+
+    if not isinstance(request, dict) or not isinstance(request.get("command"), str):
+        msg = "Request must be a JSON object with a command"
+        raise ControlError(msg)
+    return request
+
+
+def number_field(request: dict[str, Any], name: str, default: float | None = None) -> float:
+    """Read a numeric request field, raising ControlError if it is missing or not a number."""
+    value = request.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, int | float):
+        msg = f"{name} must be a number"
+        raise ControlError(msg)
+    return float(value)
+
+
+class ControlServer:
+    """Serves JSON control requests on a background thread, dispatching them by command name."""
+
+    def __init__(self, port: int, handlers: dict[str, Handler], name: str = "control") -> None:
+        self.port = port
+        self.handlers = handlers
+        self.name = name
+        self.running = False
+        self.zmq_context: zmq.Context[Any] | None = None
+        self.socket: zmq.Socket[Any] | None = None
+        self.thread: threading.Thread | None = None
+
+    def start(self) -> bool:
+        """Bind the REP socket and start serving."""
+        try:
+            self.zmq_context = zmq.Context()
+            self.socket = self.zmq_context.socket(zmq.REP)
+            self.socket.setsockopt(zmq.LINGER, 0)
+            self.socket.bind(f"tcp://127.0.0.1:{self.port}")
+        except zmq.ZMQError as e:
+            logger.error(f"Failed to bind control socket on port {self.port}: {e}")
+            self.stop()
+            return False
+
+        self.running = True
+        self.thread = threading.Thread(target=self.serve, daemon=True, name=self.name)
+        self.thread.start()
+        logger.info(f"Control endpoint listening on port {self.port}")
+        return True
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+        if self.socket:
+            self.socket.close()
+            self.socket = None
+        if self.zmq_context:
+            self.zmq_context.term()
+            self.zmq_context = None
+
+    def serve(self) -> None:
+        """Control thread: Answer requests until stopped."""
+        while self.running and self.socket:
+            try:
+                if not self.socket.poll(CONTROL_POLL_TIMEOUT_MS):
+                    continue
+                message = self.socket.recv_string()
+                self.socket.send_string(json.dumps(self.handle(message)))
+            except Exception as e:
+                logger.error(f"Error handling control request: {e}")
+
+    def handle(self, message: str) -> dict[str, Any]:
+        """Dispatch one request and build its reply."""
+        try:
+            request = parse_request(message)
+            handler = self.handlers.get(request["command"])
+            if handler is None:
+                msg = f"Unknown command: {request['command']}"
+                raise ControlError(msg)
+
+            return {"ok": True, **handler(request)}
+
+        except (TypeError, ValueError) as e:
+            # ControlError, and handlers rejecting a malformed field, are both ValueErrors
+            return {"ok": False, "error": str(e)}
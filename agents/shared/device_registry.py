@@ -0,0 +1,212 @@
+"""
+Cached, indexed snapshot of the audio devices.
+
+One refresh enumerates the MME devices once and PortAudio once, then builds dicts for
+every lookup the agents make: by exact name, by the 31-character name MME truncates
+to, and by prefix (longest match). Snapshots expire after a TTL and can be invalidated
+explicitly, e.g. when a device is plugged in. The enumeration itself goes through a
+DeviceBackend, so the registry can be exercised without Windows or sound hardware.
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+from loguru import logger
+
+DEFAULT_REGISTRY_TTL_SECONDS = 30.0
+
+# MME device names are at most 31 characters (szPname is 32 bytes including the NUL)
+MME_NAME_LENGTH = 31
+
+
+class DeviceBackend(Protocol):
+    """Source of raw device lists."""
+
+    def query_devices(self) -> list[dict[str, Any]]:
+        """All PortAudio devices, as sounddevice.query_devices() returns them."""
+        ...
+
+    def query_hostapis(self) -> list[dict[str, Any]]:
+        """All PortAudio host APIs."""
+        ...
+
+    def mme_devices(self, *, output: bool) -> list[tuple[str, int]] | None:
+        """(name, channels) of each MME input or output device, or None if MME is not available."""
+        ...
+
+
+@dataclass(slots=True)
+class DeviceSnapshot:
+    """Device lists and lookup maps from one enumeration."""
+
+    inputs: list[dict[str, Any]] = field(default_factory=list)
+    outputs: list[dict[str, Any]] = field(default_factory=list)
+    portaudio: dict[int, dict[str, Any]] = field(default_factory=dict)
+    hostapis: list[dict[str, Any]] = field(default_factory=list)
+    # name -> device index, separately for input-capable, output-capable and all devices
+    input_names: dict[str, int] = field(default_factory=dict)
+    output_names: dict[str, int] = field(default_factory=dict)
+    all_names: dict[str, int] = field(default_factory=dict)
+    created: float = 0.0
+
+
+def add_name(names: dict[str, int], name: str, index: int) -> None:
+    """Index a device under its name and its MME-truncated name; the first device to claim a key keeps it."""
+    names.setdefault(name, index)
+    names.setdefault(name[:MME_NAME_LENGTH], index)
+
+
+def lookup(names: dict[str, int], name: str) -> int:
+    """Exact or truncated name, else the longest indexed name that is a prefix of name; -1 if none."""
+    if name in names:
+        return names[name]
+    if name[:MME_NAME_LENGTH] in names:
+        return names[name[:MME_NAME_LENGTH]]
+    for length in range(min(len(name), MME_NAME_LENGTH) - 1, 0, -1):
+        if name[:length] in names:
+            return names[name[:length]]
+    return -1
+
+
+class DeviceRegistry:
+    """Enumerates devices at most once per TTL and answers lookups from dicts."""
+
+    def __init__(
+        self,
+        backend: DeviceBackend,
+        ttl: float = DEFAULT_REGISTRY_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.snapshot: DeviceSnapshot | None = None
+
+        # Statistics
+        self.refreshes = 0
+
+    def invalidate(self) -> None:
+        """Drop the cached snapshot; the next lookup enumerates again."""
+        with self.lock:
+            self.snapshot = None
+
+    def current(self) -> DeviceSnapshot:
+        """Return the cached snapshot, enumerating again if it is missing or older than the TTL."""
+        with self.lock:
+            if self.snapshot is None or self.clock() - self.snapshot.created > self.ttl:
+                self.snapshot = self.build()
+                self.refreshes += 1
+            return self.snapshot
+
+    def build(self) -> DeviceSnapshot:
+        """Enumerate once and index the results."""
+        snapshot = DeviceSnapshot(created=self.clock())
+        try:
+            devices = [dict(device) for device in self.backend.query_devices()]
+        except Exception as e:
+            logger.error(f"Device query failed: {e}")
+            devices = []
+        try:
+            snapshot.hostapis = [dict(hostapi) for hostapi in self.backend.query_hostapis()]
+        except Exception as e:
+            logger.warning(f"Host API query failed: {e}")
+
+        # PortAudio index maps, used to resolve MME names to PortAudio device indexes
+        portaudio_inputs: dict[str, int] = {}
+        portaudio_outputs: dict[str, int] = {}
+        for position, device in enumerate(devices):
+            device.setdefault("index", position)
+            snapshot.portaudio[int(device["index"])] = device
+            if device["max_input_channels"] > 0:
+                add_name(portaudio_inputs, device["name"], int(device["index"]))
+            if device["max_output_channels"] > 0:
+                add_name(portaudio_outputs, device["name"], int(device["index"]))
+
+        snapshot.inputs = self.build_side(devices, portaudio_inputs, snapshot.portaudio, output=False)
+        snapshot.outputs = self.build_side(devices, portaudio_outputs, snapshot.portaudio, output=True)
+
+        for device in snapshot.inputs:
+            add_name(snapshot.input_names, device["name"], device["index"])
+        for device in snapshot.outputs:
+            add_name(snapshot.output_names, device["name"], device["index"])
+        for device in snapshot.inputs + snapshot.outputs:
+            add_name(snapshot.all_names, device["name"], device["index"])
+        return snapshot
+
+    def build_side(
+        self,
+        devices: list[dict[str, Any]],
+        portaudio_names: dict[str, int],
+        portaudio: dict[int, dict[str, Any]],
+        *,
+        output: bool,
+    ) -> list[dict[str, Any]]:
+        """Input or output device list: MME devices mapped to PortAudio indexes, or PortAudio's own list."""
+        channels_key = "max_output_channels" if output else "max_input_channels"
+        other_key = "max_input_channels" if output else "max_output_channels"
+        try:
+            mme = self.backend.mme_devices(output=output)
+        except Exception as e:
+            logger.warning(f"Failed to query {'output' if output else 'input'} devices via Windows API: {e}")
+            mme = None
+
+        if mme is None:
+            return [device for device in devices if device[channels_key] > 0]
+
+        result = []
+        for mme_index, (name, channels) in enumerate(mme):
+            index = portaudio_names.get(name, -1)
+            match = portaudio.get(index)
+            result.append(
+                {
+                    "index": index if index >= 0 else mme_index,  # Use SD index if found, otherwise MME index
+                    "name": name,
+                    channels_key: channels,
+                    other_key: 0,
+                    "default_samplerate": match["default_samplerate"] if match else 44100,
+                    "hostapi": 0,  # MME host API index
+                }
+            )
+        return result
+
+    def devices(self) -> list[dict[str, Any]]:
+        """Input and output devices, merged by index (devices that do both are listed once)."""
+        snapshot = self.current()
+        merged: dict[int, dict[str, Any]] = {}
+        for device in snapshot.inputs + snapshot.outputs:
+            existing = merged.get(device["index"])
+            if existing is None:
+                merged[device["index"]] = device.copy()
+            else:
+                existing["max_input_channels"] = max(existing["max_input_channels"], device["max_input_channels"])
+                existing["max_output_channels"] = max(existing["max_output_channels"], device["max_output_channels"])
+        return list(merged.values())
+
+    def input_devices(self) -> list[dict[str, Any]]:
+        """Input devices (copies)."""
+        return [device.copy() for device in self.current().inputs]
+
+    def output_devices(self) -> list[dict[str, Any]]:
+        """Output devices (copies)."""
+        return [device.copy() for device in self.current().outputs]
+
+    def index_by_name(self, name: str, *, output: bool | None = None) -> int:
+        """Device index for a name (exact, MME-truncated or longest prefix), or -1."""
+        snapshot = self.current()
+        if output is None:
+            return lookup(snapshot.all_names, name)
+        return lookup(snapshot.output_names if output else snapshot.input_names, name)
+
+    def info_by_index(self, index: int) -> dict[str, Any] | None:
+        """PortAudio info for a device index (a copy), or None if there is no such device."""
+        device = self.current().portaudio.get(index)
+        return device.copy() if device is not None else None
+
+    def hostapi_name(self, hostapi: int) -> str | None:
+        """Name of a host API by index, or None if unknown."""
+        hostapis = self.current().hostapis
+        return hostapis[hostapi]["name"] if 0 <= hostapi < len(hostapis) else None
@@ -0,0 +1,253 @@
+"""
+Audio device hot-plug watcher.
+
+Watches the DeviceRegistry for devices being added or removed and tells subscribers
+what changed, so capture and playback components can move their streams to the
+replacement device in place instead of the whole agent being restarted.
+
+On Windows, a Configuration Manager notification for the audio device interface class
+wakes the watcher as soon as a device arrives or leaves. Elsewhere, or if registration
+fails, the watcher polls; each check is one enumeration and a set difference of names.
+Polling only sees hot-plug where names come from MME, which enumerates live: PortAudio
+lists devices as of its last initialization, so without MME (i.e. off Windows) a change
+shows up only after an agent re-initializes PortAudio, as it does when a stream stalls.
+"""
+
+import ctypes
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from agents.shared.device_registry import DeviceRegistry
+
+DEFAULT_POLL_INTERVAL_SECONDS = 2.0
+# With change notifications the poll is only a backstop
+NOTIFIED_POLL_INTERVAL_SECONDS = 30.0
+# Devices arrive as bursts of interface notifications; wait for the burst to settle
+DEBOUNCE_SECONDS = 0.3
+
+# KSCATEGORY_AUDIO device interface class
+AUDIO_INTERFACE_CLASS = "{6994AD04-93EF-11D0-A3CC-00A0C9223196}"
+CM_NOTIFY_FILTER_TYPE_DEVICEINTERFACE = 0
+CR_SUCCESS = 0
+MAX_DEVICE_ID_LEN = 200
+
+
+@dataclass(slots=True)
+class DeviceChange:
+    """Device names that appeared or disappeared since the previous check."""
+
+    added_inputs: list[str] = field(default_factory=list)
+    removed_inputs: list[str] = field(default_factory=list)
+    added_outputs: list[str] = field(default_factory=list)
+    removed_outputs: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added_inputs or self.removed_inputs or self.added_outputs or self.removed_outputs)
+
+    def __str__(self) -> str:
+        parts = [
+            f"{label}: {', '.join(names)}"
+            for label, names in (
+                ("inputs added", self.added_inputs),
+                ("inputs removed", self.removed_inputs),
+                ("outputs added", self.added_outputs),
+                ("outputs removed", self.removed_outputs),
+            )
+            if names
+        ]
+        return "; ".join(parts) or "no change"
+
+
+class GUID(ctypes.Structure):
+    _fields_ = [  # noqa: RUF012
+        ("Data1", ctypes.c_ulong),
+        ("Data2", ctypes.c_ushort),
+        ("Data3", ctypes.c_ushort),
+        ("Data4", ctypes.c_ubyte * 8),
+    ]
+
+
+class CM_NOTIFY_FILTER(ctypes.Structure):  # noqa: N801
+    class _Target(ctypes.Union):
+        _fields_ = [  # noqa: RUF012
+            ("ClassGuid", GUID),
+            ("InstanceId", ctypes.c_wchar * MAX_DEVICE_ID_LEN),
+        ]
+
+    _fields_ = [  # noqa: RUF012
+        ("cbSize", ctypes.c_ulong),
+        ("Flags", ctypes.c_ulong),
+        ("FilterType", ctypes.c_int),
+        ("Reserved", ctypes.c_ulong),
+        ("u", _Target),
+    ]
+
+
+class DeviceNotification:
+    """Calls on_event whenever an audio device interface arrives or is removed (Windows only)."""
+
+    try:
+        cfgmgr32 = ctypes.windll.cfgmgr32
+        CALLBACK = ctypes.WINFUNCTYPE(
+            ctypes.c_ulong, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p, ctypes.c_ulong
+        )
+    except AttributeError:
+        cfgmgr32 = None
+        CALLBACK = None
+
+    def __init__(self, on_event: Callable[[], None]) -> None:
+        self.on_event = on_event
+        self.handle = ctypes.c_void_p()
+        self.callback = None
+
+    def register(self) -> bool:
+        """Register for notifications; returns False where they are not available."""
+        if self.cfgmgr32 is None or self.CALLBACK is None:
+            return False
+
+        notify_filter = CM_NOTIFY_FILTER()
+        notify_filter.cbSize = ctypes.sizeof(CM_NOTIFY_FILTER)
+        notify_filter.FilterType = CM_NOTIFY_FILTER_TYPE_DEVICEINTERFACE
+        notify_filter.u.ClassGuid = GUID.from_buffer_copy(uuid.UUID(AUDIO_INTERFACE_CLASS).bytes_le)
+
+        # Keep a reference: the system calls this from its own thread for as long as we are registered
+        self.callback = self.CALLBACK(self.notify)
+        result = self.cfgmgr32.CM_Register_Notification(
+            ctypes.byref(notify_filter), None, self.callback, ctypes.byref(self.handle)
+        )
+        if result != CR_SUCCESS:
+            logger.warning(f"CM_Register_Notification failed ({result}), polling for device changes")
+            self.callback = None
+            return False
+        return True
+
+    def unregister(self) -> None:
+        """Stop receiving notifications."""
+        if self.callback is not None and self.cfgmgr32 is not None:
+            self.cfgmgr32.CM_Unregister_Notification(self.handle)
+            self.callback = None
+
+    def notify(self, _handle: int, _context: int, _action: int, _data: int, _size: int) -> int:
+        """Configuration Manager callback."""
+        self.on_event()
+        return 0
+
+
+class DeviceWatcher:
+    """Diffs the registry's device names on notification or poll and reports changes to subscribers."""
+
+    def __init__(
+        self,
+        registry: DeviceRegistry,
+        poll_interval: float = DEFAULT_POLL_INTERVAL_SECONDS,
+        *,
+        use_notifications: bool = True,
+    ) -> None:
+        self.registry = registry
+        self.poll_interval = poll_interval
+        self.use_notifications = use_notifications
+        self.subscribers: list[Callable[[DeviceChange], None]] = []
+        self.notification: DeviceNotification | None = None
+
+        self.wake = threading.Event()
+        self.running = False
+        self.thread: threading.Thread | None = None
+        self.inputs: set[str] = set()
+        self.outputs: set[str] = set()
+
+        # Statistics
+        self.checks = 0
+        self.changes = 0
+
+    def subscribe(self, callback: Callable[[DeviceChange], None]) -> None:
+        """Call callback(change) on the watcher thread after every detected change."""
+        self.subscribers.append(callback)
+
+    def start(self) -> None:
+        """Take the initial device list and start watching."""
+        self.inputs, self.outputs = self.snapshot_names()
+        interval = self.poll_interval
+        if self.use_notifications:
+            self.notification = DeviceNotification(self.wake.set)
+            if self.notification.register():
+                interval = max(interval, NOTIFIED_POLL_INTERVAL_SECONDS)
+                logger.info("Watching audio devices via change notifications")
+            else:
+                self.notification = None
+        if self.notification is None:
+            logger.info(f"Watching audio devices by polling every {interval:g}s")
+            if not self.enumerates_live():
+                logger.warning(
+                    "Device names come from PortAudio, which does not re-enumerate while streams are open; "
+                    "hot-plug is detected on Windows only, elsewhere streams move only when they stall"
+                )
+
+        self.running = True
+        self.thread = threading.Thread(target=self.watch, args=(interval,), daemon=True, name="device-watcher")
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop watching."""
+        self.running = False
+        self.wake.set()
+        if self.notification:
+            self.notification.unregister()
+            self.notification = None
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+
+    def watch(self, interval: float) -> None:
+        """Watcher thread: Check for changes on every notification, and every interval regardless."""
+        while self.running:
+            if self.wake.wait(interval):
+                time.sleep(DEBOUNCE_SECONDS)
+                self.wake.clear()
+            if not self.running:
+                break
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Error checking audio devices: {e}")
+
+    def enumerates_live(self) -> bool:
+        """True if the registry's names come from MME, which sees devices plugged in since startup."""
+        try:
+            return self.registry.backend.mme_devices(output=False) is not None
+        except Exception:
+            return False
+
+    def snapshot_names(self) -> tuple[set[str], set[str]]:
+        """Re-enumerate and return the current (input, output) device names."""
+        self.registry.invalidate()
+        inputs = {device["name"] for device in self.registry.input_devices()}
+        outputs = {device["name"] for device in self.registry.output_devices()}
+        return inputs, outputs
+
+    def check(self) -> DeviceChange:
+        """Re-enumerate once, diff against the previous names and notify subscribers of any change."""
+        self.checks += 1
+        inputs, outputs = self.snapshot_names()
+        change = DeviceChange(
+            added_inputs=sorted(inputs - self.inputs),
+            removed_inputs=sorted(self.inputs - inputs),
+            added_outputs=sorted(outputs - self.outputs),
+            removed_outputs=sorted(self.outputs - outputs),
+        )
+        self.inputs, self.outputs = inputs, outputs
+        if not change:
+            return change
+
+        self.changes += 1
+        logger.info(f"Audio devices changed - {change}")
+        for callback in self.subscribers:
+            try:
+                callback(change)
+            except Exception as e:
+                logger.error(f"Device change handler failed: {e}")
+        return change
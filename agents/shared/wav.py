@@ -0,0 +1,51 @@
+"""
+PCM WAV file reading and writing for the audio agents (stdlib wave plus numpy).
+"""
+
+import wave
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+# PCM sample width in bytes -> (numpy dtype, full scale)
+PCM_FORMATS = {1: (np.uint8, 128.0), 2: (np.int16, 32768.0), 4: (np.int32, 2147483648.0)}
+# 24-bit PCM has no numpy dtype and is widened to int32 on read
+PCM24_WIDTH = 3
+
+
+def read_wav(path: Path) -> tuple[np.ndarray[Any, Any], int]:
+    """Read a PCM WAV file as (frames, channels) float32 in [-1, 1) and its sample rate."""
+    with wave.open(str(path), "rb") as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        data = wav.readframes(wav.getnframes())
+
+    if width == PCM24_WIDTH:
+        # Widen each little-endian sample to int32 by placing it in the top three bytes
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, PCM24_WIDTH)
+        padded = np.zeros((len(raw), 4), dtype=np.uint8)
+        padded[:, 1:] = raw
+        samples = padded.view("<i4")[:, 0].astype(np.float32) / 2147483648.0
+    elif width in PCM_FORMATS:
+        dtype, scale = PCM_FORMATS[width]
+        samples = np.frombuffer(data, dtype=dtype).astype(np.float32)
+        if width == 1:
+            samples -= 128.0
+        samples /= scale
+    else:
+        msg = f"Unsupported WAV sample width: {width} bytes"
+        raise ValueError(msg)
+
+    return samples.reshape(-1, channels), rate
+
+
+def write_wav(path: Path, signal: np.ndarray[Any, Any], rate: int) -> None:
+    """Write (frames, channels) float audio as a 16-bit PCM WAV file."""
+    pcm = (np.clip(signal, -1.0, 1.0 - 1.0 / 32768.0) * 32768.0).astype("<i2")
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(signal.shape[1])
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
@@ -0,0 +1,161 @@
+"""
+Backpressure feedback for frame producers.
+
+The virtual camera agent periodically publishes how well it is keeping up, together
+with the largest resolution, JPEG quality and frame rate it recommends, so producers
+can stop spending CPU on frames that would only be dropped.
+
+The same message carries the agent's smoothed end-to-end video latency, which the audio
+control agent follows to keep audio in sync. Fields added after version 1 have defaults,
+so older messages still parse.
+"""
+
+import json
+import time
+from dataclasses import MISSING, asdict, dataclass, fields
+
+FEEDBACK_VERSION = 1
+
+# Resolution ladder producers are stepped through, largest first
+RESOLUTION_LADDER: tuple[tuple[int, int], ...] = (
+    (1920, 1080),
+    (1280, 720),
+    (960, 540),
+    (640, 360),
+)
+FPS_LADDER: tuple[int, ...] = (30, 24, 20, 15)
+
+MAX_JPEG_QUALITY = 90
+MIN_JPEG_QUALITY = 50
+JPEG_QUALITY_STEP = 10
+
+# Windows above these are overloaded; below the healthy ones for a while we step back up
+OVERLOAD_DROP_RATE = 0.05
+OVERLOAD_DECODE_LOAD = 0.8
+OVERLOAD_QUEUE_DELAY_MS = 100.0
+HEALTHY_DROP_RATE = 0.01
+HEALTHY_DECODE_LOAD = 0.5
+HEALTHY_WINDOWS_BEFORE_STEP_UP = 5
+
+
+@dataclass(frozen=True, slots=True)
+class FeedbackWindow:
+    """Agent measurements over one feedback interval."""
+
+    elapsed: float
+    frames_received: int
+    frames_decoded: int
+    frames_dropped: int
+    decode_ms_p90: float
+    queue_delay_ms_p50: float
+
+
+@dataclass(frozen=True, slots=True)
+class Feedback:
+    """Feedback message published to producers."""
+
+    version: int
+    timestamp_ms: float
+    decode_fps: float
+    receive_fps: float
+    drop_rate: float
+    queue_delay_ms: float
+    decode_ms: float
+    max_width: int
+    max_height: int
+    jpeg_quality: int
+    fps: int
+    video_latency_ms: float = 0.0
+
+    def to_json(self) -> str:
+        """Serialize to the JSON wire format."""
+        return json.dumps(asdict(self), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, message: str) -> "Feedback":
+        """Parse a JSON feedback message."""
+        data = json.loads(message)
+        return cls(**{f.name: data[f.name] for f in fields(cls) if f.name in data or f.default is MISSING})
+
+
+class BackpressureAdvisor:
+    """
+    Turns agent load measurements into producer recommendations.
+
+    Overload steps quality down first (cheapest for the producer to change and invisible
+    at small steps), then resolution, then frame rate. Recovery steps back up in the
+    reverse order, one step per run of healthy windows, so the producer does not
+    oscillate around the limit.
+    """
+
+    def __init__(self, max_width: int, max_height: int, max_fps: int) -> None:
+        self.max_fps = max_fps
+        self.resolutions = [(max_width, max_height)]
+        self.resolutions += [(w, h) for w, h in RESOLUTION_LADDER if w < max_width and h < max_height]
+        self.fps_steps = [max_fps] + [fps for fps in FPS_LADDER if fps < max_fps]
+
+        self.quality = MAX_JPEG_QUALITY
+        self.resolution_index = 0
+        self.fps_index = 0
+        self.healthy_windows = 0
+
+    def update(self, window: FeedbackWindow) -> Feedback:
+        """Fold one measurement window into the recommendation and return the feedback message."""
+        elapsed = max(window.elapsed, 1e-6)
+        received = max(window.frames_received, 1)
+        drop_rate = window.frames_dropped / received
+        decode_load = window.decode_ms_p90 / (1000.0 / self.fps_steps[self.fps_index])
+
+        overloaded = (
+            drop_rate > OVERLOAD_DROP_RATE
+            or decode_load > OVERLOAD_DECODE_LOAD
+            or window.queue_delay_ms_p50 > OVERLOAD_QUEUE_DELAY_MS
+        )
+        healthy = drop_rate < HEALTHY_DROP_RATE and decode_load < HEALTHY_DECODE_LOAD
+
+        if window.frames_received == 0:
+            # Nothing to judge; hold the current recommendation
+            pass
+        elif overloaded:
+            self.healthy_windows = 0
+            self._step_down()
+        elif healthy:
+            self.healthy_windows += 1
+            if self.healthy_windows >= HEALTHY_WINDOWS_BEFORE_STEP_UP:
+                self.healthy_windows = 0
+                self._step_up()
+        else:
+            self.healthy_windows = 0
+
+        width, height = self.resolutions[self.resolution_index]
+        return Feedback(
+            version=FEEDBACK_VERSION,
+            timestamp_ms=time.time() * 1000.0,
+            decode_fps=window.frames_decoded / elapsed,
+            receive_fps=window.frames_received / elapsed,
+            drop_rate=drop_rate,
+            queue_delay_ms=window.queue_delay_ms_p50,
+            decode_ms=window.decode_ms_p90,
+            max_width=width,
+            max_height=height,
+            jpeg_quality=self.quality,
+            fps=self.fps_steps[self.fps_index],
+        )
+
+    def _step_down(self) -> None:
+        """Reduce producer cost by one step."""
+        if self.quality > MIN_JPEG_QUALITY:
+            self.quality = max(MIN_JPEG_QUALITY, self.quality - JPEG_QUALITY_STEP)
+        elif self.resolution_index < len(self.resolutions) - 1:
+            self.resolution_index += 1
+        elif self.fps_index < len(self.fps_steps) - 1:
+            self.fps_index += 1
+
+    def _step_up(self) -> None:
+        """Restore producer quality by one step, undoing the most recent reduction first."""
+        if self.fps_index > 0:
+            self.fps_index -= 1
+        elif self.resolution_index > 0:
+            self.resolution_index -= 1
+        elif self.quality < MAX_JPEG_QUALITY:
+            self.quality = min(MAX_JPEG_QUALITY, self.quality + JPEG_QUALITY_STEP)
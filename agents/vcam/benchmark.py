@@ -0,0 +1,522 @@
+"""
+Virtual Camera Agent - Benchmarks
+
+formats:   per-frame cost of turning producer payloads into camera frames for every
+           combination of producer format and camera pixel format.
+pipeline:  drives the full agent (receive, decode, pace, write) from the reference
+           producer into a null sink, so it runs without a virtual camera driver.
+pacer:     drives the frame pacer into a null sink on a simulated clock and checks
+           deadlines stay absolute (no drift from sleep overshoot), missed slots are
+           counted and skipped rather than burst, set_fps re-anchors the schedule and
+           the jitter percentiles match the intervals produced. Deterministic; exits
+           non-zero if a check fails.
+backpressure: feeds the backpressure advisor windows from a simulated agent whose
+           decode cost follows the recommendation, first under contention and then
+           without it, and checks the recommendation steps down until the drops stop,
+           holds there, and then steps back up to the maximum without reversing.
+           Deterministic; exits non-zero if a check fails.
+
+Results are printed as JSON.
+
+Usage:
+    python -m agents.vcam.benchmark formats --width 1920 --height 1080
+    python -m agents.vcam.benchmark pipeline --width 1280 --height 720 --fps 30 --duration 10
+    python -m agents.vcam.benchmark pacer --fps 30
+    python -m agents.vcam.benchmark backpressure
+"""
+
+import argparse
+import itertools
+import json
+import math
+import sys
+import time
+from typing import Any
+
+import cv2
+import numpy as np
+
+from agents.vcam.backpressure import (
+    FPS_LADDER,
+    MAX_JPEG_QUALITY,
+    RESOLUTION_LADDER,
+    BackpressureAdvisor,
+    FeedbackWindow,
+)
+from agents.vcam.frame_pacer import FramePacer
+from agents.vcam.pixel_format import (
+    CAMERA_FORMAT_PREFERENCE,
+    FrameFormat,
+    convert_frame,
+    decode_frame,
+    encode_raw_frame,
+)
+from agents.vcam.reference_producer import ReferenceProducer, synthetic_frame
+from agents.vcam.sinks import NullSink
+from agents.vcam.vcam_agent import LATENCY_STAGES, VCamAgent
+
+DEFAULT_ITERATIONS = 100
+DEFAULT_JPEG_QUALITY = 80
+
+# Pipeline benchmark ports, away from the ones a running app uses
+DEFAULT_PIPELINE_PORT = 50101
+PIPELINE_WARMUP_SECONDS = 1.0
+PIPELINE_DRAIN_SECONDS = 0.5
+
+# Pacer check: frames per scenario, and how close simulated times must match
+PACER_FRAMES = 100
+PACER_TOLERANCE_SECONDS = 1e-9
+PACER_OVERSHOOT_SECONDS = 0.001
+PACER_LATE_SECONDS = 0.005
+PACER_LATE_EVERY = 10
+PACER_OVERRUN_SLOTS = 3.5
+
+# Backpressure check, for a 1080p30 producer: simulated decode cost per megapixel at full
+# JPEG quality, how much contention multiplies it while overloaded, and how many one-second
+# windows each phase runs
+BACKPRESSURE_DECODE_MS_PER_MEGAPIXEL = 6.0
+BACKPRESSURE_CONTENTION = 4.0
+BACKPRESSURE_OVERLOAD_WINDOWS = 20
+BACKPRESSURE_RECOVERY_WINDOWS = 40
+# Windows at the end of the overloaded phase the recommendation must hold steady for
+BACKPRESSURE_SETTLED_WINDOWS = 10
+
+
+def encode_payload(frame: np.ndarray[Any, Any], fmt: FrameFormat, jpeg_quality: int) -> bytes:
+    """Encode a BGR frame as a producer payload in the given format."""
+    if fmt == FrameFormat.JPEG:
+        ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+        if not ok:
+            msg = "JPEG encoding failed"
+            raise RuntimeError(msg)
+        return buffer.tobytes()
+    return encode_raw_frame(convert_frame(frame, FrameFormat.BGR, fmt), fmt)
+
+
+def time_per_call(func: Any, iterations: int) -> float:  # noqa: ANN401
+    """Return mean milliseconds per call after one warm-up call."""
+    func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1000.0 / iterations
+
+
+def benchmark_formats(width: int, height: int, iterations: int, jpeg_quality: int) -> dict[str, Any]:
+    """Benchmark decode + conversion for every producer/camera format combination."""
+    frame = synthetic_frame(width, height)
+    results: list[dict[str, Any]] = []
+
+    # Baseline: the previous fixed JPEG -> BGR -> RGB path
+    jpeg = encode_payload(frame, FrameFormat.JPEG, jpeg_quality)
+
+    def legacy() -> None:
+        decoded = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if decoded is None:
+            msg = "JPEG decoding failed"
+            raise RuntimeError(msg)
+        cv2.cvtColor(decoded, cv2.COLOR_BGR2RGB)
+
+    results.append(
+        {
+            "source": "JPEG",
+            "camera": "RGB (legacy path)",
+            "payload_bytes": len(jpeg),
+            "ms_per_frame": time_per_call(legacy, iterations),
+        }
+    )
+
+    for source in (FrameFormat.JPEG, FrameFormat.I420, FrameFormat.NV12):
+        payload = encode_payload(frame, source, jpeg_quality)
+        for camera in CAMERA_FORMAT_PREFERENCE:
+            ms = time_per_call(lambda p=payload, c=camera: decode_frame(p, width, height, c), iterations)
+            results.append(
+                {
+                    "source": source.name,
+                    "camera": camera.name,
+                    "payload_bytes": len(payload),
+                    "ms_per_frame": ms,
+                }
+            )
+
+    return {
+        "benchmark": "formats",
+        "width": width,
+        "height": height,
+        "iterations": iterations,
+        "jpeg_quality": jpeg_quality,
+        "results": results,
+    }
+
+
+def benchmark_pipeline(
+    width: int,
+    height: int,
+    fps: int,
+    duration: float,
+    fmt: FrameFormat,
+    jpeg_quality: int,
+    port: int,
+    pixel_format: FrameFormat | None,
+) -> dict[str, Any]:
+    """Run the reference producer into an agent writing to a null sink and report throughput."""
+    producer = ReferenceProducer(port=port, feedback_port=0, width=width, height=height, fps=fps, fmt=fmt, adapt=False)
+    producer.jpeg_quality = jpeg_quality
+    sink = NullSink(width, height, fps)
+    agent = VCamAgent(
+        width=width,
+        height=height,
+        fps=fps,
+        zmq_port=port,
+        stats_interval=0,
+        pixel_format=pixel_format,
+        idle_timeout=0,
+        sink=sink,
+    )
+
+    producer.start()
+    try:
+        if not agent.start():
+            msg = "Agent failed to start"
+            raise RuntimeError(msg)
+        # Let the PULL socket connect before counting
+        time.sleep(PIPELINE_WARMUP_SECONDS)
+
+        cpu_start = time.process_time()
+        wall_start = time.monotonic()
+        encode_start = producer.encode_seconds
+        written_start = agent.frames_written
+        decoded_start = agent.frames_decoded
+        hits_start = agent.frame_cache.hits
+        received_start = agent.frames_received
+        dropped_start = agent.count_dropped_frames()
+        latency_baseline = {stage: agent.latency[stage].copy() for stage in LATENCY_STAGES}
+
+        producer_stats = producer.run(duration)
+        time.sleep(PIPELINE_DRAIN_SECONDS)
+
+        wall = time.monotonic() - wall_start
+        cpu = time.process_time() - cpu_start
+        written = agent.frames_written - written_start
+        decoded = agent.frames_decoded - decoded_start
+        duplicates = agent.frame_cache.hits - hits_start
+        received = agent.frames_received - received_start
+        dropped = agent.count_dropped_frames() - dropped_start
+        latency = {stage: agent.latency[stage].delta(latency_baseline[stage]) for stage in LATENCY_STAGES}
+        # Producer encoding runs in this process too; subtract it to approximate the agent's share
+        agent_cpu = max(0.0, cpu - (producer.encode_seconds - encode_start))
+    finally:
+        agent.stop()
+        producer.stop()
+
+    return {
+        "benchmark": "pipeline",
+        "width": width,
+        "height": height,
+        "fps": fps,
+        "duration": duration,
+        "source_format": fmt.name,
+        "camera_format": agent.pixel_format.name,
+        "jpeg_quality": jpeg_quality,
+        "frames_sent": producer_stats["frames_sent"],
+        "frames_blocked": producer_stats["frames_blocked"],
+        "frames_received": received,
+        "frames_decoded": decoded,
+        "frames_written": written,
+        "duplicates_skipped": duplicates,
+        "drop_rate": dropped / max(1, received),
+        "decode_fps": decoded / wall,
+        "write_fps": written / wall,
+        "deadlines_missed": agent.pacer.deadlines_missed,
+        "cpu_ms_per_frame": cpu * 1000.0 / max(1, decoded),
+        "agent_cpu_ms_per_frame": agent_cpu * 1000.0 / max(1, decoded),
+        "encode_ms_per_frame": producer_stats["encode_ms_per_frame"],
+        "latency_ms": {stage: hist.summary() for stage, hist in latency.items()},
+    }
+
+
+class SimulatedClock:
+    """Monotonic clock and sleep for the pacer check; sleeping advances time, plus an optional overshoot."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.overshoot = 0.0
+
+    def clock(self) -> float:
+        """Current simulated time."""
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Advance by seconds, oversleeping by the current overshoot as a real sleep would."""
+        self.now += seconds + self.overshoot
+
+
+def paced_outputs(pacer: FramePacer, clock: SimulatedClock, sink: NullSink, frames: int) -> list[float]:
+    """Run the writer loop for frames frames and return the times they went out."""
+    frame = np.zeros((sink.height, sink.width, 3), dtype=np.uint8)
+    times = []
+    for _ in range(frames):
+        pacer.wait()
+        sink.send(frame)
+        times.append(clock.now)
+        pacer.mark_output()
+    return times
+
+
+def benchmark_pacer(fps: int) -> dict[str, Any]:
+    """Check the frame pacer's schedule on a simulated clock."""
+    interval = 1.0 / fps
+    checks: dict[str, dict[str, Any]] = {}
+    clock = SimulatedClock()
+    sink = NullSink(64, 36, fps)
+    sink.open(FrameFormat.BGR)
+
+    # Every sleep oversleeps: outputs stay on the absolute grid, late by one overshoot at most
+    clock.overshoot = PACER_OVERSHOOT_SECONDS
+    pacer = FramePacer(fps, clock=clock.clock, sleep=clock.sleep)
+    times = paced_outputs(pacer, clock, sink, PACER_FRAMES)
+    errors = [t - (times[0] + i * interval) for i, t in enumerate(times)]
+    checks["no_drift"] = {
+        "max_error_ms": max(errors) * 1000.0,
+        "final_error_ms": errors[-1] * 1000.0,
+        "passed": all(
+            -PACER_TOLERANCE_SECONDS <= e <= PACER_OVERSHOOT_SECONDS + PACER_TOLERANCE_SECONDS for e in errors
+        ),
+    }
+
+    # One frame takes 3.5 slots to write: the 3 slots it overran are skipped, not burst, and
+    # the frames after it go out on the original grid
+    clock.overshoot = 0.0
+    pacer = FramePacer(fps, clock=clock.clock, sleep=clock.sleep)
+    before = paced_outputs(pacer, clock, sink, 10)
+    pacer.wait()
+    clock.now += PACER_OVERRUN_SLOTS * interval
+    sink.send(np.zeros((sink.height, sink.width, 3), dtype=np.uint8))
+    pacer.mark_output()
+    after = paced_outputs(pacer, clock, sink, 10)
+    resume_slot = len(before) + math.ceil(PACER_OVERRUN_SLOTS)
+    errors = [t - (before[0] + (resume_slot + i) * interval) for i, t in enumerate(after)]
+    checks["overrun_skips"] = {
+        "deadlines_missed": pacer.deadlines_missed,
+        "max_error_ms": max(abs(e) for e in errors) * 1000.0,
+        "passed": pacer.deadlines_missed == int(PACER_OVERRUN_SLOTS)
+        and all(abs(e) <= PACER_TOLERANCE_SECONDS for e in errors),
+    }
+
+    # set_fps: the next frame is due at once and the new interval runs from there
+    new_fps = max(1, fps // 2)
+    pacer.set_fps(new_fps)
+    changed_at = clock.now
+    times = paced_outputs(pacer, clock, sink, 10)
+    errors = [t - (changed_at + i / new_fps) for i, t in enumerate(times)]
+    checks["set_fps_reanchors"] = {
+        "fps": new_fps,
+        "max_error_ms": max(abs(e) for e in errors) * 1000.0,
+        "passed": all(abs(e) <= PACER_TOLERANCE_SECONDS for e in errors),
+    }
+
+    # Every 10th sleep is 5 ms late: 10% of intervals are long and 10% short by that much
+    pacer = FramePacer(fps, clock=clock.clock, sleep=clock.sleep)
+    frame = np.zeros((sink.height, sink.width, 3), dtype=np.uint8)
+    for i in range(PACER_FRAMES + 1):
+        clock.overshoot = PACER_LATE_SECONDS if i % PACER_LATE_EVERY == PACER_LATE_EVERY // 2 else 0.0
+        pacer.wait()
+        sink.send(frame)
+        pacer.mark_output()
+    p50, p99 = pacer.jitter()
+    checks["jitter_percentiles"] = {
+        "p50_ms": p50 * 1000.0,
+        "p99_ms": p99 * 1000.0,
+        "expected_p50_ms": interval * 1000.0,
+        "expected_p99_ms": (interval + PACER_LATE_SECONDS) * 1000.0,
+        "passed": abs(p50 - interval) <= PACER_TOLERANCE_SECONDS
+        and abs(p99 - (interval + PACER_LATE_SECONDS)) <= PACER_TOLERANCE_SECONDS,
+    }
+
+    sink.close()
+    return {
+        "benchmark": "pacer",
+        "fps": fps,
+        "frames_sent": sink.frames_sent,
+        "checks": checks,
+        "passed": all(check["passed"] for check in checks.values()),
+    }
+
+
+def simulated_window(fps: int, width: int, height: int, quality: int, contention: float) -> FeedbackWindow:
+    """One second of agent measurements for a producer following a recommendation."""
+    # Lower JPEG quality decodes somewhat faster; resolution dominates
+    quality_factor = 0.6 + 0.4 * quality / MAX_JPEG_QUALITY
+    decode_ms = BACKPRESSURE_DECODE_MS_PER_MEGAPIXEL * width * height / 1e6 * quality_factor * contention
+    decoded = min(fps, int(1000.0 / decode_ms))
+    return FeedbackWindow(
+        elapsed=1.0,
+        frames_received=fps,
+        frames_decoded=decoded,
+        frames_dropped=fps - decoded,
+        decode_ms_p90=decode_ms,
+        queue_delay_ms_p50=0.0,
+    )
+
+
+def run_advisor(
+    advisor: BackpressureAdvisor, start: tuple[int, int, int, int], windows: int, contention: float
+) -> list[dict[str, Any]]:
+    """Feed the advisor windows of a producer that follows each recommendation; one record per window."""
+    fps, width, height, quality = start
+    history: list[dict[str, Any]] = []
+    for _ in range(windows):
+        window = simulated_window(fps, width, height, quality, contention)
+        feedback = advisor.update(window)
+        history.append(
+            {
+                "drop_rate": feedback.drop_rate,
+                "recommendation": (feedback.fps, feedback.max_width, feedback.max_height, feedback.jpeg_quality),
+            }
+        )
+        fps, width, height, quality = history[-1]["recommendation"]
+    return history
+
+
+def recommendation_cost(recommendation: tuple[int, int, int, int]) -> tuple[int, int, int]:
+    """Order recommendations by producer cost: frame rate, then pixels, then quality."""
+    fps, width, height, quality = recommendation
+    return fps, width * height, quality
+
+
+def benchmark_backpressure() -> dict[str, Any]:
+    """Check the backpressure advisor converges under overload and recovers without oscillating."""
+    width, height = RESOLUTION_LADDER[0]
+    fps = FPS_LADDER[0]
+    advisor = BackpressureAdvisor(width, height, fps)
+    maximum = (fps, width, height, MAX_JPEG_QUALITY)
+
+    overload = run_advisor(advisor, maximum, BACKPRESSURE_OVERLOAD_WINDOWS, BACKPRESSURE_CONTENTION)
+    settled = overload[-1]["recommendation"]
+    recovery = run_advisor(advisor, settled, BACKPRESSURE_RECOVERY_WINDOWS, 1.0)
+
+    checks: dict[str, dict[str, Any]] = {}
+    costs = [recommendation_cost(maximum)] + [recommendation_cost(w["recommendation"]) for w in overload]
+    drops = [w["drop_rate"] for w in overload]
+    checks["overload_converges"] = {
+        "initial_drop_rate": drops[0],
+        "final_drop_rate": drops[-1],
+        "settled": settled,
+        "steps_down": sum(b < a for a, b in itertools.pairwise(costs)),
+        "passed": all(b <= a for a, b in itertools.pairwise(costs))
+        and all(b <= a for a, b in itertools.pairwise(drops))
+        and drops[0] > 0
+        and drops[-1] == 0
+        and len({w["recommendation"] for w in overload[-BACKPRESSURE_SETTLED_WINDOWS:]}) == 1,
+    }
+
+    costs = [recommendation_cost(settled)] + [recommendation_cost(w["recommendation"]) for w in recovery]
+    recovered = next((i + 1 for i, w in enumerate(recovery) if w["recommendation"] == maximum), None)
+    checks["recovery_steps_up"] = {
+        "final": recovery[-1]["recommendation"],
+        "windows_to_recover": recovered,
+        "steps_up": sum(b > a for a, b in itertools.pairwise(costs)),
+        "max_drop_rate": max(w["drop_rate"] for w in recovery),
+        "passed": all(b >= a for a, b in itertools.pairwise(costs))
+        and recovered is not None
+        and recovery[-1]["recommendation"] == maximum
+        and max(w["drop_rate"] for w in recovery) == 0,
+    }
+
+    return {
+        "benchmark": "backpressure",
+        "width": width,
+        "height": height,
+        "fps": fps,
+        "checks": checks,
+        "passed": all(check["passed"] for check in checks.values()),
+    }
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Virtual Camera Agent benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    formats_parser = subparsers.add_parser("formats", help="Decode/convert cost per pixel format combination")
+    formats_parser.add_argument("-w", "--width", type=int, default=1920, help="Frame width (default: 1920)")
+    formats_parser.add_argument("-H", "--height", type=int, default=1080, help="Frame height (default: 1080)")
+    formats_parser.add_argument(
+        "-n",
+        "--iterations",
+        type=int,
+        default=DEFAULT_ITERATIONS,
+        help=f"Iterations per combination (default: {DEFAULT_ITERATIONS})",
+    )
+    formats_parser.add_argument(
+        "-q",
+        "--jpeg-quality",
+        type=int,
+        default=DEFAULT_JPEG_QUALITY,
+        help=f"JPEG quality for the JPEG producer (default: {DEFAULT_JPEG_QUALITY})",
+    )
+
+    pipeline_parser = subparsers.add_parser("pipeline", help="Full agent throughput into a null sink")
+    pipeline_parser.add_argument("-w", "--width", type=int, default=1280, help="Frame width (default: 1280)")
+    pipeline_parser.add_argument("-H", "--height", type=int, default=720, help="Frame height (default: 720)")
+    pipeline_parser.add_argument("-f", "--fps", type=int, default=30, help="Frames per second (default: 30)")
+    pipeline_parser.add_argument("-d", "--duration", type=float, default=10.0, help="Seconds to run (default: 10)")
+    pipeline_parser.add_argument(
+        "--format",
+        type=str,
+        default="jpeg",
+        choices=["jpeg", "i420", "nv12"],
+        help="Producer payload format (default: jpeg)",
+    )
+    pipeline_parser.add_argument(
+        "--pixel-format",
+        type=str,
+        default="bgr",
+        choices=["bgr", "rgb", "i420", "nv12", "yuyv"],
+        help="Camera pixel format (default: bgr)",
+    )
+    pipeline_parser.add_argument(
+        "-q",
+        "--jpeg-quality",
+        type=int,
+        default=DEFAULT_JPEG_QUALITY,
+        help=f"JPEG quality for the JPEG producer (default: {DEFAULT_JPEG_QUALITY})",
+    )
+    pipeline_parser.add_argument(
+        "-p",
+        "--port",
+        type=int,
+        default=DEFAULT_PIPELINE_PORT,
+        help=f"ZeroMQ frame port (default: {DEFAULT_PIPELINE_PORT})",
+    )
+
+    pacer_parser = subparsers.add_parser("pacer", help="Frame pacer schedule checks on a simulated clock")
+    pacer_parser.add_argument("-f", "--fps", type=int, default=30, help="Frames per second (default: 30)")
+
+    subparsers.add_parser("backpressure", help="Backpressure advisor convergence and recovery on a simulated agent")
+
+    args = parser.parse_args()
+
+    if args.command == "backpressure":
+        result = benchmark_backpressure()
+    elif args.command == "pacer":
+        result = benchmark_pacer(args.fps)
+    elif args.command == "pipeline":
+        result = benchmark_pipeline(
+            args.width,
+            args.height,
+            args.fps,
+            args.duration,
+            FrameFormat[args.format.upper()],
+            args.jpeg_quality,
+            args.port,
+            FrameFormat[args.pixel_format.upper()],
+        )
+    else:
+        result = benchmark_formats(args.width, args.height, args.iterations, args.jpeg_quality)
+    print(json.dumps(result, indent=2))  # noqa: T201
+    return 0 if result.get("passed", True) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Runtime control of the virtual camera agent.
+
+Served by agents.shared.control.ControlServer; requests and replies are JSON objects on a
+ZeroMQ REP socket:
+    {"command": "status"}
+    {"command": "reconfigure", "width": 1920, "height": 1080, "fps": 30}
+    {"command": "follow_source", "enabled": true}
+
+Every reply has "ok"; failures carry an "error" message. Omitted reconfigure fields keep
+their current value.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from agents.shared.control import ControlError
+from agents.vcam.pixel_format import FrameFormat
+from agents.vcam.sinks import FrameSink
+
+DEFAULT_CONTROL_PORT = 50004
+RECONFIGURE_TIMEOUT_SECONDS = 5.0
+
+MIN_DIMENSION = 16
+MAX_DIMENSION = 4096
+MAX_FPS = 120
+
+# Producer frame size must hold for this many frames before the output follows it
+SOURCE_STABLE_FRAMES = 3
+
+
+@dataclass(frozen=True, slots=True)
+class OutputSettings:
+    """Output geometry and frame rate."""
+
+    width: int
+    height: int
+    fps: int
+
+    def validate(self) -> None:
+        """Raise ControlError unless the settings are usable by every camera pixel format."""
+        for name, value in (("width", self.width), ("height", self.height)):
+            if not MIN_DIMENSION <= value <= MAX_DIMENSION:
+                msg = f"{name} must be between {MIN_DIMENSION} and {MAX_DIMENSION}"
+                raise ControlError(msg)
+            if value % 2:
+                # YUV 4:2:0 and 4:2:2 formats subsample chroma by two
+                msg = f"{name} must be even"
+                raise ControlError(msg)
+        if not 1 <= self.fps <= MAX_FPS:
+            msg = f"fps must be between 1 and {MAX_FPS}"
+            raise ControlError(msg)
+
+
+@dataclass(slots=True)
+class Reconfiguration:
+    """One output switch and what it cost."""
+
+    settings: OutputSettings
+    reason: str
+    requested_at: float = field(default_factory=time.monotonic)
+    build_ms: float = 0.0
+    switch_ms: float = 0.0
+    frames_lost: int = 0
+    error: str | None = None
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize for control replies and stats."""
+        return {
+            "width": self.settings.width,
+            "height": self.settings.height,
+            "fps": self.settings.fps,
+            "reason": self.reason,
+            "build_ms": self.build_ms,
+            "switch_ms": self.switch_ms,
+            "frames_lost": self.frames_lost,
+            "error": self.error,
+            "done": self.done.is_set(),
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class PendingOutput:
+    """Output built in the background, waiting for the writer to swap it in."""
+
+    reconfiguration: Reconfiguration
+    sink: FrameSink | None  # None: the backend cannot open a second device, switch in place
+    pixel_format: FrameFormat
+    black_frame: np.ndarray[Any, Any]
+
+
+def settings_from_request(request: dict[str, Any], current: OutputSettings) -> OutputSettings:
+    """Build validated output settings from a reconfigure request, defaulting to the current ones."""
+    try:
+        settings = OutputSettings(
+            width=int(request.get("width", current.width)),
+            height=int(request.get("height", current.height)),
+            fps=int(request.get("fps", current.fps)),
+        )
+    except (TypeError, ValueError) as e:
+        msg = f"Invalid settings: {e}"
+        raise ControlError(msg) from e
+
+    settings.validate()
+    return settings
+
+
+class SourceSizeTracker:
+    """Debounces producer frame size changes so a single odd frame does not trigger a switch."""
+
+    def __init__(self, stable_frames: int = SOURCE_STABLE_FRAMES) -> None:
+        self.stable_frames = stable_frames
+        self.size: tuple[int, int] | None = None
+        self.count = 0
+
+    def observe(self, width: int, height: int) -> tuple[int, int] | None:
+        """Record a source frame size; returns it once it has been stable long enough."""
+        if (width, height) != self.size:
+            self.size = (width, height)
+            self.count = 0
+        self.count += 1
+        return self.size if self.count >= self.stable_frames else None
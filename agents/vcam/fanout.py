@@ -0,0 +1,185 @@
+"""
+Fan-out of decoded frames to secondary output sinks.
+
+The writer hands every new frame to each worker by reference; nothing is copied unless
+a worker's sink needs a different size or pixel format, and then only that worker pays
+for the conversion. Frames are shared read-only: sinks must not modify them.
+"""
+
+import threading
+import time
+from typing import Any
+
+import numpy as np
+from loguru import logger
+
+from agents.vcam.frame_pacer import FramePacer
+from agents.vcam.pixel_format import CAMERA_FORMAT_PREFERENCE, FrameFormat, prepare_frame
+from agents.vcam.sinks import FrameSink, parse_sink
+from agents.vcam.stats import LatencyHistogram
+
+# Longest a worker with nothing to repeat sleeps before re-checking for shutdown
+WORKER_WAIT_SECONDS = 0.5
+
+
+class SinkWorker:
+    """
+    Drives one secondary sink on its own thread, at its own frame rate and pixel format.
+
+    The worker reads from a single-slot mailbox holding the latest frame. A new frame
+    replaces any frame the worker has not taken yet, so a slow sink skips frames instead
+    of stalling the writer or the other sinks.
+    """
+
+    def __init__(self, sink: FrameSink) -> None:
+        self.sink = sink
+        self.pacer = FramePacer(sink.fps)
+        self.condition = threading.Condition()
+        self.mailbox: tuple[np.ndarray[Any, Any], FrameFormat] | None = None
+        self.frame: np.ndarray[Any, Any] | None = None
+        self.running = False
+        self.thread: threading.Thread | None = None
+
+        # Statistics
+        self.frames_offered = 0
+        self.frames_skipped = 0
+        self.frames_written = 0
+        self.errors = 0
+        self.convert_ms = LatencyHistogram()
+
+    def open(self, preferred: FrameFormat) -> bool:
+        """Open the sink, preferring the writer's pixel format so frames pass through unconverted."""
+        formats = self.sink.formats or CAMERA_FORMAT_PREFERENCE
+        candidates = sorted(formats, key=lambda fmt: fmt != preferred)
+        for fmt in candidates:
+            try:
+                self.sink.open(fmt)
+            except Exception as e:
+                logger.debug(f"{self.sink.name} sink rejected pixel format {fmt.name}: {e}")
+                continue
+
+            logger.info(f"Secondary sink initialized: {self.sink.device} ({fmt.name}, {self.sink.fps}fps)")
+            return True
+
+        logger.error(f"Error initializing {self.sink.device}: no supported pixel format")
+        return False
+
+    def start(self) -> None:
+        """Start the worker thread."""
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop the worker thread and close the sink."""
+        self.running = False
+        with self.condition:
+            self.condition.notify()
+        if self.thread:
+            self.thread.join(timeout=2)
+        self.sink.close()
+
+    def offer(self, frame: np.ndarray[Any, Any], fmt: FrameFormat) -> None:
+        """Replace the mailbox contents with a new frame; never blocks on the sink."""
+        with self.condition:
+            if self.mailbox is not None:
+                self.frames_skipped += 1
+            self.mailbox = (frame, fmt)
+            self.frames_offered += 1
+            self.condition.notify()
+
+    def take(self) -> tuple[np.ndarray[Any, Any], FrameFormat] | None:
+        """Take the latest frame, waiting for one if there is nothing to repeat."""
+        with self.condition:
+            if self.mailbox is None and (self.frame is None or not self.sink.repeat_frames):
+                self.condition.wait(timeout=WORKER_WAIT_SECONDS)
+            item, self.mailbox = self.mailbox, None
+            return item
+
+    def run(self) -> None:
+        """Worker thread: Convert the latest frame for this sink and write it on its own deadlines."""
+        self.pacer.reset()
+
+        while self.running:
+            try:
+                self.pacer.wait()
+                item = self.take()
+
+                if item is not None:
+                    frame, fmt = item
+                    convert_start = time.perf_counter()
+                    self.frame = prepare_frame(frame, fmt, self.sink.width, self.sink.height, self.sink.pixel_format)
+                    self.convert_ms.record((time.perf_counter() - convert_start) * 1000.0)
+                elif self.frame is None or not self.sink.repeat_frames:
+                    # Nothing to write; restart the schedule when frames resume
+                    self.pacer.reset()
+                    continue
+
+                self.sink.send(self.frame)
+                self.frames_written += 1
+                if not self.sink.repeat_frames:
+                    # Frames arrive irregularly; only cap the rate, never count missed slots
+                    self.pacer.reset()
+                self.pacer.mark_output()
+
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Error writing to {self.sink.device}: {e}")
+                time.sleep(0.1)
+                self.pacer.reset()
+
+    def stats(self) -> dict[str, Any]:
+        """Return worker statistics."""
+        return {
+            "sink": self.sink.device,
+            "pixel_format": self.sink.pixel_format.name,
+            "fps": self.sink.fps,
+            "frames_offered": self.frames_offered,
+            "frames_skipped": self.frames_skipped,
+            "frames_written": self.frames_written,
+            "deadlines_missed": self.pacer.deadlines_missed,
+            "errors": self.errors,
+            "convert_ms_p50": self.convert_ms.percentile(50),
+        }
+
+
+class FanOut:
+    """Delivers each new frame from the writer to every secondary sink worker."""
+
+    def __init__(self, workers: list[SinkWorker] | None = None) -> None:
+        self.workers = workers or []
+
+    def start(self, preferred: FrameFormat) -> None:
+        """Open every sink and start its worker; sinks that fail to open are left out."""
+        self.workers = [worker for worker in self.workers if worker.open(preferred)]
+        for worker in self.workers:
+            worker.start()
+
+    def publish(self, frame: np.ndarray[Any, Any], fmt: FrameFormat) -> None:
+        """Offer a frame to every worker."""
+        for worker in self.workers:
+            worker.offer(frame, fmt)
+
+    def stop(self) -> None:
+        """Stop all workers."""
+        for worker in self.workers:
+            worker.stop()
+
+    def stats(self) -> list[dict[str, Any]]:
+        """Return statistics for every worker."""
+        return [worker.stats() for worker in self.workers]
+
+
+def parse_worker(spec: str, width: int, height: int, fps: int) -> SinkWorker:
+    """Create a worker from a sink spec with an optional @FPS suffix (e.g. preview:50005@10)."""
+    sink_spec, separator, rate = spec.rpartition("@")
+    if not separator or not rate.isdigit():
+        sink_spec, rate = spec, ""
+
+    sink = parse_sink(sink_spec, width, height, fps)
+    if rate:
+        if int(rate) < 1:
+            msg = f"Sink frame rate must be positive: {spec!r}"
+            raise ValueError(msg)
+        sink.fps = int(rate)
+    return SinkWorker(sink)
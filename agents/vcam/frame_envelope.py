@@ -0,0 +1,133 @@
+"""
+Versioned frame envelope for producer -> virtual camera agent messages.
+
+A frame message is a ZeroMQ multipart message of two frames: a fixed little-endian
+header followed by the payload (JPEG, or bare I420/NV12 planes). Single-frame messages
+are legacy producers sending a bare payload and are accepted unchanged.
+
+Header layout (version 1, 36 bytes):
+    magic       4s   b"PIVF"
+    version     u8
+    format      u8   FrameFormat of the payload
+    width       u16  payload width in pixels (0 = unknown)
+    height      u16  payload height in pixels (0 = unknown)
+    reserved    2 bytes
+    sequence    u64  per-producer frame counter, starting at 0
+    capture_ms  f64  producer capture time, Unix epoch milliseconds
+    send_ms     f64  producer send time, Unix epoch milliseconds
+
+Later versions may append fields; readers only rely on the version 1 prefix.
+"""
+
+import struct
+from dataclasses import dataclass
+
+from agents.vcam.pixel_format import FrameFormat
+
+FRAME_HEADER_MAGIC = b"PIVF"
+FRAME_HEADER_VERSION = 1
+FRAME_HEADER = struct.Struct("<4sBBHH2xQdd")
+
+# A backwards jump larger than this is treated as a producer restart, not a reorder
+SEQUENCE_RESET_THRESHOLD = 1000
+
+
+@dataclass(frozen=True, slots=True)
+class FrameHeader:
+    """Metadata sent by the producer ahead of each frame payload."""
+
+    sequence: int
+    capture_ms: float
+    send_ms: float
+    width: int = 0
+    height: int = 0
+    fmt: FrameFormat = FrameFormat.JPEG
+
+    def pack(self) -> bytes:
+        """Serialize the header to its wire format."""
+        return FRAME_HEADER.pack(
+            FRAME_HEADER_MAGIC,
+            FRAME_HEADER_VERSION,
+            self.fmt,
+            self.width,
+            self.height,
+            self.sequence,
+            self.capture_ms,
+            self.send_ms,
+        )
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "FrameHeader | None":
+        """Parse a header frame, returning None if it is not a valid envelope header."""
+        if len(data) < FRAME_HEADER.size or data[: len(FRAME_HEADER_MAGIC)] != FRAME_HEADER_MAGIC:
+            return None
+
+        _, version, fmt_value, width, height, sequence, capture_ms, send_ms = FRAME_HEADER.unpack_from(data)
+        if version < 1:
+            return None
+        try:
+            fmt = FrameFormat(fmt_value)
+        except ValueError:
+            return None
+
+        return cls(
+            sequence=sequence,
+            capture_ms=capture_ms,
+            send_ms=send_ms,
+            width=width,
+            height=height,
+            fmt=fmt,
+        )
+
+
+class SequenceTracker:
+    """Detects lost and out-of-order frames from producer sequence numbers."""
+
+    def __init__(self) -> None:
+        self.expected: int | None = None
+
+        # Statistics
+        self.gaps = 0
+        self.frames_lost = 0
+        self.frames_reordered = 0
+        self.resets = 0
+
+    def observe(self, sequence: int) -> bool:
+        """Record a sequence number; returns False if the frame is stale (arrived out of order)."""
+        expected = self.expected
+        if expected is None or sequence == expected:
+            self.expected = sequence + 1
+            return True
+
+        if sequence > expected:
+            self.gaps += 1
+            self.frames_lost += sequence - expected
+            self.expected = sequence + 1
+            return True
+
+        if sequence == 0 or expected - sequence > SEQUENCE_RESET_THRESHOLD:
+            # Producer restarted its counter
+            self.resets += 1
+            self.expected = sequence + 1
+            return True
+
+        # Late arrival of a frame previously counted as lost
+        self.frames_reordered += 1
+        self.frames_lost = max(0, self.frames_lost - 1)
+        return False
+
+
+@dataclass(slots=True)
+class FrameTiming:
+    """Timestamps collected as a frame moves through the agent."""
+
+    receive_ms: float
+    capture_ms: float | None = None
+    enqueue_time: float = 0.0
+
+
+def split_message(parts: list[bytes]) -> tuple[FrameHeader | None, bytes]:
+    """Split a received message into (header, payload); legacy single-frame messages have no header."""
+    if len(parts) == 1:
+        return None, parts[0]
+    return FrameHeader.unpack(parts[0]), parts[-1]
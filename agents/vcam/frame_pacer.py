@@ -0,0 +1,89 @@
+"""
+Deadline-based frame pacing for the virtual camera writer.
+"""
+
+import time
+from collections import deque
+from collections.abc import Callable
+
+from agents.vcam.stats import percentile
+
+# Number of output intervals kept for jitter percentiles
+DEFAULT_HISTORY_SIZE = 600
+
+
+class FramePacer:
+    """
+    Schedules frame output on absolute monotonic deadlines.
+
+    Deadlines are advanced by a fixed interval from the previous deadline rather than
+    from the time the previous frame went out, so sleep overshoot does not accumulate
+    into drift. When the writer overruns one or more slots, the missed slots are skipped
+    (and counted) instead of being emitted back-to-back to catch up.
+    """
+
+    def __init__(
+        self,
+        fps: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        history_size: int = DEFAULT_HISTORY_SIZE,
+    ) -> None:
+        self.clock = clock
+        self.sleep = sleep
+        self.frame_interval = 1.0 / fps
+
+        self.next_deadline: float | None = None
+        self.last_output_time: float | None = None
+
+        # Statistics
+        self.frames_paced = 0
+        self.deadlines_missed = 0
+        self.intervals: deque[float] = deque(maxlen=history_size)
+
+    def set_fps(self, fps: float) -> None:
+        """Change the frame rate, restarting the schedule but keeping statistics."""
+        self.frame_interval = 1.0 / fps
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the current schedule; the next frame is due immediately."""
+        self.next_deadline = None
+        self.last_output_time = None
+
+    def time_until_deadline(self) -> float:
+        """Seconds remaining until the next frame is due (0 if already due)."""
+        if self.next_deadline is None:
+            return 0.0
+        return max(0.0, self.next_deadline - self.clock())
+
+    def wait(self) -> None:
+        """Sleep until the next frame deadline."""
+        remaining = self.time_until_deadline()
+        if remaining > 0:
+            self.sleep(remaining)
+
+    def mark_output(self) -> None:
+        """Record that a frame was output and schedule the next deadline."""
+        now = self.clock()
+        self.frames_paced += 1
+
+        if self.last_output_time is not None:
+            self.intervals.append(now - self.last_output_time)
+        self.last_output_time = now
+
+        if self.next_deadline is None:
+            self.next_deadline = now + self.frame_interval
+            return
+
+        self.next_deadline += self.frame_interval
+        if self.next_deadline <= now:
+            # Overrun: drop the slots we can no longer meet instead of bursting
+            missed = int((now - self.next_deadline) // self.frame_interval) + 1
+            self.deadlines_missed += missed
+            self.next_deadline += missed * self.frame_interval
+
+    def jitter(self) -> tuple[float, float]:
+        """Return (p50, p99) of recent inter-frame output intervals in seconds."""
+        intervals = list(self.intervals)
+        return percentile(intervals, 50), percentile(intervals, 99)
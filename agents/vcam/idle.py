@@ -0,0 +1,84 @@
+"""
+Idle detection for the virtual camera writer.
+"""
+
+import time
+from collections.abc import Callable
+
+DEFAULT_IDLE_TIMEOUT_SECONDS = 5.0
+DEFAULT_KEEPALIVE_FPS = 1.0
+
+
+class IdleController:
+    """
+    Tracks whether new frames are arriving and switches the writer between full-rate
+    output and a low keep-alive rate.
+
+    The agent is started with the session and often sits for minutes before face swap
+    is enabled; while idle, repeating the same frame at full rate only burns CPU.
+    """
+
+    def __init__(
+        self,
+        active_fps: float,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT_SECONDS,
+        keepalive_fps: float = DEFAULT_KEEPALIVE_FPS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.active_fps = active_fps
+        self.idle_timeout = idle_timeout
+        self.keepalive_fps = keepalive_fps
+        self.clock = clock
+
+        self.idle = False
+        self.last_frame_time = clock()
+        self.idle_since = 0.0
+
+        # Statistics
+        self.idle_periods = 0
+        self.idle_seconds = 0.0
+        self.keepalive_frames = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Idle mode is disabled by a non-positive timeout."""
+        return self.idle_timeout > 0
+
+    def on_frame(self) -> bool:
+        """Record a new frame; returns True if this woke the writer from idle."""
+        now = self.clock()
+        self.last_frame_time = now
+        if not self.idle:
+            return False
+
+        self.idle = False
+        self.idle_seconds += now - self.idle_since
+        return True
+
+    def check(self) -> bool:
+        """Enter idle if no frame arrived within the timeout; returns True on the transition."""
+        if self.idle or not self.enabled:
+            return False
+
+        now = self.clock()
+        if now - self.last_frame_time < self.idle_timeout:
+            return False
+
+        self.idle = True
+        self.idle_since = now
+        self.idle_periods += 1
+        return True
+
+    def on_keepalive(self) -> None:
+        """Record a keep-alive frame written while idle."""
+        self.keepalive_frames += 1
+
+    def total_idle_seconds(self) -> float:
+        """Total time spent idle, including the current idle period."""
+        if self.idle:
+            return self.idle_seconds + self.clock() - self.idle_since
+        return self.idle_seconds
+
+    def frames_saved(self) -> int:
+        """Frames not written compared with repeating output at the full rate while idle."""
+        return max(0, int(self.total_idle_seconds() * self.active_fps) - self.keepalive_frames)
@@ -12,9 +12,15 @@ import time
 import psutil
 from loguru import logger
 
+from agents.vcam.control import DEFAULT_CONTROL_PORT
+from agents.vcam.fanout import parse_worker
+from agents.vcam.idle import DEFAULT_IDLE_TIMEOUT_SECONDS, DEFAULT_KEEPALIVE_FPS
+from agents.vcam.pixel_format import parse_format
+from agents.vcam.sinks import DEFAULT_SINK, parse_sink
 from agents.vcam.vcam_agent import VCamAgent
 
 DEFAULT_ZMQ_PORT: int = 50001
+DEFAULT_FEEDBACK_PORT: int = 50003
 STATS_INTERVAL_SECONDS: int = 5
 
 
@@ -63,6 +69,57 @@ def main() -> int:
         default=DEFAULT_ZMQ_PORT,
         help=f"ZeroMQ port (default: {DEFAULT_ZMQ_PORT})",
     )
+    parser.add_argument(
+        "--feedback-port",
+        type=int,
+        default=DEFAULT_FEEDBACK_PORT,
+        help=f"ZeroMQ port for producer backpressure feedback, 0 to disable (default: {DEFAULT_FEEDBACK_PORT})",
+    )
+    parser.add_argument(
+        "--pixel-format",
+        type=str,
+        default="auto",
+        choices=["auto", "bgr", "rgb", "i420", "nv12", "yuyv"],
+        help="Virtual camera pixel format (default: auto, negotiated with the backend)",
+    )
+    parser.add_argument(
+        "--control-port",
+        type=int,
+        default=DEFAULT_CONTROL_PORT,
+        help=f"ZeroMQ port for runtime control commands, 0 to disable (default: {DEFAULT_CONTROL_PORT})",
+    )
+    parser.add_argument(
+        "--follow-source",
+        action="store_true",
+        help="Switch the output resolution to the producer's frame size instead of resizing every frame",
+    )
+    parser.add_argument(
+        "--sink",
+        type=str,
+        default=DEFAULT_SINK,
+        help=f"Output sink: vcam, null, file:PATH, preview[:PORT] or record:PATH (default: {DEFAULT_SINK})",
+    )
+    parser.add_argument(
+        "--extra-sink",
+        action="append",
+        default=[],
+        metavar="SPEC[@FPS]",
+        help="Additional output fed the same decoded frames: vcam, null, file:PATH, preview[:PORT] or "
+        "record:PATH, optionally with its own frame rate (repeatable)",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT_SECONDS,
+        help=f"Seconds without new frames before dropping to keep-alive output, 0 to disable "
+        f"(default: {DEFAULT_IDLE_TIMEOUT_SECONDS:g})",
+    )
+    parser.add_argument(
+        "--keepalive-fps",
+        type=float,
+        default=DEFAULT_KEEPALIVE_FPS,
+        help=f"Output frame rate while idle (default: {DEFAULT_KEEPALIVE_FPS:g})",
+    )
     parser.add_argument(
         "--watch-parent",
         action="store_true",
@@ -70,6 +127,16 @@ def main() -> int:
     )
 
     args = parser.parse_args()
+    if args.fps <= 0:
+        parser.error("--fps must be positive")
+    if args.keepalive_fps <= 0:
+        parser.error("--keepalive-fps must be positive")
+
+    try:
+        sink = parse_sink(args.sink, args.width, args.height, args.fps)
+        extra_sinks = [parse_worker(spec, args.width, args.height, args.fps) for spec in args.extra_sink]
+    except ValueError as e:
+        parser.error(str(e))
 
     # Create and run agent
     agent = VCamAgent(
@@ -78,6 +145,14 @@ def main() -> int:
         fps=args.fps,
         zmq_port=args.port,
         stats_interval=STATS_INTERVAL_SECONDS,
+        pixel_format=parse_format(args.pixel_format),
+        feedback_port=args.feedback_port,
+        idle_timeout=args.idle_timeout,
+        keepalive_fps=args.keepalive_fps,
+        sink=sink,
+        control_port=args.control_port,
+        follow_source=args.follow_source,
+        extra_sinks=extra_sinks,
     )
 
     # Setup signal handlers for graceful shutdown
@@ -0,0 +1,301 @@
+"""
+Pixel format negotiation and frame conversion for the virtual camera agent.
+
+Frames are kept in OpenCV memory layouts: packed formats are (height, width, channels),
+planar YUV 4:2:0 formats are a single (height * 3 // 2, width) plane stack.
+"""
+
+import struct
+from collections.abc import Callable
+from enum import IntEnum
+from typing import Any
+
+import cv2
+import numpy as np
+
+# Raw (non-JPEG) frames start with this magic followed by format, width and height.
+# JPEG payloads always start with 0xFFD8, so the two can never be confused.
+RAW_FRAME_MAGIC = b"PIRF"
+RAW_FRAME_HEADER = struct.Struct("<4sBxHH")
+
+
+class FrameFormat(IntEnum):
+    """Pixel layouts understood by the agent."""
+
+    JPEG = 0
+    BGR = 1
+    RGB = 2
+    I420 = 3
+    NV12 = 4
+    YUYV = 5
+
+
+# Camera formats in order of preference: BGR is what cv2.imdecode produces, so it needs
+# no conversion for JPEG producers; the YUV formats avoid RGB expansion for raw producers.
+CAMERA_FORMAT_PREFERENCE: tuple[FrameFormat, ...] = (
+    FrameFormat.BGR,
+    FrameFormat.I420,
+    FrameFormat.NV12,
+    FrameFormat.RGB,
+    FrameFormat.YUYV,
+)
+
+YUV420_FORMATS = (FrameFormat.I420, FrameFormat.NV12)
+
+# Converts a frame of the given width and height to another pixel format
+FrameConverter = Callable[[np.ndarray[Any, Any], int, int], np.ndarray[Any, Any]]
+
+
+def parse_format(name: str) -> FrameFormat | None:
+    """Parse a pixel format name ('auto' returns None)."""
+    if name.lower() == "auto":
+        return None
+    try:
+        return FrameFormat[name.upper()]
+    except KeyError:
+        msg = f"Unknown pixel format: {name}"
+        raise ValueError(msg) from None
+
+
+def frame_shape(fmt: FrameFormat, width: int, height: int) -> tuple[int, ...]:
+    """Return the array shape of a frame in the given format."""
+    if fmt in (FrameFormat.BGR, FrameFormat.RGB):
+        return (height, width, 3)
+    if fmt in YUV420_FORMATS:
+        return (height * 3 // 2, width)
+    if fmt == FrameFormat.YUYV:
+        return (height, width, 2)
+    msg = f"Format {fmt.name} has no raw frame shape"
+    raise ValueError(msg)
+
+
+def frame_dimensions(frame: np.ndarray[Any, Any], fmt: FrameFormat) -> tuple[int, int]:
+    """Return (width, height) in pixels of a frame array in the given format."""
+    if fmt in YUV420_FORMATS:
+        return frame.shape[1], frame.shape[0] * 2 // 3
+    return frame.shape[1], frame.shape[0]
+
+
+def encode_raw_frame(frame: np.ndarray[Any, Any], fmt: FrameFormat) -> bytes:
+    """Prefix a raw YUV 4:2:0 frame with the raw frame header."""
+    if fmt not in YUV420_FORMATS:
+        msg = f"Raw frames must be I420 or NV12, got {fmt.name}"
+        raise ValueError(msg)
+    width, height = frame_dimensions(frame, fmt)
+    return RAW_FRAME_HEADER.pack(RAW_FRAME_MAGIC, fmt, width, height) + frame.tobytes()
+
+
+def wrap_yuv420(data: bytes | memoryview, fmt: FrameFormat, width: int, height: int) -> np.ndarray[Any, Any] | None:
+    """Wrap bare I420/NV12 planes as a frame array without copying, or None if malformed."""
+    if fmt not in YUV420_FORMATS or width <= 0 or height <= 0 or width % 2 or height % 2:
+        return None
+
+    shape = frame_shape(fmt, width, height)
+    if len(data) != shape[0] * shape[1]:
+        return None
+
+    return np.frombuffer(data, dtype=np.uint8).reshape(shape)
+
+
+def parse_raw_frame(data: bytes) -> tuple[FrameFormat, np.ndarray[Any, Any]] | None:
+    """Parse a raw frame message, returning (format, frame) or None if malformed."""
+    if len(data) < RAW_FRAME_HEADER.size:
+        return None
+
+    _, fmt_value, width, height = RAW_FRAME_HEADER.unpack_from(data)
+    try:
+        fmt = FrameFormat(fmt_value)
+    except ValueError:
+        return None
+
+    frame = wrap_yuv420(memoryview(data)[RAW_FRAME_HEADER.size :], fmt, width, height)
+    if frame is None:
+        return None
+    return fmt, frame
+
+
+def i420_to_nv12(frame: np.ndarray[Any, Any], width: int, height: int) -> np.ndarray[Any, Any]:
+    """Interleave the U and V planes of an I420 frame into NV12."""
+    out = np.empty_like(frame)
+    out[:height] = frame[:height]
+    chroma = frame[height:].reshape(-1)
+    quarter = (width // 2) * (height // 2)
+    uv = out[height:].reshape(-1)
+    uv[0::2] = chroma[:quarter]
+    uv[1::2] = chroma[quarter:]
+    return out
+
+
+def nv12_to_i420(frame: np.ndarray[Any, Any], width: int, height: int) -> np.ndarray[Any, Any]:
+    """Split the interleaved UV plane of an NV12 frame into I420 planes."""
+    out = np.empty_like(frame)
+    out[:height] = frame[:height]
+    uv = frame[height:].reshape(-1)
+    quarter = (width // 2) * (height // 2)
+    chroma = out[height:].reshape(-1)
+    chroma[:quarter] = uv[0::2]
+    chroma[quarter:] = uv[1::2]
+    return out
+
+
+def i420_to_yuyv(frame: np.ndarray[Any, Any], width: int, height: int) -> np.ndarray[Any, Any]:
+    """Pack an I420 frame into YUYV (4:2:2), repeating chroma rows vertically."""
+    quarter = (width // 2) * (height // 2)
+    chroma = frame[height:].reshape(-1)
+    u = chroma[:quarter].reshape(height // 2, width // 2)
+    v = chroma[quarter:].reshape(height // 2, width // 2)
+
+    out = np.empty((height, width, 2), dtype=np.uint8)
+    out[:, :, 0] = frame[:height]
+    out[0::2, 0::2, 1] = u
+    out[1::2, 0::2, 1] = u
+    out[0::2, 1::2, 1] = v
+    out[1::2, 1::2, 1] = v
+    return out
+
+
+def resize_frame(frame: np.ndarray[Any, Any], fmt: FrameFormat, width: int, height: int) -> np.ndarray[Any, Any]:
+    """Resize a BGR/RGB, YUYV or YUV 4:2:0 frame to width x height."""
+    if fmt in (FrameFormat.BGR, FrameFormat.RGB):
+        return cv2.resize(frame, (width, height))
+
+    src_width, src_height = frame_dimensions(frame, fmt)
+    out = np.empty(frame_shape(fmt, width, height), dtype=np.uint8)
+    if fmt == FrameFormat.YUYV:
+        # Luma and the interleaved U/V pairs are resized apart, so U and V never blend
+        out[:, :, 0] = cv2.resize(np.ascontiguousarray(frame[:, :, 0]), (width, height))
+        uv = frame[:, :, 1].reshape(src_height, src_width // 2, 2)
+        out[:, :, 1] = cv2.resize(uv, (width // 2, height)).reshape(height, width)
+        return out
+
+    out[:height] = cv2.resize(frame[:src_height], (width, height))
+    if fmt == FrameFormat.NV12:
+        uv = frame[src_height:].reshape(src_height // 2, src_width // 2, 2)
+        out[height:] = cv2.resize(uv, (width // 2, height // 2)).reshape(height // 2, width)
+    else:
+        quarter = (src_width // 2) * (src_height // 2)
+        chroma = frame[src_height:].reshape(-1)
+        out_chroma = out[height:].reshape(2, height // 2, width // 2)
+        for i in range(2):
+            plane = chroma[i * quarter : (i + 1) * quarter].reshape(src_height // 2, src_width // 2)
+            out_chroma[i] = cv2.resize(plane, (width // 2, height // 2))
+    return out
+
+
+def color_conversion(code: int) -> FrameConverter:
+    """Converter running one cv2.cvtColor conversion."""
+
+    def convert(frame: np.ndarray[Any, Any], _width: int, _height: int) -> np.ndarray[Any, Any]:
+        return cv2.cvtColor(frame, code)
+
+    return convert
+
+
+def chain(first: FrameConverter, second: FrameConverter) -> FrameConverter:
+    """Converter applying first, then second, to a frame of the same size."""
+
+    def convert(frame: np.ndarray[Any, Any], width: int, height: int) -> np.ndarray[Any, Any]:
+        return second(first(frame, width, height), width, height)
+
+    return convert
+
+
+# Every supported (source, camera) pair; conversions OpenCV lacks go through I420 or BGR
+FRAME_CONVERTERS: dict[tuple[FrameFormat, FrameFormat], FrameConverter] = {
+    (FrameFormat.BGR, FrameFormat.RGB): color_conversion(cv2.COLOR_BGR2RGB),
+    (FrameFormat.BGR, FrameFormat.I420): color_conversion(cv2.COLOR_BGR2YUV_I420),
+    (FrameFormat.BGR, FrameFormat.NV12): chain(color_conversion(cv2.COLOR_BGR2YUV_I420), i420_to_nv12),
+    (FrameFormat.BGR, FrameFormat.YUYV): chain(color_conversion(cv2.COLOR_BGR2YUV_I420), i420_to_yuyv),
+    (FrameFormat.RGB, FrameFormat.BGR): color_conversion(cv2.COLOR_RGB2BGR),
+    (FrameFormat.RGB, FrameFormat.I420): color_conversion(cv2.COLOR_RGB2YUV_I420),
+    (FrameFormat.RGB, FrameFormat.NV12): chain(color_conversion(cv2.COLOR_RGB2YUV_I420), i420_to_nv12),
+    (FrameFormat.RGB, FrameFormat.YUYV): chain(color_conversion(cv2.COLOR_RGB2YUV_I420), i420_to_yuyv),
+    (FrameFormat.I420, FrameFormat.BGR): color_conversion(cv2.COLOR_YUV2BGR_I420),
+    (FrameFormat.I420, FrameFormat.RGB): color_conversion(cv2.COLOR_YUV2RGB_I420),
+    (FrameFormat.I420, FrameFormat.NV12): i420_to_nv12,
+    (FrameFormat.I420, FrameFormat.YUYV): i420_to_yuyv,
+    (FrameFormat.NV12, FrameFormat.BGR): color_conversion(cv2.COLOR_YUV2BGR_NV12),
+    (FrameFormat.NV12, FrameFormat.RGB): color_conversion(cv2.COLOR_YUV2RGB_NV12),
+    (FrameFormat.NV12, FrameFormat.I420): nv12_to_i420,
+    (FrameFormat.NV12, FrameFormat.YUYV): chain(nv12_to_i420, i420_to_yuyv),
+    (FrameFormat.YUYV, FrameFormat.BGR): color_conversion(cv2.COLOR_YUV2BGR_YUYV),
+    (FrameFormat.YUYV, FrameFormat.RGB): color_conversion(cv2.COLOR_YUV2RGB_YUYV),
+    (FrameFormat.YUYV, FrameFormat.I420): chain(
+        color_conversion(cv2.COLOR_YUV2BGR_YUYV), color_conversion(cv2.COLOR_BGR2YUV_I420)
+    ),
+    (FrameFormat.YUYV, FrameFormat.NV12): chain(
+        chain(color_conversion(cv2.COLOR_YUV2BGR_YUYV), color_conversion(cv2.COLOR_BGR2YUV_I420)), i420_to_nv12
+    ),
+}
+
+
+def convert_frame(frame: np.ndarray[Any, Any], src: FrameFormat, dst: FrameFormat) -> np.ndarray[Any, Any]:
+    """Convert a frame between pixel formats, returning the input unchanged if they match."""
+    if src == dst:
+        return frame
+
+    converter = FRAME_CONVERTERS.get((src, dst))
+    if converter is None:
+        msg = f"Unsupported conversion: {src.name} -> {dst.name}"
+        raise ValueError(msg)
+    width, height = frame_dimensions(frame, src)
+    return converter(frame, width, height)
+
+
+def load_frame(
+    data: bytes,
+    fmt: FrameFormat = FrameFormat.JPEG,
+    width: int = 0,
+    height: int = 0,
+) -> tuple[FrameFormat, np.ndarray[Any, Any]] | None:
+    """
+    Turn a producer payload into (source format, frame), or None if it cannot be decoded.
+
+    JPEG payloads may also be legacy raw frames carrying their own 'PIRF' header;
+    I420/NV12 payloads are bare planes described by fmt, width and height.
+    """
+    if fmt in YUV420_FORMATS:
+        frame = wrap_yuv420(data, fmt, width, height)
+        return (fmt, frame) if frame is not None else None
+
+    if data[: len(RAW_FRAME_MAGIC)] == RAW_FRAME_MAGIC:
+        return parse_raw_frame(data)
+
+    decoded = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if decoded is None:
+        return None
+    return FrameFormat.BGR, decoded
+
+
+def prepare_frame(
+    frame: np.ndarray[Any, Any],
+    src: FrameFormat,
+    width: int,
+    height: int,
+    dst: FrameFormat,
+) -> np.ndarray[Any, Any]:
+    """Resize a loaded frame to width x height and convert it to the dst format."""
+    # Resize in the source format, before any expansion to the camera format
+    if frame_dimensions(frame, src) != (width, height):
+        frame = resize_frame(frame, src, width, height)
+
+    return convert_frame(frame, src, dst)
+
+
+def decode_frame(
+    data: bytes,
+    width: int,
+    height: int,
+    dst: FrameFormat,
+) -> np.ndarray[Any, Any] | None:
+    """Decode a JPEG or raw YUV message into a width x height frame in the dst format."""
+    loaded = load_frame(data)
+    if loaded is None:
+        return None
+    src, frame = loaded
+    return prepare_frame(frame, src, width, height, dst)
+
+
+def black_frame(fmt: FrameFormat, width: int, height: int) -> np.ndarray[Any, Any]:
+    """Create a black frame in the given format."""
+    return convert_frame(np.zeros((height, width, 3), dtype=np.uint8), FrameFormat.BGR, fmt)
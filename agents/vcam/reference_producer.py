@@ -0,0 +1,310 @@
+"""
+Reference frame producer for the virtual camera agent.
+
+Sends synthetic JPEG frames in the frame envelope and adapts resolution, JPEG quality and
+frame rate to the agent's backpressure feedback. It doubles as a load generator for
+exercising the agent without the Electron app.
+
+Usage:
+    python -m agents.vcam.reference_producer --port 50001 --feedback-port 50003
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+import cv2
+import numpy as np
+import zmq
+from loguru import logger
+
+from agents.vcam.backpressure import Feedback
+from agents.vcam.frame_envelope import FrameHeader
+from agents.vcam.frame_pacer import FramePacer
+from agents.vcam.pixel_format import FrameFormat, convert_frame
+
+DEFAULT_ZMQ_PORT = 50001
+DEFAULT_FEEDBACK_PORT = 50003
+DEFAULT_JPEG_QUALITY = 90
+SEND_HIGH_WATER_MARK = 4
+
+
+def synthetic_frame(width: int, height: int, seed: int = 0) -> np.ndarray[Any, Any]:
+    """Create a BGR test frame with gradients and noise so JPEG sizes are realistic."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[:, :, 0] = (x + y) / 2
+    frame[:, :, 1] = np.abs(x - y)
+    frame[:, :, 2] = 255 - (x + y) / 2
+    noise = rng.integers(0, 16, size=frame.shape, dtype=np.uint8)
+    return cv2.add(frame, noise)
+
+
+class SyntheticSource:
+    """Produces moving synthetic frames, caching the static background per resolution."""
+
+    def __init__(self) -> None:
+        self.backgrounds: dict[tuple[int, int], np.ndarray[Any, Any]] = {}
+
+    def frame(self, width: int, height: int, index: int) -> np.ndarray[Any, Any]:
+        """Return frame number index at width x height in BGR."""
+        background = self.backgrounds.get((width, height))
+        if background is None:
+            background = synthetic_frame(width, height)
+            self.backgrounds[(width, height)] = background
+
+        frame = background.copy()
+        size = max(16, height // 6)
+        x = (index * 8) % max(1, width - size)
+        y = (height - size) // 2
+        cv2.rectangle(frame, (x, y), (x + size, y + size), (255, 255, 255), thickness=-1)
+        return frame
+
+
+def encode_frame(frame: np.ndarray[Any, Any], fmt: FrameFormat, jpeg_quality: int) -> bytes:
+    """Encode a BGR frame as a payload in the given format (JPEG or bare I420/NV12 planes)."""
+    if fmt == FrameFormat.JPEG:
+        ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+        if not ok:
+            msg = "JPEG encoding failed"
+            raise RuntimeError(msg)
+        return buffer.tobytes()
+    return convert_frame(frame, FrameFormat.BGR, fmt).tobytes()
+
+
+class ReferenceProducer:
+    """Frame producer that follows the agent's backpressure recommendations."""
+
+    def __init__(
+        self,
+        port: int = DEFAULT_ZMQ_PORT,
+        feedback_port: int = DEFAULT_FEEDBACK_PORT,
+        width: int = 1280,
+        height: int = 720,
+        fps: int = 30,
+        fmt: FrameFormat = FrameFormat.JPEG,
+        adapt: bool = True,  # noqa: FBT001, FBT002
+    ) -> None:
+        self.port = port
+        self.feedback_port = feedback_port
+        self.max_width = width
+        self.max_height = height
+        self.max_fps = fps
+        self.fmt = fmt
+        self.adapt = adapt
+
+        # Current production settings
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.jpeg_quality = DEFAULT_JPEG_QUALITY
+        self.last_feedback: Feedback | None = None
+
+        # Components
+        self.source = SyntheticSource()
+        self.pacer = FramePacer(fps)
+        self.zmq_context: zmq.Context[Any] | None = None
+        self.push_socket: zmq.Socket[Any] | None = None
+        self.feedback_socket: zmq.Socket[Any] | None = None
+
+        # Statistics
+        self.sequence = 0
+        self.frames_sent = 0
+        self.frames_blocked = 0
+        self.bytes_sent = 0
+        self.encode_seconds = 0.0
+        self.adaptations = 0
+
+    def start(self) -> None:
+        """Bind the frame socket (as the app does) and subscribe to feedback."""
+        self.zmq_context = zmq.Context()
+        self.push_socket = self.zmq_context.socket(zmq.PUSH)
+        self.push_socket.setsockopt(zmq.SNDHWM, SEND_HIGH_WATER_MARK)
+        self.push_socket.setsockopt(zmq.LINGER, 0)
+        self.push_socket.bind(f"tcp://127.0.0.1:{self.port}")
+
+        if self.feedback_port > 0:
+            self.feedback_socket = self.zmq_context.socket(zmq.SUB)
+            self.feedback_socket.setsockopt(zmq.LINGER, 0)
+            self.feedback_socket.setsockopt_string(zmq.SUBSCRIBE, "")
+            self.feedback_socket.connect(f"tcp://127.0.0.1:{self.feedback_port}")
+
+        logger.info(f"Reference producer sending on port {self.port}, feedback on port {self.feedback_port}")
+
+    def stop(self) -> None:
+        """Close sockets."""
+        if self.push_socket:
+            self.push_socket.close()
+            self.push_socket = None
+        if self.feedback_socket:
+            self.feedback_socket.close()
+            self.feedback_socket = None
+        if self.zmq_context:
+            self.zmq_context.term()
+            self.zmq_context = None
+
+    def poll_feedback(self) -> None:
+        """Drain pending feedback messages and apply the newest one."""
+        if self.feedback_socket is None:
+            return
+
+        latest: str | None = None
+        while True:
+            try:
+                latest = self.feedback_socket.recv_string(flags=zmq.NOBLOCK)
+            except zmq.Again:
+                break
+
+        if latest is None:
+            return
+
+        try:
+            feedback = Feedback.from_json(latest)
+        except (KeyError, TypeError, json.JSONDecodeError) as e:
+            logger.debug(f"Ignoring malformed feedback: {e}")
+            return
+
+        self.last_feedback = feedback
+        if self.adapt:
+            self.apply_feedback(feedback)
+
+    def apply_feedback(self, feedback: Feedback) -> None:
+        """Adopt the agent's recommended resolution, quality and frame rate."""
+        width = min(self.max_width, feedback.max_width)
+        height = min(self.max_height, feedback.max_height)
+        fps = min(self.max_fps, feedback.fps)
+        quality = feedback.jpeg_quality
+
+        if (width, height, fps, quality) == (self.width, self.height, self.fps, self.jpeg_quality):
+            return
+
+        logger.info(
+            f"Adapting to feedback: {width}x{height} @ {fps}fps, quality {quality} "
+            f"(agent decode {feedback.decode_fps:.1f} fps, drop rate {feedback.drop_rate:.1%})"
+        )
+        self.width, self.height, self.jpeg_quality = width, height, quality
+        if fps != self.fps:
+            self.fps = fps
+            self.pacer = FramePacer(fps)
+        self.adaptations += 1
+
+    def send_frame(self) -> None:
+        """Render, encode and send the next frame with its envelope header."""
+        capture_ms = time.time() * 1000.0
+        frame = self.source.frame(self.width, self.height, self.sequence)
+
+        encode_start = time.perf_counter()
+        payload = encode_frame(frame, self.fmt, self.jpeg_quality)
+        self.encode_seconds += time.perf_counter() - encode_start
+
+        header = FrameHeader(
+            sequence=self.sequence,
+            capture_ms=capture_ms,
+            send_ms=time.time() * 1000.0,
+            width=self.width,
+            height=self.height,
+            fmt=self.fmt,
+        )
+        self.sequence += 1
+
+        try:
+            self.push_socket.send_multipart([header.pack(), payload], flags=zmq.NOBLOCK)  # type: ignore  # noqa: PGH003
+        except zmq.Again:
+            # Agent not connected or not keeping up; count it as a producer-side drop
+            self.frames_blocked += 1
+            return
+
+        self.frames_sent += 1
+        self.bytes_sent += len(payload)
+
+    def run(self, duration: float, should_continue: Callable[[], bool] | None = None) -> dict[str, Any]:
+        """Produce frames for duration seconds (or until should_continue() is false) and return stats."""
+        end_time = time.monotonic() + duration
+        self.pacer.reset()
+
+        while time.monotonic() < end_time and (should_continue is None or should_continue()):
+            self.pacer.wait()
+            self.poll_feedback()
+            self.send_frame()
+            self.pacer.mark_output()
+
+        return self.stats()
+
+    def stats(self) -> dict[str, Any]:
+        """Return producer statistics."""
+        feedback = self.last_feedback
+        return {
+            "frames_sent": self.frames_sent,
+            "frames_blocked": self.frames_blocked,
+            "bytes_sent": self.bytes_sent,
+            "encode_ms_per_frame": self.encode_seconds * 1000.0 / max(1, self.frames_sent + self.frames_blocked),
+            "adaptations": self.adaptations,
+            "final_settings": {
+                "width": self.width,
+                "height": self.height,
+                "fps": self.fps,
+                "jpeg_quality": self.jpeg_quality,
+            },
+            "last_feedback": None if feedback is None else json.loads(feedback.to_json()),
+        }
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Reference frame producer for the Virtual Camera Agent")
+    parser.add_argument("-w", "--width", type=int, default=1280, help="Maximum frame width (default: 1280)")
+    parser.add_argument("-H", "--height", type=int, default=720, help="Maximum frame height (default: 720)")
+    parser.add_argument("-f", "--fps", type=int, default=30, help="Maximum frames per second (default: 30)")
+    parser.add_argument(
+        "-p",
+        "--port",
+        type=int,
+        default=DEFAULT_ZMQ_PORT,
+        help=f"ZeroMQ frame port (default: {DEFAULT_ZMQ_PORT})",
+    )
+    parser.add_argument(
+        "--feedback-port",
+        type=int,
+        default=DEFAULT_FEEDBACK_PORT,
+        help=f"ZeroMQ feedback port, 0 to disable (default: {DEFAULT_FEEDBACK_PORT})",
+    )
+    parser.add_argument(
+        "--format",
+        type=str,
+        default="jpeg",
+        choices=["jpeg", "i420", "nv12"],
+        help="Payload format (default: jpeg)",
+    )
+    parser.add_argument("--no-adapt", action="store_true", help="Ignore feedback recommendations")
+    parser.add_argument("-d", "--duration", type=float, default=60.0, help="Seconds to run (default: 60)")
+
+    args = parser.parse_args()
+
+    producer = ReferenceProducer(
+        port=args.port,
+        feedback_port=args.feedback_port,
+        width=args.width,
+        height=args.height,
+        fps=args.fps,
+        fmt=FrameFormat[args.format.upper()],
+        adapt=not args.no_adapt,
+    )
+    producer.start()
+    try:
+        stats = producer.run(args.duration)
+    except KeyboardInterrupt:
+        stats = producer.stats()
+    finally:
+        producer.stop()
+
+    print(json.dumps(stats, indent=2))  # noqa: T201
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""
+Output sinks for the virtual camera agent.
+
+The agent paces decoded frames into a sink. The default sink is the pyvirtualcam device;
+the null and file sinks let the receive/decode/pace/write pipeline run and be measured on
+machines without a virtual camera driver (e.g. Linux CI without v4l2loopback).
+
+Sink specs accepted by parse_sink:
+    vcam          pyvirtualcam device (default)
+    null          discard frames, counting them
+    file:PATH     append raw frames to PATH (a regular file or a named pipe)
+    preview[:PORT]  low-rate downscaled JPEG stream on a ZeroMQ PUB socket
+    record:PATH   MJPEG video file
+"""
+
+import time
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import cv2
+import numpy as np
+import pyvirtualcam
+import zmq
+
+from agents.vcam.frame_envelope import FrameHeader
+from agents.vcam.pixel_format import FrameFormat
+
+DEFAULT_SINK = "vcam"
+
+DEFAULT_PREVIEW_PORT = 50005
+PREVIEW_FPS = 5
+PREVIEW_MAX_WIDTH = 320
+PREVIEW_JPEG_QUALITY = 70
+PREVIEW_HIGH_WATER_MARK = 2
+
+
+class FrameSink:
+    """Destination for paced camera frames."""
+
+    name = "sink"
+    # Pixel formats the sink accepts (None: any camera format)
+    formats: tuple[FrameFormat, ...] | None = None
+    # Whether the sink wants the last frame repeated when no new one arrived in time
+    repeat_frames = True
+
+    def __init__(self, width: int, height: int, fps: int) -> None:
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.pixel_format = FrameFormat.BGR
+
+        # Statistics
+        self.frames_sent = 0
+        self.bytes_sent = 0
+
+    @property
+    def device(self) -> str:
+        """Human-readable name of the output device."""
+        return self.name
+
+    def resized(self, width: int, height: int, fps: int) -> "FrameSink":
+        """Return a new, unopened sink of the same kind with different output settings."""
+        return type(self)(width, height, fps)
+
+    def open(self, fmt: FrameFormat) -> None:
+        """Open the sink in the given pixel format; raises if the format is not supported."""
+        self.pixel_format = fmt
+
+    def send(self, frame: np.ndarray[Any, Any]) -> None:
+        """Output one frame."""
+        self.frames_sent += 1
+        self.bytes_sent += frame.nbytes
+
+    def close(self) -> None:
+        """Release the output device."""
+
+
+class PyVirtualCamSink(FrameSink):
+    """Virtual camera device via pyvirtualcam."""
+
+    name = "vcam"
+
+    def __init__(self, width: int, height: int, fps: int) -> None:
+        super().__init__(width, height, fps)
+        self.camera: pyvirtualcam.Camera | None = None
+
+    @property
+    def device(self) -> str:
+        """Device name reported by the backend."""
+        return self.camera.device if self.camera else self.name
+
+    def open(self, fmt: FrameFormat) -> None:
+        """Open the virtual camera in the given pixel format."""
+        self.camera = pyvirtualcam.Camera(
+            width=self.width,
+            height=self.height,
+            fps=self.fps,
+            fmt=getattr(pyvirtualcam.PixelFormat, fmt.name),
+        )
+        super().open(fmt)
+
+    def send(self, frame: np.ndarray[Any, Any]) -> None:
+        """Hand the frame to the virtual camera."""
+        if self.camera:
+            self.camera.send(frame)
+            super().send(frame)
+
+    def close(self) -> None:
+        """Close the virtual camera."""
+        if self.camera:
+            self.camera.close()
+            self.camera = None
+
+
+class NullSink(FrameSink):
+    """Discards frames, recording only when they were sent."""
+
+    name = "null"
+
+    def __init__(self, width: int, height: int, fps: int) -> None:
+        super().__init__(width, height, fps)
+        self.first_send_time: float | None = None
+        self.last_send_time: float | None = None
+
+    def send(self, frame: np.ndarray[Any, Any]) -> None:
+        """Count the frame and its send time."""
+        now = time.monotonic()
+        if self.first_send_time is None:
+            self.first_send_time = now
+        self.last_send_time = now
+        super().send(frame)
+
+
+class FileSink(FrameSink):
+    """Appends raw frame bytes to a file or named pipe, one frame after another."""
+
+    name = "file"
+
+    def __init__(self, width: int, height: int, fps: int, path: str, *, append: bool = False) -> None:
+        super().__init__(width, height, fps)
+        self.path = path
+        self.append = append
+        self.file: BinaryIO | None = None
+
+    @property
+    def device(self) -> str:
+        """Output path."""
+        return f"file:{self.path}"
+
+    def resized(self, width: int, height: int, fps: int) -> "FileSink":
+        """Continue the same file with different output settings."""
+        return FileSink(width, height, fps, self.path, append=True)
+
+    def open(self, fmt: FrameFormat) -> None:
+        """Open the output file; frames are written in the given pixel format."""
+        self.file = Path(self.path).open("ab" if self.append else "wb")  # noqa: SIM115
+        super().open(fmt)
+
+    def send(self, frame: np.ndarray[Any, Any]) -> None:
+        """Write the frame's raw bytes."""
+        if self.file:
+            self.file.write(np.ascontiguousarray(frame).data)
+            super().send(frame)
+
+    def close(self) -> None:
+        """Close the output file."""
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+class PreviewSink(FrameSink):
+    """
+    Publishes a downscaled JPEG preview for the UI on a ZeroMQ PUB socket.
+
+    Messages use the producer frame envelope, so the app can read them with the same
+    header code. Frames are dropped rather than queued when no subscriber keeps up.
+    """
+
+    name = "preview"
+    formats = (FrameFormat.BGR,)
+    repeat_frames = False
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        fps: int,
+        port: int = DEFAULT_PREVIEW_PORT,
+        max_width: int = PREVIEW_MAX_WIDTH,
+        jpeg_quality: int = PREVIEW_JPEG_QUALITY,
+    ) -> None:
+        super().__init__(width, height, fps)
+        self.port = port
+        self.max_width = max_width
+        self.jpeg_quality = jpeg_quality
+        self.zmq_context: zmq.Context[Any] | None = None
+        self.socket: zmq.Socket[Any] | None = None
+        self.frames_dropped = 0
+
+    @property
+    def device(self) -> str:
+        """Preview endpoint."""
+        return f"preview:{self.port}"
+
+    def resized(self, width: int, height: int, fps: int) -> "PreviewSink":
+        """Preview on the same port with different output settings."""
+        return PreviewSink(width, height, fps, self.port, self.max_width, self.jpeg_quality)
+
+    def open(self, fmt: FrameFormat) -> None:
+        """Bind the preview PUB socket."""
+        if fmt not in self.formats:
+            msg = f"Preview needs BGR frames, not {fmt.name}"
+            raise ValueError(msg)
+
+        self.zmq_context = zmq.Context()
+        self.socket = self.zmq_context.socket(zmq.PUB)
+        self.socket.setsockopt(zmq.SNDHWM, PREVIEW_HIGH_WATER_MARK)
+        self.socket.setsockopt(zmq.LINGER, 0)
+        self.socket.bind(f"tcp://127.0.0.1:{self.port}")
+        super().open(fmt)
+
+    def send(self, frame: np.ndarray[Any, Any]) -> None:
+        """Downscale, encode and publish the frame."""
+        if self.socket is None:
+            return
+
+        height, width = frame.shape[:2]
+        if width > self.max_width:
+            height = max(2, height * self.max_width // width) & ~1
+            width = self.max_width
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+        ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            return
+
+        now_ms = time.time() * 1000.0
+        header = FrameHeader(sequence=self.frames_sent, capture_ms=now_ms, send_ms=now_ms, width=width, height=height)
+        try:
+            self.socket.send_multipart([header.pack(), buffer.tobytes()], flags=zmq.NOBLOCK)
+        except zmq.Again:
+            self.frames_dropped += 1
+            return
+
+        self.frames_sent += 1
+        self.bytes_sent += buffer.nbytes
+
+    def close(self) -> None:
+        """Close the preview socket."""
+        if self.socket:
+            self.socket.close()
+            self.socket = None
+        if self.zmq_context:
+            self.zmq_context.term()
+            self.zmq_context = None
+
+
+class RecordingSink(FrameSink):
+    """Records frames to an MJPEG video file."""
+
+    name = "record"
+    formats = (FrameFormat.BGR,)
+
+    def __init__(self, width: int, height: int, fps: int, path: str) -> None:
+        super().__init__(width, height, fps)
+        self.path = path
+        self.writer: cv2.VideoWriter | None = None
+
+    @property
+    def device(self) -> str:
+        """Output path."""
+        return f"record:{self.path}"
+
+    def resized(self, width: int, height: int, fps: int) -> "RecordingSink":
+        """Record to the same path with different output settings."""
+        return RecordingSink(width, height, fps, self.path)
+
+    def open(self, fmt: FrameFormat) -> None:
+        """Open the video writer."""
+        if fmt not in self.formats:
+            msg = f"Recording needs BGR frames, not {fmt.name}"
+            raise ValueError(msg)
+
+        writer = cv2.VideoWriter(self.path, cv2.VideoWriter.fourcc(*"MJPG"), self.fps, (self.width, self.height))
+        if not writer.isOpened():
+            msg = f"Cannot open video writer for {self.path}"
+            raise RuntimeError(msg)
+        self.writer = writer
+        super().open(fmt)
+
+    def send(self, frame: np.ndarray[Any, Any]) -> None:
+        """Append the frame to the video."""
+        if self.writer:
+            self.writer.write(frame)
+            super().send(frame)
+
+    def close(self) -> None:
+        """Finish the video file."""
+        if self.writer:
+            self.writer.release()
+            self.writer = None
+
+
+def parse_sink(spec: str, width: int, height: int, fps: int) -> FrameSink:
+    """Create a sink from its spec string (vcam, null, file:PATH, preview[:PORT] or record:PATH)."""
+    name, _, argument = spec.partition(":")
+    name = name.lower()
+
+    if name == "vcam":
+        return PyVirtualCamSink(width, height, fps)
+    if name == "null":
+        return NullSink(width, height, fps)
+    if name == "file" and argument:
+        return FileSink(width, height, fps, argument)
+    if name == "preview" and (not argument or argument.isdigit()):
+        port = int(argument) if argument.isdigit() else DEFAULT_PREVIEW_PORT
+        return PreviewSink(width, height, min(fps, PREVIEW_FPS), port)
+    if name == "record" and argument:
+        return RecordingSink(width, height, fps, argument)
+
+    msg = f"Unknown sink: {spec!r} (expected vcam, null, file:PATH, preview[:PORT] or record:PATH)"
+    raise ValueError(msg)
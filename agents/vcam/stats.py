@@ -0,0 +1,110 @@
+"""
+Statistics helpers for the virtual camera agent.
+"""
+
+import bisect
+import math
+from collections.abc import Iterable
+
+
+def percentile(values: Iterable[float], q: float) -> float:
+    """Return the q-th percentile (0-100) of values using nearest-rank, or 0.0 if empty."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = round(q / 100.0 * (len(ordered) - 1))
+    return ordered[min(max(rank, 0), len(ordered) - 1)]
+
+
+class ExponentialAverage:
+    """Exponentially weighted moving average; the first sample initializes it."""
+
+    def __init__(self, alpha: float) -> None:
+        self.alpha = alpha
+        self.value: float | None = None
+
+    def update(self, sample: float) -> float:
+        """Fold in a sample and return the new average."""
+        self.value = sample if self.value is None else self.value + self.alpha * (sample - self.value)
+        return self.value
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram in milliseconds.
+
+    Buckets are log-spaced so sub-millisecond decode times and multi-second stalls are
+    both resolved; recording is O(log buckets) and allocation-free.
+    """
+
+    def __init__(self, min_ms: float = 0.1, max_ms: float = 10_000.0, buckets_per_decade: int = 20) -> None:
+        decades = math.log10(max_ms / min_ms)
+        count = math.ceil(decades * buckets_per_decade)
+        self.bounds = [min_ms * 10 ** (i / buckets_per_decade) for i in range(count + 1)]
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, value_ms: float) -> None:
+        """Record one latency sample."""
+        self.counts[bisect.bisect_left(self.bounds, value_ms)] += 1
+        self.total += 1
+        self.sum_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def percentile(self, q: float) -> float:
+        """Return the upper bound of the bucket holding the q-th percentile (0-100)."""
+        if self.total == 0:
+            return 0.0
+        target = q / 100.0 * self.total
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target and count:
+                return self.bounds[i] if i < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def mean(self) -> float:
+        """Return the mean latency in milliseconds."""
+        return self.sum_ms / self.total if self.total else 0.0
+
+    def reset(self) -> None:
+        """Clear all samples."""
+        self.counts = [0] * len(self.counts)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def copy(self) -> "LatencyHistogram":
+        """Return an independent copy, e.g. as a baseline for delta()."""
+        other = LatencyHistogram.__new__(LatencyHistogram)
+        other.bounds = self.bounds
+        other.counts = list(self.counts)
+        other.total = self.total
+        other.sum_ms = self.sum_ms
+        other.max_ms = self.max_ms
+        return other
+
+    def delta(self, baseline: "LatencyHistogram") -> "LatencyHistogram":
+        """Return a histogram of the samples recorded since baseline was copied."""
+        other = LatencyHistogram.__new__(LatencyHistogram)
+        other.bounds = self.bounds
+        other.counts = [now - then for now, then in zip(self.counts, baseline.counts, strict=True)]
+        other.total = self.total - baseline.total
+        other.sum_ms = self.sum_ms - baseline.sum_ms
+        # The exact window maximum is not kept; use the top occupied bucket bound
+        top = max((i for i, count in enumerate(other.counts) if count), default=-1)
+        other.max_ms = self.max_ms if top < 0 or top >= len(self.bounds) else self.bounds[top]
+        return other
+
+    def summary(self) -> dict[str, float]:
+        """Return count, mean, p50, p90, p99 and max as a dict."""
+        return {
+            "count": self.total,
+            "mean_ms": self.mean(),
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms,
+        }
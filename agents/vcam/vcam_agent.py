@@ -2,17 +2,61 @@
 Virtual Camera Agent that receives frames via ZeroMQ and outputs to a virtual camera.
 """
 
+import contextlib
+import dataclasses
 import queue
 import threading
 import time
+from collections import deque
 from typing import Any
 
-import cv2
 import numpy as np
-import pyvirtualcam
 import zmq
 from loguru import logger
 
+from agents.shared.control import ControlError, ControlServer
+from agents.vcam.backpressure import BackpressureAdvisor, FeedbackWindow
+from agents.vcam.control import (
+    RECONFIGURE_TIMEOUT_SECONDS,
+    OutputSettings,
+    PendingOutput,
+    Reconfiguration,
+    SourceSizeTracker,
+    settings_from_request,
+)
+from agents.vcam.fanout import FanOut, SinkWorker
+from agents.vcam.frame_cache import DecodedFrameCache
+from agents.vcam.frame_envelope import FrameHeader, FrameTiming, SequenceTracker, split_message
+from agents.vcam.frame_pacer import FramePacer
+from agents.vcam.idle import DEFAULT_IDLE_TIMEOUT_SECONDS, DEFAULT_KEEPALIVE_FPS, IdleController
+from agents.vcam.pixel_format import (
+    CAMERA_FORMAT_PREFERENCE,
+    FrameFormat,
+    black_frame,
+    frame_dimensions,
+    frame_shape,
+    load_frame,
+    prepare_frame,
+    resize_frame,
+)
+from agents.vcam.sinks import FrameSink, PyVirtualCamSink
+from agents.vcam.stats import ExponentialAverage, LatencyHistogram
+
+# Pipeline stages with latency histograms
+LATENCY_STAGES = ("transport", "decode", "queue", "output", "end_to_end")
+
+FEEDBACK_INTERVAL_SECONDS = 1.0
+
+# Weight of each feedback window in the published end-to-end latency estimate
+VIDEO_LATENCY_SMOOTHING = 0.2
+
+# Receiver poll timeouts; shutdown wakes the poller, so these only bound reconnect checks
+RECEIVE_POLL_TIMEOUT_MS = 1000
+IDLE_RECEIVE_POLL_TIMEOUT_MS = 30000
+
+# Completed reconfigurations kept for the status command
+RECONFIGURATION_HISTORY = 20
+
 
 class VCamAgent:
     """Virtual Camera Agent that receives frames via ZeroMQ."""
@@ -24,56 +68,115 @@ class VCamAgent:
         fps: int = 30,
         zmq_port: int = 50001,
         stats_interval: float = 10.0,
+        pixel_format: FrameFormat | None = None,
+        feedback_port: int = 0,
+        feedback_interval: float = FEEDBACK_INTERVAL_SECONDS,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT_SECONDS,
+        keepalive_fps: float = DEFAULT_KEEPALIVE_FPS,
+        sink: FrameSink | None = None,
+        control_port: int = 0,
+        follow_source: bool = False,  # noqa: FBT001, FBT002
+        extra_sinks: list[SinkWorker] | None = None,
     ) -> None:
         self.width = width
         self.height = height
         self.fps = fps
         self.zmq_port = zmq_port
         self.stats_interval = stats_interval
+        self.feedback_port = feedback_port
+        self.feedback_interval = feedback_interval
+        self.control_port = control_port
+
+        # Requested camera pixel format (None = negotiate with the backend)
+        self.requested_pixel_format = pixel_format
+        self.pixel_format = pixel_format or FrameFormat.BGR
 
         # Frame queue with max size to prevent memory overflow
-        self.frame_queue: queue.Queue[np.ndarray[Any, Any]] = queue.Queue(maxsize=4)
+        self.frame_queue: queue.Queue[tuple[np.ndarray[Any, Any], FrameTiming]] = queue.Queue(maxsize=4)
         self.last_frame: np.ndarray[Any, Any] | None = None
+        self.black_frame: np.ndarray[Any, Any] | None = None
+        self.frame_cache = DecodedFrameCache()
+
+        # Runtime reconfiguration (output settings are swapped by the writer between frames)
+        self.output_shape = frame_shape(self.pixel_format, width, height)
+        self.follow_source = follow_source
+        self.source_size = SourceSizeTracker()
+        self.reconfigure_lock = threading.Lock()
+        self.reconfiguration: Reconfiguration | None = None
+        self.pending_output: PendingOutput | None = None
+        self.reconfigurations: deque[Reconfiguration] = deque(maxlen=RECONFIGURATION_HISTORY)
+
+        # Output pacing (full rate while frames arrive, keep-alive rate while idle)
+        self.pacer = FramePacer(fps)
+        self.keepalive_pacer = FramePacer(keepalive_fps)
+        self.idle = IdleController(fps, idle_timeout=idle_timeout, keepalive_fps=keepalive_fps)
 
         # Control flags
         self.running = False
         self.zmq_connected = False
 
         # Components
-        self.vcam: pyvirtualcam.Camera | None = None
+        self.sink = sink if sink is not None else PyVirtualCamSink(width, height, fps)
+        self.sink_open = False
+        self.fanout = FanOut(extra_sinks)
         self.zmq_context: zmq.Context[Any] | None = None
         self.zmq_socket: zmq.Socket[Any] | None = None
+        self.feedback_socket: zmq.Socket[Any] | None = None
+        self.wake_sender: zmq.Socket[Any] | None = None
+        self.wake_receiver: zmq.Socket[Any] | None = None
+        self.control_server: ControlServer | None = None
+        self.advisor = BackpressureAdvisor(width, height, fps)
 
         # Threads
         self.receiver_thread: threading.Thread | None = None
         self.writer_thread: threading.Thread | None = None
+        self.feedback_thread: threading.Thread | None = None
         # Statistics
         self.frames_received = 0
+        self.frames_decoded = 0
         self.frames_dropped = 0
         self.frames_written = 0
         self.last_received_count = 0
         self.last_written_count = 0
+        self.sequence_tracker = SequenceTracker()
+        self.latency = {stage: LatencyHistogram() for stage in LATENCY_STAGES}
+        self.video_latency = ExponentialAverage(VIDEO_LATENCY_SMOOTHING)
 
     def create_black_frame(self) -> np.ndarray[Any, Any]:
-        """Create a black frame."""
-        return np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        """Create a black frame in the camera pixel format."""
+        return black_frame(self.pixel_format, self.width, self.height)
+
+    def format_candidates(self) -> tuple[FrameFormat, ...]:
+        """Camera pixel formats to try, most preferred first."""
+        return (self.requested_pixel_format,) if self.requested_pixel_format else CAMERA_FORMAT_PREFERENCE
+
+    def open_sink(self, sink: FrameSink, candidates: tuple[FrameFormat, ...]) -> FrameFormat | None:
+        """Open a sink in the first pixel format it accepts; returns that format or None."""
+        for fmt in candidates:
+            try:
+                sink.open(fmt)
+            except Exception as e:
+                logger.debug(f"Sink rejected pixel format {fmt.name}: {e}")
+                continue
+            return fmt
+        return None
 
     def init_virtual_camera(self) -> bool:
-        """Initialize virtual camera."""
-        try:
-            logger.info(f"Initializing virtual camera: {self.width}x{self.height} @ {self.fps}fps")
-            self.vcam = pyvirtualcam.Camera(
-                width=self.width,
-                height=self.height,
-                fps=self.fps,
-                fmt=pyvirtualcam.PixelFormat.RGB,
-            )
-            logger.info(f"Virtual camera initialized: {self.vcam.device}")
-        except Exception as e:
-            logger.error(f"Error initializing virtual camera: {e}")
+        """Initialize the output sink, negotiating the pixel format with the backend."""
+        candidates = self.format_candidates()
+        logger.info(f"Initializing {self.sink.name} sink: {self.width}x{self.height} @ {self.fps}fps")
+
+        fmt = self.open_sink(self.sink, candidates)
+        if fmt is None:
+            names = ", ".join(fmt.name for fmt in candidates)
+            logger.error(f"Error initializing output sink: no supported pixel format ({names})")
             return False
-        else:
-            return True
+
+        self.pixel_format = fmt
+        self.output_shape = frame_shape(fmt, self.width, self.height)
+        self.sink_open = True
+        logger.info(f"Output sink initialized: {self.sink.device} ({fmt.name})")
+        return True
 
     def init_zmq(self) -> bool:
         """Initialize ZeroMQ connection."""
@@ -101,9 +204,57 @@ class VCamAgent:
         else:
             return True
 
+    def init_feedback(self) -> bool:
+        """Bind the PUB socket producers subscribe to for backpressure feedback."""
+        try:
+            if self.zmq_context is None:
+                self.zmq_context = zmq.Context()
+
+            self.feedback_socket = self.zmq_context.socket(zmq.PUB)
+            self.feedback_socket.setsockopt(zmq.LINGER, 0)
+            self.feedback_socket.bind(f"tcp://127.0.0.1:{self.feedback_port}")
+            logger.info(f"Publishing producer feedback on port {self.feedback_port}")
+        except Exception as e:
+            logger.error(f"Error binding feedback socket: {e}")
+            self.feedback_socket = None
+            return False
+        else:
+            return True
+
+    def init_control(self) -> bool:
+        """Start the endpoint that accepts runtime control commands."""
+        self.control_server = ControlServer(
+            self.control_port,
+            {
+                "status": lambda _: {"status": self.status()},
+                "follow_source": self.handle_follow_source,
+                "reconfigure": self.handle_reconfigure,
+            },
+            name="vcam-control",
+        )
+        if not self.control_server.start():
+            self.control_server = None
+            return False
+        return True
+
+    def init_wakeup(self) -> None:
+        """Create the inproc socket pair used to wake the receiver on shutdown."""
+        if self.zmq_context is None:
+            self.zmq_context = zmq.Context()
+
+        address = f"inproc://vcam-wakeup-{id(self)}"
+        self.wake_receiver = self.zmq_context.socket(zmq.PAIR)
+        self.wake_receiver.bind(address)
+        self.wake_sender = self.zmq_context.socket(zmq.PAIR)
+        self.wake_sender.connect(address)
+
     def receive_frames(self) -> None:
         """Receiver thread: Read frames from ZeroMQ and enqueue them."""
         reconnect_delay = 1.0
+        poller = zmq.Poller()
+        polled_socket: zmq.Socket[Any] | None = None
+        if self.wake_receiver:
+            poller.register(self.wake_receiver, zmq.POLLIN)
 
         while self.running:
             if self.zmq_socket is None or not self.zmq_connected:
@@ -112,35 +263,51 @@ class VCamAgent:
                     time.sleep(reconnect_delay)
                     continue
 
+            if polled_socket is not self.zmq_socket:
+                if polled_socket is not None:
+                    poller.unregister(polled_socket)
+                poller.register(self.zmq_socket, zmq.POLLIN)
+                polled_socket = self.zmq_socket
+
             try:
-                # Receive frame data
-                data = self.zmq_socket.recv()  # type: ignore  # noqa: PGH003
+                # Wait for a frame; while idle, sleep long instead of cycling on short timeouts
+                timeout = IDLE_RECEIVE_POLL_TIMEOUT_MS if self.idle.idle else RECEIVE_POLL_TIMEOUT_MS
+                if polled_socket not in dict(poller.poll(timeout)):
+                    continue
+
+                # Receive frame message (optional envelope header + payload)
+                parts = self.zmq_socket.recv_multipart(flags=zmq.NOBLOCK)  # type: ignore  # noqa: PGH003
+                receive_ms = time.time() * 1000.0
                 self.frames_received += 1
 
-                # Decode frame
-                frame_array = np.frombuffer(data, dtype=np.uint8)
-                frame = cv2.imdecode(frame_array, cv2.IMREAD_COLOR)
+                header, payload = split_message(parts)
+                if header is not None:
+                    self.latency["transport"].record(max(0.0, receive_ms - header.send_ms))
+                    if not self.sequence_tracker.observe(header.sequence):
+                        # Stale frame overtaken by a newer one; showing it would step backwards
+                        continue
 
+                frame = self.decode_payload(header, payload)
                 if frame is None:
                     logger.warning("Failed to decode frame")
                     continue
 
-                # Resize if needed
-                if frame.shape[1] != self.width or frame.shape[0] != self.height:
-                    frame = cv2.resize(frame, (self.width, self.height))
-
-                # Convert BGR to RGB for pyvirtualcam
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                timing = FrameTiming(
+                    receive_ms=receive_ms,
+                    capture_ms=header.capture_ms if header is not None and header.capture_ms > 0 else None,
+                    enqueue_time=time.monotonic(),
+                )
+                item = (frame, timing)
 
                 # Try to add to queue, drop old frames if full
                 try:
-                    self.frame_queue.put_nowait(frame)
+                    self.frame_queue.put_nowait(item)
                 except queue.Full:
                     # Drop oldest frame and add new one
                     try:
                         self.frame_queue.get_nowait()
                         self.frames_dropped += 1
-                        self.frame_queue.put_nowait(frame)
+                        self.frame_queue.put_nowait(item)
                     except queue.Empty:
                         pass
 
@@ -155,39 +322,360 @@ class VCamAgent:
                 logger.error(f"Error receiving frame: {e}")
                 time.sleep(0.1)
 
+    def decode_payload(self, header: FrameHeader | None, payload: bytes) -> np.ndarray[Any, Any] | None:
+        """Decode a payload into a camera frame, reusing the last result for byte-identical payloads."""
+        if header is not None:
+            fmt, width, height = header.fmt, header.width, header.height
+        else:
+            fmt, width, height = FrameFormat.JPEG, 0, 0
+
+        fingerprint = self.frame_cache.fingerprint(
+            payload,
+            (fmt, width, height, self.width, self.height, self.pixel_format),
+        )
+        frame = self.frame_cache.lookup(fingerprint)
+        if frame is not None:
+            return frame
+
+        # Decode straight into the camera pixel format
+        decode_start = time.perf_counter()
+        loaded = load_frame(payload, fmt, width, height)
+        if loaded is None:
+            return None
+
+        src_format, frame = loaded
+        if self.follow_source:
+            self.follow_source_size(*frame_dimensions(frame, src_format))
+        frame = prepare_frame(frame, src_format, self.width, self.height, self.pixel_format)
+        self.latency["decode"].record((time.perf_counter() - decode_start) * 1000.0)
+        # Cache hits are counted by the cache, so this is payloads actually decoded
+        self.frames_decoded += 1
+
+        self.frame_cache.store(fingerprint, frame)
+        return frame
+
     def write_frames(self) -> None:
-        """Writer thread: Get frames from queue and write to virtual camera."""
-        frame_interval = 1.0 / self.fps
-        last_frame_time = time.time()
+        """Writer thread: Get frames from queue and write to virtual camera on fixed deadlines."""
+        self.pacer.reset()
+        self.keepalive_pacer.reset()
 
         while self.running:
             try:
-                current_time = time.time()
-                elapsed = current_time - last_frame_time
-
-                # Maintain FPS timing
-                if elapsed < frame_interval:
-                    time.sleep(frame_interval - elapsed)
-                    continue
+                # Swap in reconfigured output between frames
+                pending = self.pending_output
+                if pending is not None:
+                    self.pending_output = None
+                    self.apply_pending_output(pending)
+
+                item = self.wait_for_frame()
+                if item is not None and item[0].shape != self.output_shape:
+                    # Decoded for the previous output settings; repeat the last frame instead
+                    self.count_switch_loss()
+                    item = None
+
+                timing: FrameTiming | None = None
+                if item is not None:
+                    frame, timing = item
+                    self.last_frame = frame
+                elif self.last_frame is not None:
+                    # No new frame: repeat the last frame
+                    frame = self.last_frame
+                else:
+                    # Nothing received yet: the cached black frame
+                    if self.black_frame is None:
+                        self.black_frame = self.create_black_frame()
+                    frame = self.black_frame
+
+                # Write to the output sink
+                if self.sink_open:
+                    send_start = time.monotonic()
+                    self.sink.send(frame)
+                    self.frames_written += 1
 
-                last_frame_time = current_time
+                    if timing is not None:
+                        self.record_output_latency(timing, send_start)
 
-                # Try to get frame from queue
-                try:
-                    frame = self.frame_queue.get(timeout=0.1)
-                    self.last_frame = frame
-                except queue.Empty:
-                    # No frames available, use last frame if exists, otherwise black frame
-                    frame = self.last_frame if self.last_frame is not None else self.create_black_frame()
+                # Hand new frames to the secondary sinks, which pace themselves
+                if item is not None:
+                    self.fanout.publish(frame, self.pixel_format)
 
-                # Write to virtual camera
-                if self.vcam:
-                    self.vcam.send(frame)
-                    self.frames_written += 1
+                if self.idle.idle:
+                    self.idle.on_keepalive()
+                    self.keepalive_pacer.mark_output()
+                else:
+                    self.pacer.mark_output()
 
             except Exception as e:
                 logger.error(f"Error writing frame: {e}")
                 time.sleep(0.1)
+                self.pacer.reset()
+                self.keepalive_pacer.reset()
+
+    def wait_for_frame(self) -> tuple[np.ndarray[Any, Any], FrameTiming] | None:
+        """Wait for the next output slot; return a new frame if one is ready, else None to repeat."""
+        if self.idle.idle:
+            # Block on the queue only up to the keep-alive deadline, so a new frame wakes us at once
+            try:
+                item = self.frame_queue.get(timeout=self.keepalive_pacer.time_until_deadline())
+            except queue.Empty:
+                return None
+
+            self.idle.on_frame()
+            self.pacer.reset()
+            logger.info("Frames resumed, leaving idle mode")
+            return item
+
+        # Sleep until the next deadline; never wait on the queue past it
+        self.pacer.wait()
+        try:
+            item = self.frame_queue.get_nowait()
+        except queue.Empty:
+            if self.idle.check():
+                self.keepalive_pacer.reset()
+                logger.info(
+                    f"No frames for {self.idle.idle_timeout:.0f}s, entering idle mode "
+                    f"({self.idle.keepalive_fps:g} fps keep-alive)"
+                )
+            return None
+
+        self.idle.on_frame()
+        return item
+
+    def output_settings(self) -> OutputSettings:
+        """Current output geometry and frame rate."""
+        return OutputSettings(self.width, self.height, self.fps)
+
+    def request_reconfigure(self, settings: OutputSettings, reason: str) -> Reconfiguration | None:
+        """Start building output for new settings in the background; None if a switch is running."""
+        with self.reconfigure_lock:
+            if self.reconfiguration is not None:
+                return None
+            record = Reconfiguration(settings, reason)
+            self.reconfiguration = record
+
+        logger.info(
+            f"Reconfiguring output ({reason}): {self.width}x{self.height} @ {self.fps}fps -> "
+            f"{settings.width}x{settings.height} @ {settings.fps}fps"
+        )
+        thread = threading.Thread(target=self.build_output, args=(record,), daemon=True)
+        thread.start()
+        return record
+
+    def build_output(self, record: Reconfiguration) -> None:
+        """Reconfigure thread: Open the new sink and buffers without stalling the writer."""
+        settings = record.settings
+        build_start = time.monotonic()
+
+        try:
+            # Keep the current pixel format if the new sink accepts it
+            candidates = (self.pixel_format, *(fmt for fmt in self.format_candidates() if fmt != self.pixel_format))
+            resized = self.sink.resized(settings.width, settings.height, settings.fps)
+            fmt = self.open_sink(resized, candidates)
+            sink: FrameSink | None = resized
+            if fmt is None:
+                # Backends that allow one open device at a time are switched in place by the writer
+                logger.debug("Could not open a second sink alongside the current one; switching in place")
+                sink = None
+                fmt = self.pixel_format
+
+            pending = PendingOutput(
+                reconfiguration=record,
+                sink=sink,
+                pixel_format=fmt,
+                black_frame=black_frame(fmt, settings.width, settings.height),
+            )
+        except Exception as e:
+            record.error = str(e)
+            self.finish_reconfiguration(record)
+            return
+
+        record.build_ms = (time.monotonic() - build_start) * 1000.0
+        self.pending_output = pending
+
+    def apply_pending_output(self, pending: PendingOutput) -> None:
+        """Swap the reconfigured sink and buffers in, between two frames."""
+        record = pending.reconfiguration
+        settings = record.settings
+        old_sink = self.sink
+        sink = pending.sink
+
+        if sink is None:
+            # Release the device before reopening it; this path shows a short gap
+            old_sink.close()
+            sink = old_sink.resized(settings.width, settings.height, settings.fps)
+            if self.open_sink(sink, (pending.pixel_format,)) is None:
+                record.error = "Sink rejected the new settings"
+                self.sink = old_sink.resized(self.width, self.height, self.fps)
+                self.sink_open = self.open_sink(self.sink, (self.pixel_format,)) is not None
+                self.finish_reconfiguration(record)
+                return
+        elif self.sink_open:
+            old_sink.close()
+
+        # Carry the last frame over so the switch does not flash black
+        if self.last_frame is not None and pending.pixel_format == self.pixel_format:
+            self.last_frame = resize_frame(self.last_frame, self.pixel_format, settings.width, settings.height)
+        else:
+            self.last_frame = None
+
+        self.sink = sink
+        self.sink_open = True
+        self.width, self.height, self.fps = settings.width, settings.height, settings.fps
+        self.pixel_format = pending.pixel_format
+        self.output_shape = frame_shape(pending.pixel_format, settings.width, settings.height)
+        self.black_frame = pending.black_frame
+        self.pacer.set_fps(settings.fps)
+        self.idle.active_fps = settings.fps
+        self.advisor = BackpressureAdvisor(settings.width, settings.height, settings.fps)
+
+        record.switch_ms = (time.monotonic() - record.requested_at) * 1000.0
+        self.finish_reconfiguration(record)
+
+    def finish_reconfiguration(self, record: Reconfiguration) -> None:
+        """Record a completed (or failed) reconfiguration and allow the next one."""
+        with self.reconfigure_lock:
+            self.reconfiguration = None
+            self.reconfigurations.append(record)
+        record.done.set()
+
+        if record.error:
+            logger.error(f"Reconfiguration failed: {record.error}")
+        else:
+            logger.info(
+                f"Output reconfigured to {self.width}x{self.height} @ {self.fps}fps ({self.pixel_format.name}) "
+                f"in {record.switch_ms:.0f} ms (build {record.build_ms:.0f} ms)"
+            )
+
+    def count_switch_loss(self) -> None:
+        """Count a frame discarded because it was decoded for the previous output settings."""
+        if self.reconfigurations:
+            self.reconfigurations[-1].frames_lost += 1
+
+    def follow_source_size(self, width: int, height: int) -> None:
+        """Switch the output to the producer's frame size once it is stable, avoiding a resize per frame."""
+        size = self.source_size.observe(width, height)
+        if size is None or size == (self.width, self.height) or self.reconfiguration is not None:
+            return
+
+        settings = OutputSettings(size[0], size[1], self.fps)
+        try:
+            settings.validate()
+        except ControlError:
+            return
+
+        # Do not retry a size the sink already rejected
+        last = self.reconfigurations[-1] if self.reconfigurations else None
+        if last is not None and last.error and last.settings == settings:
+            return
+
+        self.request_reconfigure(settings, "source")
+
+    def handle_follow_source(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Control handler for follow_source: turn following the producer's frame size on or off."""
+        self.follow_source = bool(request.get("enabled", True))
+        return {"follow_source": self.follow_source}
+
+    def handle_reconfigure(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Control handler for reconfigure: switch to the requested output settings."""
+        return self.reconfigure(settings_from_request(request, self.output_settings()))
+
+    def reconfigure(self, settings: OutputSettings) -> dict[str, Any]:
+        """Apply explicitly requested output settings and wait for the switch."""
+        if settings == self.output_settings():
+            return {"ok": True, "changed": False}
+
+        # Explicit settings win over following the producer
+        self.follow_source = False
+        record = self.request_reconfigure(settings, "control")
+        if record is None:
+            return {"ok": False, "error": "Another reconfiguration is in progress"}
+
+        if not record.done.wait(RECONFIGURE_TIMEOUT_SECONDS):
+            return {"ok": False, "error": "Reconfiguration timed out", "reconfiguration": record.to_dict()}
+        if record.error:
+            return {"ok": False, "error": record.error, "reconfiguration": record.to_dict()}
+        return {"ok": True, "changed": True, "reconfiguration": record.to_dict()}
+
+    def status(self) -> dict[str, Any]:
+        """Current output settings and counters for the status command."""
+        return {
+            "width": self.width,
+            "height": self.height,
+            "fps": self.fps,
+            "pixel_format": self.pixel_format.name,
+            "sink": self.sink.device,
+            "follow_source": self.follow_source,
+            "idle": self.idle.idle,
+            "frames_received": self.frames_received,
+            "frames_decoded": self.frames_decoded,
+            "duplicates_skipped": self.frame_cache.hits,
+            "frames_dropped": self.frames_dropped,
+            "frames_written": self.frames_written,
+            "video_latency_ms": self.video_latency.value,
+            "reconfigurations": [record.to_dict() for record in self.reconfigurations],
+            "secondary_sinks": self.fanout.stats(),
+        }
+
+    def record_output_latency(self, timing: FrameTiming, send_start: float) -> None:
+        """Record queue, output and end-to-end latency for a freshly written frame."""
+        now = time.monotonic()
+        self.latency["queue"].record((send_start - timing.enqueue_time) * 1000.0)
+        self.latency["output"].record((now - send_start) * 1000.0)
+
+        origin_ms = timing.capture_ms if timing.capture_ms is not None else timing.receive_ms
+        self.latency["end_to_end"].record(max(0.0, time.time() * 1000.0 - origin_ms))
+
+    def publish_feedback(self) -> None:
+        """Feedback thread: Publish achieved throughput and producer recommendations at a low rate."""
+        baseline = {stage: hist.copy() for stage, hist in self.latency.items()}
+        last_received = self.frames_received
+        last_decoded = self.frames_decoded
+        last_dropped = self.count_dropped_frames()
+        last_time = time.monotonic()
+
+        while self.running:
+            time.sleep(self.feedback_interval)
+            try:
+                now = time.monotonic()
+                window_latency = {stage: hist.delta(baseline[stage]) for stage, hist in self.latency.items()}
+                dropped = self.count_dropped_frames()
+
+                window = FeedbackWindow(
+                    elapsed=now - last_time,
+                    frames_received=self.frames_received - last_received,
+                    frames_decoded=self.frames_decoded - last_decoded,
+                    frames_dropped=dropped - last_dropped,
+                    decode_ms_p90=window_latency["decode"].percentile(90),
+                    queue_delay_ms_p50=(
+                        window_latency["transport"].percentile(50) + window_latency["queue"].percentile(50)
+                    ),
+                )
+                feedback = self.advisor.update(window)
+
+                # Smoothed end-to-end latency for audio sync; the window mean is exact, percentiles are bucketed
+                if window_latency["end_to_end"].total:
+                    self.video_latency.update(window_latency["end_to_end"].mean())
+                if self.video_latency.value is not None:
+                    feedback = dataclasses.replace(feedback, video_latency_ms=self.video_latency.value)
+
+                baseline = {stage: hist.copy() for stage, hist in self.latency.items()}
+                last_received += window.frames_received
+                last_decoded += window.frames_decoded
+                last_dropped = dropped
+                last_time = now
+
+                if self.feedback_socket:
+                    self.feedback_socket.send_string(feedback.to_json(), flags=zmq.NOBLOCK)
+
+            except zmq.Again:
+                # No subscriber keeping up; feedback is best-effort
+                continue
+            except Exception as e:
+                logger.error(f"Error publishing feedback: {e}")
+
+    def count_dropped_frames(self) -> int:
+        """Frames the producer sent that never reached the camera (local drops and transport losses)."""
+        return self.frames_dropped + self.sequence_tracker.frames_lost + self.sequence_tracker.frames_reordered
 
     def print_stats(self) -> None:
         """Print statistics periodically."""
@@ -195,6 +683,7 @@ class VCamAgent:
             return
 
         last_stats_time = time.time()
+        latency_baseline = {stage: hist.copy() for stage, hist in self.latency.items()}
 
         while self.running:
             try:
@@ -210,13 +699,42 @@ class VCamAgent:
                     receive_fps = received_delta / elapsed if elapsed > 0 else 0
                     write_fps = written_delta / elapsed if elapsed > 0 else 0
 
+                    jitter_p50, jitter_p99 = self.pacer.jitter()
+
                     logger.info(
                         f"Stats - Received: {self.frames_received} ({receive_fps:.1f} fps), "
                         f"Dropped: {self.frames_dropped}, "
+                        f"Duplicates skipped: {self.frame_cache.hits}, "
                         f"Written: {self.frames_written} ({write_fps:.1f} fps), "
-                        f"Queue size: {self.frame_queue.qsize()}"
+                        f"Interval p50/p99: {jitter_p50 * 1000:.1f}/{jitter_p99 * 1000:.1f} ms, "
+                        f"Missed deadlines: {self.pacer.deadlines_missed}, "
+                        f"Queue size: {self.frame_queue.qsize()}, "
+                        f"State: {'idle' if self.idle.idle else 'active'}, "
+                        f"Idle: {self.idle.total_idle_seconds():.0f}s, "
+                        f"Frames saved: {self.idle.frames_saved()}"
                     )
 
+                    window_latency = {
+                        stage: hist.delta(latency_baseline[stage]) for stage, hist in self.latency.items()
+                    }
+                    latency_baseline = {stage: hist.copy() for stage, hist in self.latency.items()}
+                    latency = ", ".join(
+                        f"{stage}: {hist.percentile(50):.1f}/{hist.percentile(99):.1f}"
+                        for stage, hist in window_latency.items()
+                        if hist.total
+                    )
+                    tracker = self.sequence_tracker
+                    logger.info(
+                        f"Latency p50/p99 ms - {latency or 'n/a'} | "
+                        f"Sequence gaps: {tracker.gaps}, Lost: {tracker.frames_lost}, "
+                        f"Reordered: {tracker.frames_reordered}, Resets: {tracker.resets}"
+                    )
+                    for worker in self.fanout.workers:
+                        logger.info(
+                            f"Sink {worker.sink.device} - Written: {worker.frames_written}, "
+                            f"Skipped: {worker.frames_skipped}, Missed deadlines: {worker.pacer.deadlines_missed}"
+                        )
+
                     # Update counters for next interval
                     last_stats_time = current_time
                     self.last_received_count = self.frames_received
@@ -229,13 +747,17 @@ class VCamAgent:
         """Start the virtual camera agent."""
         logger.info("Starting Virtual Camera Agent...")
 
-        # Initialize virtual camera
+        # Initialize virtual camera (or other output sink)
         if not self.init_virtual_camera():
-            logger.error("Failed to initialize virtual camera")
+            logger.error("Failed to initialize output sink")
             return False
+        self.fanout.start(self.pixel_format)
 
         # Initialize ZeroMQ (will retry in receiver thread if fails)
         self.init_zmq()
+        self.init_wakeup()
+        if self.feedback_port > 0:
+            self.init_feedback()
 
         # Set running flag
         self.running = True
@@ -249,6 +771,13 @@ class VCamAgent:
         self.writer_thread.start()
         stats_thread.start()
 
+        if self.feedback_socket:
+            self.feedback_thread = threading.Thread(target=self.publish_feedback, daemon=True)
+            self.feedback_thread.start()
+
+        if self.control_port > 0:
+            self.init_control()
+
         logger.info("Virtual Camera Agent started. Press Ctrl+C to stop.")
         return True
 
@@ -257,26 +786,50 @@ class VCamAgent:
         logger.info("Stopping Virtual Camera Agent...")
         self.running = False
 
+        # Wake the receiver if it is blocked in a long idle poll
+        if self.wake_sender:
+            with contextlib.suppress(zmq.ZMQError):
+                self.wake_sender.send(b"", flags=zmq.NOBLOCK)
+
         # Wait for threads to finish
         if self.receiver_thread:
             self.receiver_thread.join(timeout=2)
         if self.writer_thread:
             self.writer_thread.join(timeout=2)
+        if self.feedback_thread:
+            self.feedback_thread.join(timeout=2)
+        if self.control_server:
+            self.control_server.stop()
 
         # Close ZeroMQ
         if self.zmq_socket:
             self.zmq_socket.close()
+        if self.feedback_socket:
+            self.feedback_socket.close()
+        if self.wake_sender:
+            self.wake_sender.close()
+        if self.wake_receiver:
+            self.wake_receiver.close()
         if self.zmq_context:
             self.zmq_context.term()
 
-        # Close virtual camera
-        if self.vcam:
-            self.vcam.close()
+        # Close output sinks
+        self.fanout.stop()
+        if self.sink_open:
+            self.sink.close()
+            self.sink_open = False
 
         logger.info(
             f"Final stats - Received: {self.frames_received}, "
             f"Dropped: {self.frames_dropped}, "
-            f"Written: {self.frames_written}"
+            f"Duplicates skipped: {self.frame_cache.hits}, "
+            f"Written: {self.frames_written}, "
+            f"Idle: {self.idle.total_idle_seconds():.0f}s, "
+            f"Frames saved: {self.idle.frames_saved()}, "
+            f"Missed deadlines: {self.pacer.deadlines_missed}, "
+            f"Reconfigurations: {len(self.reconfigurations)}, "
+            f"Sequence lost: {self.sequence_tracker.frames_lost}, "
+            f"Reordered: {self.sequence_tracker.frames_reordered}"
         )
         logger.info("Virtual Camera Agent stopped.")
 
@@ -24,3 +24,6 @@ export const VCAM_RESTART_DELAY_MS = 2000;
 export const AUDIO_CONTROL_MAX_RESTART_COUNT = 10;
 export const AUDIO_CONTROL_RESTART_DELAY_MS = 2000;
 export const AUDIO_CONTROL_DELAY_MS = 300; // Default audio delay
+
+// Capture bus agent constants
+export const CAPTURE_BUS_READY_TIMEOUT_MS = 5000;
@@ -1,6 +1,7 @@
 import { ipcMain } from 'electron';
 
 import { webRtcService } from '../services/webrtc.service.js';
+import { VideoFrameMeta } from '../types/webrtc.js';
 
 export function registerWebRTCHandlers() {
   ipcMain.handle('webrtc:offer', async (_event, offer) => {
@@ -19,7 +20,10 @@ export function registerWebRTCHandlers() {
     await webRtcService.stopAgents();
   });
 
-  ipcMain.handle('webrtc:put-video-frame', async (_event, frameData: ArrayBuffer) => {
-    await webRtcService.putVideoFrame(frameData);
-  });
+  ipcMain.handle(
+    'webrtc:put-video-frame',
+    async (_event, frameData: ArrayBuffer, meta?: VideoFrameMeta) => {
+      await webRtcService.putVideoFrame(frameData, meta);
+    }
+  );
 }
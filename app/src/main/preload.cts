@@ -4,6 +4,8 @@ import { clear } from 'console';
 import { contextBridge, ipcRenderer } from 'electron';
 import { get } from 'http';
 
+import type { VideoFrameMeta } from './types/webrtc.js';
+
 // Build the API object once so it can be exposed under multiple names
 const electronApi = {
   // Hotkey scroll events
@@ -85,8 +87,8 @@ const electronApi = {
     getTurnCredentials: () => ipcRenderer.invoke('webrtc:turn-credentials'),
     startAgents: () => ipcRenderer.invoke('webrtc:start-agents'),
     stopAgents: () => ipcRenderer.invoke('webrtc:stop-agents'),
-    putVideoFrame: (frameData: ArrayBuffer) =>
-      ipcRenderer.invoke('webrtc:put-video-frame', frameData),
+    putVideoFrame: (frameData: ArrayBuffer, meta?: VideoFrameMeta) =>
+      ipcRenderer.invoke('webrtc:put-video-frame', frameData, meta),
   },
 
   // Listen for pushed notifications main
@@ -0,0 +1,174 @@
+/**
+ * Capture Bus Service
+ * Runs the capture bus agent, which opens the configured input device once and shares
+ * it with the ASR and audio control agents through shared memory
+ */
+
+import { ChildProcess, spawn } from 'child_process';
+import path from 'path';
+
+import { CAPTURE_BUS_READY_TIMEOUT_MS } from '../consts.js';
+import { EnvUtil } from '../utils/env.js';
+
+// Logged by the agent once a device is being captured (see agents/capture_bus/capture_bus_agent.py)
+const READY_MESSAGE = 'Publishing ';
+
+interface BusProcess {
+  process: ChildProcess;
+  ready: Promise<boolean>;
+}
+
+class CaptureBusService {
+  // One bus process per device, so agents on different devices do not disturb each other
+  private agents = new Map<string, BusProcess>();
+  // Device each agent currently reads; a bus runs while any agent reads its device
+  private users = new Map<string, string>();
+
+  /**
+   * Start the bus for a device (or reuse a running one) on behalf of an agent.
+   * Resolves true once the device is published, so the agent can be started with --capture-bus;
+   * false if the device cannot be shared, and the agent should open it directly.
+   */
+  async acquire(user: string, device: string): Promise<boolean> {
+    // An agent reads one device: moving to another releases the old one
+    if (this.users.get(user) !== device) {
+      await this.release(user);
+    }
+
+    // The bus captures input devices; loopback capture stays in the ASR agent
+    if (!device || device === 'loopback') {
+      return false;
+    }
+
+    this.users.set(user, device);
+    let agent = this.agents.get(device);
+    if (!agent) {
+      agent = this.startAgent(device);
+      this.agents.set(device, agent);
+    }
+    return await agent.ready;
+  }
+
+  /**
+   * Stop reading the bus on behalf of an agent; each bus stops with its last user
+   */
+  async release(user: string): Promise<void> {
+    const device = this.users.get(user);
+    if (device === undefined) {
+      return;
+    }
+    this.users.delete(user);
+    if (![...this.users.values()].includes(device)) {
+      await this.stopAgent(device);
+    }
+  }
+
+  /**
+   * Start the capture bus agent process for one device
+   */
+  private startAgent(device: string): BusProcess {
+    const { command, args: baseArgs } = this.getAgentCommand();
+
+    console.log(`Starting Capture Bus agent: ${command}`);
+    console.log(`Input device: ${device}`);
+
+    const args = [...baseArgs, '--input', device, '--watch-parent'];
+
+    const proc = spawn(command, args, {
+      stdio: ['ignore', 'pipe', 'pipe'],
+      windowsHide: true,
+      shell: false,
+    });
+
+    const agent: BusProcess = { process: proc, ready: Promise.resolve(false) };
+
+    agent.ready = new Promise<boolean>((resolve) => {
+      const timeout = setTimeout(() => {
+        console.warn('Capture Bus agent did not publish in time; agents open the device directly');
+        resolve(false);
+      }, CAPTURE_BUS_READY_TIMEOUT_MS);
+
+      const onOutput = (data: Buffer, log: (...args: unknown[]) => void) => {
+        const text = data.toString();
+        log('[Capture Bus]', text.trim());
+        if (text.includes(READY_MESSAGE)) {
+          clearTimeout(timeout);
+          resolve(true);
+        }
+      };
+
+      // loguru writes to stderr
+      proc.stdout?.on('data', (data) => onOutput(data, console.log));
+      proc.stderr?.on('data', (data) => onOutput(data, console.error));
+
+      proc.on('exit', (code, signal) => {
+        console.log(`Capture Bus agent exited: code=${code}, signal=${signal}`);
+        clearTimeout(timeout);
+        resolve(false);
+        // Not restarted: readers notice the bus stall and reopen their devices directly
+        if (this.agents.get(device) === agent) {
+          this.agents.delete(device);
+        }
+      });
+
+      proc.on('error', (error) => {
+        console.error('Capture Bus agent process error:', error);
+        clearTimeout(timeout);
+        resolve(false);
+      });
+    });
+
+    return agent;
+  }
+
+  /**
+   * Stop the capture bus agent process for one device
+   */
+  private async stopAgent(device: string): Promise<void> {
+    const agent = this.agents.get(device);
+    this.agents.delete(device);
+    if (!agent || agent.process.exitCode !== null || agent.process.killed) {
+      return;
+    }
+
+    try {
+      agent.process.kill('SIGTERM');
+
+      await new Promise<void>((resolve) => {
+        const timeout = setTimeout(() => {
+          if (agent.process.exitCode === null) {
+            console.log('Force killing Capture Bus agent...');
+            agent.process.kill('SIGKILL');
+          }
+          resolve();
+        }, 5000);
+
+        agent.process.once('exit', () => {
+          clearTimeout(timeout);
+          resolve();
+        });
+      });
+    } catch (error) {
+      console.error('Error stopping Capture Bus agent:', error);
+    }
+  }
+
+  /**
+   * Get capture bus agent executable command
+   */
+  private getAgentCommand(): { command: string; args: string[] } {
+    // In production, use built executable
+    let buildDir = path.join(process.execPath, '..', 'agents');
+    // In development, use local build
+    if (EnvUtil.isDev()) {
+      buildDir = path.join(process.cwd(), '..', 'build', 'agents', 'dist');
+    }
+    const exeName = process.platform === 'win32' ? 'capture_bus_agent.exe' : 'capture_bus_agent';
+    return {
+      command: path.join(buildDir, exeName),
+      args: [],
+    };
+  }
+}
+
+export const captureBusService = new CaptureBusService();
@@ -20,6 +20,7 @@ import { configStore } from '../store/config.store.js';
 import { Speaker, Transcript } from '../types/app-state.js';
 import { EnvUtil } from '../utils/env.js';
 import { appStateService } from './app-state.service.js';
+import { captureBusService } from './capture-bus.service.js';
 import { replySuggestionService } from './reply-suggestion.service.js';
 
 interface AgentProcess {
@@ -76,6 +77,7 @@ class TranscriptService {
     console.log('Stopping transcription...');
     await this.stopAgent(this.agent);
     this.agent = null;
+    await captureBusService.release('asr');
     console.log('Transcription stopped');
   }
 
@@ -110,6 +112,11 @@ class TranscriptService {
       args.push('--token', sessionToken);
     }
 
+    // Share the input device with the audio control agent instead of opening it twice
+    if (await captureBusService.acquire('asr', audioSource)) {
+      args.push('--capture-bus');
+    }
+
     const proc = spawn(command, args, {
       stdio: ['ignore', 'pipe', 'pipe'],
       windowsHide: true,
@@ -17,8 +17,15 @@ import {
   VCAM_ZMQ_PORT,
 } from '../consts.js';
 import { configStore } from '../store/config.store.js';
-import { OfferRequest, WebRTCOptions } from '../types/webrtc.js';
+import { OfferRequest, VideoFrameMeta, WebRTCOptions } from '../types/webrtc.js';
 import { EnvUtil } from '../utils/env.js';
+import { captureBusService } from './capture-bus.service.js';
+
+// Frame envelope header understood by the vcam agent (see agents/vcam/frame_envelope.py)
+const FRAME_HEADER_MAGIC = Buffer.from('PIVF', 'ascii');
+const FRAME_HEADER_VERSION = 1;
+const FRAME_HEADER_SIZE = 36;
+const FRAME_FORMAT_JPEG = 0;
 
 interface AgentProcess {
   process: ChildProcess;
@@ -34,6 +41,7 @@ class WebRTCService {
   private audioControlAgent: AgentProcess | null = null;
   private zmqPushSocket: zmq.Push | null = null;
   private frameCount = 0;
+  private frameSequence = 0;
 
   /**
    * Offer WebRTC connection for media streaming
@@ -116,15 +124,17 @@ class WebRTCService {
       await this.stopAgent(this.audioControlAgent);
       this.audioControlAgent = null;
     }
+    await captureBusService.release('audio_control');
 
     this.frameCount = 0;
+    this.frameSequence = 0;
     console.log('WebRTC agents stopped');
   }
 
   /**
    * Send video frame to vcam agent via ZMQ
    */
-  async putVideoFrame(frameData: ArrayBuffer): Promise<void> {
+  async putVideoFrame(frameData: ArrayBuffer, meta?: VideoFrameMeta): Promise<void> {
     if (!this.serviceActive || !this.zmqPushSocket) {
       console.warn('WebRTC agents not active. Cannot send video frame.');
       return;
@@ -132,7 +142,8 @@ class WebRTCService {
 
     try {
       const buffer = Buffer.from(frameData);
-      await this.zmqPushSocket.send(buffer);
+      const header = this.buildFrameHeader(meta);
+      await this.zmqPushSocket.send([header, buffer]);
       this.frameCount++;
 
       // Log stats periodically
@@ -144,6 +155,22 @@ class WebRTCService {
     }
   }
 
+  /**
+   * Build the frame envelope header (sequence, timestamps, dimensions, format)
+   */
+  private buildFrameHeader(meta?: VideoFrameMeta): Buffer {
+    const header = Buffer.alloc(FRAME_HEADER_SIZE);
+    FRAME_HEADER_MAGIC.copy(header, 0);
+    header.writeUInt8(FRAME_HEADER_VERSION, 4);
+    header.writeUInt8(FRAME_FORMAT_JPEG, 5);
+    header.writeUInt16LE(meta?.width ?? 0, 6);
+    header.writeUInt16LE(meta?.height ?? 0, 8);
+    header.writeBigUInt64LE(BigInt(this.frameSequence++), 12);
+    header.writeDoubleLE(meta?.captureTs ?? 0, 20);
+    header.writeDoubleLE(Date.now(), 28);
+    return header;
+  }
+
   /**
    * Start vcam agent process
    */
@@ -239,6 +266,11 @@ class WebRTCService {
       '--watch-parent',
     ];
 
+    // Share the input device with the ASR agent instead of opening it twice
+    if (await captureBusService.acquire('audio_control', inputDevice)) {
+      args.push('--capture-bus');
+    }
+
     const proc = spawn(command, args, {
       stdio: ['ignore', 'pipe', 'pipe'],
       windowsHide: true,
@@ -8,3 +8,9 @@ export interface OfferRequest {
   type: string;
   options: WebRTCOptions;
 }
+
+export interface VideoFrameMeta {
+  captureTs: number; // Producer capture time, Unix epoch milliseconds
+  width: number;
+  height: number;
+}
@@ -366,6 +366,7 @@ export const VideoPanel = forwardRef<VideoPanelHandle, VideoPanelProps>(
           sendingRef.current = true;
 
           // draw current frame
+          const captureTs = Date.now();
           ctx.drawImage(videoEl, 0, 0, canvas.width, canvas.height);
 
           // convert to JPEG blob
@@ -380,7 +381,11 @@ export const VideoPanel = forwardRef<VideoPanelHandle, VideoPanelProps>(
                 .arrayBuffer()
                 .then(async (arrayBuffer) => {
                   try {
-                    await electron.webRtc.putVideoFrame(arrayBuffer);
+                    await electron.webRtc.putVideoFrame(arrayBuffer, {
+                      captureTs,
+                      width: canvas.width,
+                      height: canvas.height,
+                    });
                   } catch (err) {
                     console.warn('Failed to send video frame to main:', err);
                   }
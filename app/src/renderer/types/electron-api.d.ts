@@ -1,3 +1,4 @@
+import type { VideoFrameMeta } from '../../main/types/webrtc';
 import type { AppState } from './app-state';
 import type { Config } from './config';
 import type {
@@ -95,7 +96,7 @@ declare global {
       getTurnCredentials: () => Promise<any>;
       startAgents: () => Promise<void>;
       stopAgents: () => Promise<void>;
-      putVideoFrame: (frameData: ArrayBuffer) => Promise<void>;
+      putVideoFrame: (frameData: ArrayBuffer, meta?: VideoFrameMeta) => Promise<void>;
     };
 
     // Push notification listener
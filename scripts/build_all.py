@@ -5,6 +5,7 @@ from datetime import datetime
 
 from scripts.build_asr_agent import build_asr_agent
 from scripts.build_audio_control_agent import build_audio_control_agent
+from scripts.build_capture_bus_agent import build_capture_bus_agent
 from scripts.build_electron_app import build_electron_app
 from scripts.build_vcam_agent import build_vcam_agent
 
@@ -27,6 +28,8 @@ def main() -> None:
         build_vcam_agent()
         print("\n⚡ Building Audio Control Agent...\n")  # noqa: T201
         build_audio_control_agent()
+        print("\n⚡ Building Capture Bus Agent...\n")  # noqa: T201
+        build_capture_bus_agent()
 
         # Build Electron app
         print("\n⚡ Building Electron App...\n")  # noqa: T201